@@ -0,0 +1,54 @@
+"""products partial indexes for catalog listing
+
+Revision ID: 3b7e9d1c4a52
+Revises: fae0c66d13c3
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7e9d1c4a52"
+down_revision: Union[str, Sequence[str], None] = "fae0c66d13c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_products_active_category_id", ["category_id", "id"], "is_active"),
+    ("ix_products_active_seller_id", ["seller_id", "id"], "is_active"),
+    ("ix_products_active_price", ["price", "id"], "is_active"),
+    ("ix_products_active_in_stock", ["id"], "is_active AND stock > 0"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY нельзя выполнять внутри транзакции миграции.
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            op.create_index(
+                name,
+                "products",
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _columns, _where in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name="products",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -7,6 +7,7 @@ from app.identity.deps import (
     get_current_user,
     oauth2_scheme,
 )
+from app.identity.repositories.principal_cache import Principal
 from app.identity.services.token_service import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     REFRESH_TOKEN_EXPIRE_DAYS,
@@ -14,6 +15,7 @@ from app.identity.services.token_service import (
     TokenUserData,
     create_access_token,
     create_refresh_token,
+    create_refresh_token_with_jti,
     hash_password,
     verify_password,
 )
@@ -21,10 +23,12 @@ from app.identity.services.token_service import (
 __all__ = [
     "ACCESS_TOKEN_EXPIRE_MINUTES",
     "REFRESH_TOKEN_EXPIRE_DAYS",
+    "Principal",
     "Role",
     "TokenUserData",
     "create_access_token",
     "create_refresh_token",
+    "create_refresh_token_with_jti",
     "get_current_admin",
     "get_current_buyer",
     "get_current_seller",
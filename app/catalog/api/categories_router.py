@@ -5,6 +5,7 @@ from app.catalog.schemas.category import Category as CategorySchema
 from app.catalog.schemas.category import CategoryCreate
 from app.catalog.services.category_service import CategoryService
 from app.catalog.services.product_service import ProductService
+from app.shared.responses import RawJSONResponse
 from app.shared.schemas.product import Product as ProductSchema
 
 router = APIRouter(prefix="/categories", tags=["categories"])
@@ -14,7 +15,7 @@ category_products_router = APIRouter(prefix="/{category_id}/products")
 
 @router.get("/", response_model=list[CategorySchema])
 async def get_categories(service: CategoryService = Depends(get_category_service)):
-    return await service.list_categories()
+    return RawJSONResponse(await service.list_categories())
 
 
 @router.post("/", response_model=CategorySchema, status_code=status.HTTP_201_CREATED)
@@ -47,7 +48,7 @@ async def get_products_by_category(
     category_id: int,
     service: ProductService = Depends(get_product_service),
 ):
-    return await service.list_by_category(category_id)
+    return RawJSONResponse(await service.list_by_category(category_id))
 
 
 router.include_router(category_products_router)
@@ -1,16 +1,17 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
 from fastapi import APIRouter, Depends, File, Query, UploadFile, status
 
-from app.auth import get_current_seller
+from app.auth import Principal, get_current_seller
 from app.catalog.deps import get_product_service, get_review_service
 from app.catalog.repositories.product_repository import ProductListFilters
 from app.catalog.schemas.product import ProductCreate, ProductList
 from app.catalog.schemas.review import Review as ReviewSchema
 from app.catalog.services.product_service import ProductService
 from app.catalog.services.review_service import ReviewService
-from app.models.users import User as UserModel
+from app.shared.responses import RawJSONResponse, serialize
 from app.shared.schemas.product import Product as ProductSchema
+from app.shared.schemas.sparse import FIELDS_DESCRIPTION, parse_fields
 
 router = APIRouter(prefix="/products", tags=["products"])
 
@@ -21,6 +22,10 @@ product_reviews_router = APIRouter(prefix="/{product_id}/reviews")
 async def get_all_products(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(
+        None,
+        description="Курсор из next_cursor предыдущего ответа (вместо page)",
+    ),
     category_id: int | None = Query(None, description="ID категории для фильтрации"),
     search: str | None = Query(
         None, min_length=1, description="Поиск по названию/описанию"
@@ -31,6 +36,15 @@ async def get_all_products(
         None, description="true — только товары в наличии, false — только без остатка"
     ),
     seller_id: int | None = Query(None, description="ID продавца для фильтрации"),
+    include_total: bool = Query(
+        True, description="false — не считать total (для бесконечной прокрутки)"
+    ),
+    total_mode: Literal["exact", "estimated"] = Query(
+        "exact",
+        description="estimated — оценка планировщика для листинга без фильтров "
+        "или только по категории",
+    ),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
     service: ProductService = Depends(get_product_service),
 ):
     filters = ProductListFilters(
@@ -42,16 +56,19 @@ async def get_all_products(
         max_price=max_price,
         in_stock=in_stock,
         seller_id=seller_id,
+        cursor=cursor,
+        include_total=include_total,
+        total_mode=total_mode,
+        fields=parse_fields(fields, ProductSchema),
     )
-    items, total = await service.list_products(filters)
-    return {"items": items, "total": total, "page": page, "page_size": page_size}
+    return RawJSONResponse(await service.list_products(filters))
 
 
 @router.post("/", response_model=ProductSchema, status_code=status.HTTP_201_CREATED)
 async def create_product(
     product: ProductCreate = Depends(ProductCreate.as_form),
     image: Annotated[UploadFile | None, File()] = None,
-    current_user: UserModel = Depends(get_current_seller),
+    current_user: Principal = Depends(get_current_seller),
     service: ProductService = Depends(get_product_service),
 ):
     return await service.create(product, current_user.id, image)
@@ -60,9 +77,12 @@ async def create_product(
 @router.get("/{product_id}", response_model=ProductSchema)
 async def get_product(
     product_id: int,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
     service: ProductService = Depends(get_product_service),
 ):
-    return await service.get_product(product_id)
+    return RawJSONResponse(
+        await service.get_product(product_id, parse_fields(fields, ProductSchema))
+    )
 
 
 @router.put("/{product_id}", response_model=ProductSchema)
@@ -70,7 +90,7 @@ async def update_product(
     product_id: int,
     product: ProductCreate = Depends(ProductCreate.as_form),
     image: UploadFile | None = File(None),
-    current_user: UserModel = Depends(get_current_seller),
+    current_user: Principal = Depends(get_current_seller),
     service: ProductService = Depends(get_product_service),
 ):
     return await service.update(product_id, product, current_user.id, image)
@@ -79,7 +99,7 @@ async def update_product(
 @router.delete("/{product_id}", status_code=status.HTTP_200_OK)
 async def delete_product(
     product_id: int,
-    current_user: UserModel = Depends(get_current_seller),
+    current_user: Principal = Depends(get_current_seller),
     service: ProductService = Depends(get_product_service),
 ):
     return await service.delete(product_id, current_user.id)
@@ -90,7 +110,7 @@ async def get_reviews_by_product(
     product_id: int,
     service: ReviewService = Depends(get_review_service),
 ):
-    return await service.list_by_product(product_id)
+    return serialize(list[ReviewSchema], await service.list_by_product(product_id))
 
 
 router.include_router(product_reviews_router)
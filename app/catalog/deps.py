@@ -1,14 +1,19 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.catalog.repositories.catalog_cache import CatalogCache
 from app.catalog.repositories.category_repository import CategoryRepository
+from app.catalog.repositories.product_count_cache import ProductCountCache
 from app.catalog.repositories.product_repository import ProductRepository
 from app.catalog.repositories.review_repository import ReviewRepository
 from app.catalog.services.category_service import CategoryService
 from app.catalog.services.image_storage import ImageStorage
 from app.catalog.services.product_service import ProductService
 from app.catalog.services.review_service import ReviewService
-from app.db.deps import get_async_db
+from app.catalog.services.stock_counter import HotStockCounter
+from app.config import SettingsDep
+from app.db.deps import get_async_db, get_redis
+from app.hot_stock import get_hot_stock_store
 
 _image_storage = ImageStorage()
 
@@ -31,26 +36,49 @@ def get_review_repository(
     return ReviewRepository(db)
 
 
+def get_product_count_cache(
+    settings: SettingsDep,
+    redis=Depends(get_redis),
+) -> ProductCountCache:
+    return ProductCountCache(redis, settings.product_count_cache_ttl)
+
+
+def get_catalog_cache(
+    settings: SettingsDep,
+    redis=Depends(get_redis),
+) -> CatalogCache:
+    return CatalogCache(
+        redis,
+        ttl=settings.catalog_cache_ttl,
+        lock_timeout=settings.catalog_cache_lock_timeout,
+    )
+
+
 def get_image_storage() -> ImageStorage:
     return _image_storage
 
 
 def get_category_service(
     categories: CategoryRepository = Depends(get_category_repository),
+    cache: CatalogCache = Depends(get_catalog_cache),
 ) -> CategoryService:
-    return CategoryService(categories)
+    return CategoryService(categories, cache)
 
 
 def get_product_service(
     products: ProductRepository = Depends(get_product_repository),
     categories: CategoryRepository = Depends(get_category_repository),
     images: ImageStorage = Depends(get_image_storage),
+    counts: ProductCountCache = Depends(get_product_count_cache),
+    cache: CatalogCache = Depends(get_catalog_cache),
+    hot_stock: HotStockCounter | None = Depends(get_hot_stock_store),
 ) -> ProductService:
-    return ProductService(products, categories, images)
+    return ProductService(products, categories, images, counts, cache, hot_stock)
 
 
 def get_review_service(
     reviews: ReviewRepository = Depends(get_review_repository),
     products: ProductRepository = Depends(get_product_repository),
+    cache: CatalogCache = Depends(get_catalog_cache),
 ) -> ReviewService:
-    return ReviewService(reviews, products)
+    return ReviewService(reviews, products, cache)
@@ -51,6 +51,14 @@ class InvalidPriceRangeError(CatalogError):
         )
 
 
+class InvalidCursorError(CatalogError):
+    def __init__(self) -> None:
+        super().__init__(
+            "Invalid pagination cursor",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+
 class ProductAccessDeniedError(CatalogError):
     def __init__(self, detail: str) -> None:
         super().__init__(detail, status_code=status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,37 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+
+from app.catalog.exceptions import InvalidCursorError
+
+
+@dataclass(frozen=True)
+class ProductCursor:
+    """Позиция keyset-пагинации: последний отданный id (и rank для поиска)."""
+
+    id: int
+    rank: float | None = None
+
+    def encode(self) -> str:
+        payload: dict = {"id": self.id}
+        if self.rank is not None:
+            payload["rank"] = self.rank
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    @classmethod
+    def decode(cls, value: str) -> "ProductCursor":
+        padded = value + "=" * (-len(value) % 4)
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(padded))
+            cursor_id = payload["id"]
+            rank = payload.get("rank")
+        except (binascii.Error, ValueError, TypeError, KeyError, AttributeError):
+            raise InvalidCursorError from None
+
+        if not isinstance(cursor_id, int) or isinstance(cursor_id, bool):
+            raise InvalidCursorError
+        if rank is not None and not isinstance(rank, (int, float)):
+            raise InvalidCursorError
+        return cls(id=cursor_id, rank=float(rank) if rank is not None else None)
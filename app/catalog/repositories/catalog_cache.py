@@ -0,0 +1,179 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from uuid import uuid4
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+type CacheLoader = Callable[[], Awaitable[tuple[str, Iterable[str]]]]
+
+ALL_PRODUCTS_TAG = "products:all"
+CATEGORIES_TAG = "categories"
+
+_LOCK_POLL_INTERVAL = 0.05
+_SEQUENCE_KEY = "catalog:invalidations"
+
+# KEYS: счётчик инвалидаций, версии тегов...; ARGV: ttl.
+# Версия тега — номер последней инвалидации, которая его задела.
+_BUMP_LUA = """
+local seq = redis.call('INCR', KEYS[1])
+for i = 2, #KEYS do
+  redis.call('SET', KEYS[i], seq, 'EX', ARGV[1])
+end
+return seq
+"""
+
+# KEYS: запись, теги..., версии тегов (в том же порядке); ARGV: значение,
+# ttl, номер инвалидации до загрузки. Запись не сохраняется, если после
+# начала загрузки инвалидировали хоть один её тег — данные уже устарели.
+_STORE_LUA = """
+local n = (#KEYS - 1) / 2
+for i = 1, n do
+  if tonumber(redis.call('GET', KEYS[1 + n + i]) or '0') > tonumber(ARGV[3]) then
+    return 0
+  end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+for i = 1, n do
+  redis.call('SADD', KEYS[1 + i], KEYS[1])
+  redis.call('EXPIRE', KEYS[1 + i], ARGV[2])
+end
+return 1
+"""
+
+
+def product_tag(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def category_tag(category_id: int) -> str:
+    return f"category:{category_id}"
+
+
+def seller_tag(seller_id: int) -> str:
+    return f"seller:{seller_id}"
+
+
+class CatalogCache:
+    """Кэш ответов каталога в Redis с инвалидацией по тегам.
+
+    Каждая запись — готовый JSON; теги (товар, категория, продавец) хранятся
+    как множества ключей. Промах защищён блокировкой: пересчитывает один
+    запрос, остальные ждут его результат не дольше lock_timeout.
+
+    Инвалидация, пришедшая во время загрузки, не должна перезаписаться
+    загруженными до неё данными: у каждого тега есть версия (номер
+    последней инвалидации), и запись сохраняется, только если ни один её
+    тег не менялся после снимка счётчика, сделанного до загрузки.
+    """
+
+    def __init__(self, redis: Redis, *, ttl: int, lock_timeout: float) -> None:
+        self._redis = redis
+        self._ttl = ttl
+        self._lock_timeout = lock_timeout
+        self._bump = redis.register_script(_BUMP_LUA)
+        self._store_if_current = redis.register_script(_STORE_LUA)
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"catalog:cache:{key}"
+
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"catalog:tag:{tag}"
+
+    @staticmethod
+    def _version_key(tag: str) -> str:
+        return f"catalog:tagver:{tag}"
+
+    async def get_or_load(self, key: str, load: CacheLoader) -> str:
+        if self._ttl <= 0:
+            value, _ = await load()
+            return value
+
+        cache_key = self._key(key)
+        try:
+            cached, sequence = await self._redis.mget(cache_key, _SEQUENCE_KEY)
+            if cached is not None:
+                return cached
+
+            lock_key = f"{cache_key}:lock"
+            token = uuid4().hex
+            locked = await self._redis.set(
+                lock_key, token, nx=True, px=int(self._lock_timeout * 1000)
+            )
+            if not locked:
+                cached = await self._wait_for(cache_key, lock_key)
+                if cached is not None:
+                    return cached
+        except RedisError as exc:
+            logger.warning("Catalog cache read failed: {}", exc)
+            value, _ = await load()
+            return value
+
+        try:
+            value, tags = await load()
+            if locked:
+                await self._store(cache_key, value, tags, sequence or "0")
+            return value
+        finally:
+            if locked:
+                await self._release(lock_key, token)
+
+    async def invalidate(self, *tags: str) -> None:
+        if not tags or self._ttl <= 0:
+            return
+        tags = set(tags)
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            # Сначала версии: загрузка, начатая до этого, уже не сохранится,
+            # а сохранённая раньше попадёт в SMEMBERS ниже.
+            await self._bump(
+                keys=[_SEQUENCE_KEY, *map(self._version_key, tags)],
+                args=[self._ttl],
+            )
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                members = await pipe.execute()
+            keys = set().union(*members)
+            await self._redis.delete(*keys, *tag_keys)
+        except RedisError as exc:
+            logger.warning("Catalog cache invalidation failed: {}", exc)
+
+    async def _wait_for(self, cache_key: str, lock_key: str) -> str | None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._lock_timeout
+        while loop.time() < deadline:
+            await asyncio.sleep(_LOCK_POLL_INTERVAL)
+            cached, lock = await self._redis.mget(cache_key, lock_key)
+            if cached is not None:
+                return cached
+            if lock is None:
+                # Держатель блокировки упал с ошибкой — считаем сами.
+                return None
+        return None
+
+    async def _store(
+        self, cache_key: str, value: str, tags: Iterable[str], sequence: str
+    ) -> None:
+        tags = set(tags)
+        try:
+            await self._store_if_current(
+                keys=[
+                    cache_key,
+                    *map(self._tag_key, tags),
+                    *map(self._version_key, tags),
+                ],
+                args=[value, self._ttl, sequence],
+            )
+        except RedisError as exc:
+            logger.warning("Catalog cache write failed: {}", exc)
+
+    async def _release(self, lock_key: str, token: str) -> None:
+        try:
+            if await self._redis.get(lock_key) == token:
+                await self._redis.delete(lock_key)
+        except RedisError as exc:
+            logger.warning("Catalog cache unlock failed: {}", exc)
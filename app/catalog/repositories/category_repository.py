@@ -2,6 +2,7 @@ from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.db.routing import reads_from_replica
 from app.models.categories import Category as CategoryModel
 
 _CATEGORY_WITH_PARENT = (selectinload(CategoryModel.parent),)
@@ -11,6 +12,7 @@ class CategoryRepository:
     def __init__(self, db: AsyncSession) -> None:
         self._db = db
 
+    @reads_from_replica
     async def list_active(self) -> list[CategoryModel]:
         result = await self._db.scalars(
             select(CategoryModel)
@@ -0,0 +1,34 @@
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+
+class ProductCountCache:
+    """Кэш точного total листинга товаров в Redis с коротким TTL.
+
+    Кэш необязателен: при недоступном Redis листинг просто считает COUNT.
+    """
+
+    def __init__(self, redis: Redis, ttl: int) -> None:
+        self._redis = redis
+        self._ttl = ttl
+
+    @staticmethod
+    def _key(filters_key: str) -> str:
+        return f"catalog:products:count:{filters_key}"
+
+    async def get(self, filters_key: str) -> int | None:
+        try:
+            value = await self._redis.get(self._key(filters_key))
+        except RedisError as exc:
+            logger.warning("Product count cache read failed: {}", exc)
+            return None
+        return int(value) if value is not None else None
+
+    async def set(self, filters_key: str, total: int) -> None:
+        if self._ttl <= 0:
+            return
+        try:
+            await self._redis.set(self._key(filters_key), str(total), ex=self._ttl)
+        except RedisError as exc:
+            logger.warning("Product count cache write failed: {}", exc)
@@ -1,13 +1,35 @@
+import hashlib
+import json
 from dataclasses import dataclass
+from typing import Literal
 
-from sqlalchemy import desc, func, select, update
+from sqlalchemy import and_, cast, desc, func, literal, or_, select, text, update
+from sqlalchemy.dialects.postgresql import REAL
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.catalog.exceptions import InvalidCursorError
+from app.catalog.pagination import ProductCursor
+from app.db.routing import reads_from_replica
+from app.db.utils import load_only_fields
 from app.models.products import Product as ProductModel
+from app.shared.schemas.sparse import FieldSet
 
 _PRODUCT_WITH_CATEGORY = (selectinload(ProductModel.category),)
 
+# Нужны сервису при любом ?fields=: курсор и теги кэша.
+_ALWAYS_LOADED = ("id", "category_id", "seller_id")
+
+
+def _product_options(fields: FieldSet) -> tuple:
+    """Колонки под запрошенные поля; категория — только если её просили."""
+    if fields is None:
+        return _PRODUCT_WITH_CATEGORY
+    options = [load_only_fields(ProductModel, fields, always=_ALWAYS_LOADED)]
+    if "category" in fields:
+        options.append(selectinload(ProductModel.category))
+    return tuple(options)
+
 
 @dataclass
 class ProductListFilters:
@@ -19,6 +41,42 @@ class ProductListFilters:
     max_price: float | None = None
     in_stock: bool | None = None
     seller_id: int | None = None
+    cursor: str | None = None
+    include_total: bool = True
+    total_mode: Literal["exact", "estimated"] = "exact"
+    fields: FieldSet = None
+
+    def count_key(self) -> str:
+        """Нормализованный ключ набора фильтров (без пагинации) для кэша total."""
+        search = " ".join(self.search.split()).lower() if self.search else None
+        payload = {
+            "category_id": self.category_id,
+            "search": search or None,
+            "min_price": self.min_price,
+            "max_price": self.max_price,
+            "in_stock": self.in_stock,
+            "seller_id": self.seller_id,
+        }
+        raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    @property
+    def is_estimable(self) -> bool:
+        return (
+            not (self.search and self.search.strip())
+            and self.min_price is None
+            and self.max_price is None
+            and self.in_stock is None
+            and self.seller_id is None
+        )
+
+
+@dataclass
+class ProductPage:
+    items: list[ProductModel]
+    total: int | None = None
+    total_estimated: bool = False
+    next_cursor: ProductCursor | None = None
 
 
 class ProductRepository:
@@ -26,7 +84,7 @@ class ProductRepository:
         self._db = db
 
     def _build_filters(self, filters: ProductListFilters) -> list:
-        conditions = [ProductModel.is_active.is_(True)]
+        conditions = [ProductModel.is_active]
         if filters.category_id is not None:
             conditions.append(ProductModel.category_id == filters.category_id)
         if filters.min_price is not None:
@@ -41,43 +99,100 @@ class ProductRepository:
             conditions.append(ProductModel.seller_id == filters.seller_id)
         return conditions
 
-    async def list_filtered(self, filters: ProductListFilters) -> tuple[list, int]:
+    def _search_rank(self, filters: ProductListFilters, conditions: list):
+        if not filters.search:
+            return None
+        search_value = filters.search.strip()
+        if not search_value:
+            return None
+        ts_query = func.websearch_to_tsquery("english", search_value)
+        conditions.append(ProductModel.tsv.op("@@")(ts_query))
+        return func.ts_rank_cd(ProductModel.tsv, ts_query)
+
+    def _list_stmt(self, filters: ProductListFilters, after: ProductCursor | None):
         conditions = self._build_filters(filters)
-        rank_col = None
-
-        if filters.search:
-            search_value = filters.search.strip()
-            if search_value:
-                ts_query = func.websearch_to_tsquery("english", search_value)
-                conditions.append(ProductModel.tsv.op("@@")(ts_query))
-                rank_col = func.ts_rank_cd(ProductModel.tsv, ts_query).label("rank")
+        rank_expr = self._search_rank(filters, conditions)
+        options = _product_options(filters.fields)
 
-        total_stmt = select(func.count()).select_from(ProductModel).where(*conditions)
-        total = await self._db.scalar(total_stmt) or 0
-
-        if rank_col is not None:
+        if rank_expr is not None:
             stmt = (
-                select(ProductModel, rank_col)
+                select(ProductModel, rank_expr.label("rank"))
+                .options(*options)
                 .where(*conditions)
-                .order_by(desc(rank_col), ProductModel.id)
-                .offset((filters.page - 1) * filters.page_size)
-                .limit(filters.page_size)
+                .order_by(desc(rank_expr), ProductModel.id)
             )
-            result = await self._db.execute(stmt)
-            items = [row[0] for row in result.all()]
+            if after is not None:
+                if after.rank is None:
+                    raise InvalidCursorError
+                after_rank = cast(literal(after.rank), REAL)
+                stmt = stmt.where(
+                    or_(
+                        rank_expr < after_rank,
+                        and_(rank_expr == after_rank, ProductModel.id > after.id),
+                    )
+                )
         else:
             stmt = (
                 select(ProductModel)
-                .options(*_PRODUCT_WITH_CATEGORY)
+                .options(*options)
                 .where(*conditions)
                 .order_by(ProductModel.id)
-                .offset((filters.page - 1) * filters.page_size)
-                .limit(filters.page_size)
             )
+            if after is not None:
+                stmt = stmt.where(ProductModel.id > after.id)
+
+        if after is None:
+            stmt = stmt.offset((filters.page - 1) * filters.page_size)
+        # Лишняя строка показывает, есть ли следующая страница, без COUNT.
+        return stmt.limit(filters.page_size + 1), rank_expr is not None
+
+    @reads_from_replica
+    async def list_filtered(
+        self, filters: ProductListFilters, *, after: ProductCursor | None = None
+    ) -> ProductPage:
+        stmt, ranked = self._list_stmt(filters, after)
+
+        if ranked:
+            rows = (await self._db.execute(stmt)).all()
+            items = [row[0] for row in rows]
+            ranks = [row[1] for row in rows]
+        else:
             items = list((await self._db.scalars(stmt)).all())
+            ranks = None
+
+        next_cursor = None
+        if len(items) > filters.page_size:
+            items = items[: filters.page_size]
+            last = items[-1]
+            next_cursor = ProductCursor(
+                id=last.id,
+                rank=ranks[filters.page_size - 1] if ranks is not None else None,
+            )
 
-        return items, total
+        return ProductPage(items=items, next_cursor=next_cursor)
 
+    @reads_from_replica
+    async def count_filtered(self, filters: ProductListFilters) -> int:
+        conditions = self._build_filters(filters)
+        self._search_rank(filters, conditions)
+        stmt = select(func.count()).select_from(ProductModel).where(*conditions)
+        return await self._db.scalar(stmt) or 0
+
+    @reads_from_replica
+    async def estimate_count(self, filters: ProductListFilters) -> int | None:
+        """Оценка числа строк из плана Postgres; None — если оценить нельзя."""
+        if self._db.bind.dialect.name != "postgresql":
+            return None
+        stmt = select(ProductModel.id).where(*self._build_filters(filters))
+        compiled = stmt.compile(
+            dialect=self._db.bind.dialect, compile_kwargs={"literal_binds": True}
+        )
+        plan = await self._db.scalar(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @reads_from_replica
     async def list_by_category(self, category_id: int) -> list[ProductModel]:
         result = await self._db.scalars(
             select(ProductModel)
@@ -86,14 +201,26 @@ class ProductRepository:
         )
         return list(result.all())
 
-    async def get_active_by_id(self, product_id: int) -> ProductModel | None:
+    async def get_active_by_id(
+        self, product_id: int, *, fields: FieldSet = None
+    ) -> ProductModel | None:
         result = await self._db.scalars(
             select(ProductModel)
-            .options(*_PRODUCT_WITH_CATEGORY)
+            .options(*_product_options(fields))
             .where(ProductModel.id == product_id, ProductModel.is_active)
         )
         return result.first()
 
+    async def get_active_ids(self, product_ids: set[int]) -> set[int]:
+        if not product_ids:
+            return set()
+        result = await self._db.scalars(
+            select(ProductModel.id).where(
+                ProductModel.id.in_(product_ids), ProductModel.is_active
+            )
+        )
+        return set(result.all())
+
     async def get_with_category(self, product_id: int) -> ProductModel | None:
         return await self.get_active_by_id(product_id)
 
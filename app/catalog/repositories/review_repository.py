@@ -2,6 +2,7 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.db.routing import reads_from_replica
 from app.models.reviews import Review as ReviewModel
 
 _REVIEW_WITH_RELATIONS = (
@@ -14,6 +15,7 @@ class ReviewRepository:
     def __init__(self, db: AsyncSession) -> None:
         self._db = db
 
+    @reads_from_replica
     async def list_active(self) -> list[ReviewModel]:
         result = await self._db.scalars(
             select(ReviewModel)
@@ -22,6 +24,7 @@ class ReviewRepository:
         )
         return list(result.all())
 
+    @reads_from_replica
     async def list_by_product(self, product_id: int) -> list[ReviewModel]:
         result = await self._db.scalars(
             select(ReviewModel)
@@ -1,11 +1,13 @@
 from decimal import Decimal
+from functools import lru_cache
 from typing import Annotated
 
 from fastapi import Form
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
 
 from app.shared.schemas.pagination import PaginationResponse
 from app.shared.schemas.product import Product
+from app.shared.schemas.sparse import FieldSet, sparse_model
 
 
 class ProductCreate(BaseModel):
@@ -48,4 +50,25 @@ class ProductCreate(BaseModel):
         )
 
 
-type ProductList = PaginationResponse[Product]
+class ProductList(PaginationResponse[Product]):
+    total: int | None = Field(
+        None, ge=0, description="Общее количество; null, если не запрашивалось"
+    )
+    total_estimated: bool = Field(
+        False, description="true — total является оценкой планировщика"
+    )
+    next_cursor: str | None = Field(
+        None, description="Курсор следующей страницы; null — страниц больше нет"
+    )
+
+
+@lru_cache(maxsize=256)
+def product_list_schema(fields: FieldSet) -> type[ProductList]:
+    """ProductList, где у товаров только поля из fields."""
+    if fields is None:
+        return ProductList
+    return create_model(
+        "ProductListSparse",
+        __base__=ProductList,
+        items=(list[sparse_model(Product, fields)], Field(...)),
+    )
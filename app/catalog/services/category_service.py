@@ -1,19 +1,38 @@
+from pydantic import TypeAdapter
+
 from app.catalog.exceptions import (
     CategoryNotFoundError,
     CategorySelfParentError,
     ParentCategoryNotFoundError,
 )
+from app.catalog.repositories.catalog_cache import (
+    CATEGORIES_TAG,
+    CatalogCache,
+    category_tag,
+)
 from app.catalog.repositories.category_repository import CategoryRepository
+from app.catalog.schemas.category import Category as CategorySchema
 from app.catalog.schemas.category import CategoryCreate
 from app.models.categories import Category as CategoryModel
 
+_CATEGORY_LIST_ADAPTER = TypeAdapter(list[CategorySchema])
+
 
 class CategoryService:
-    def __init__(self, categories: CategoryRepository) -> None:
+    def __init__(self, categories: CategoryRepository, cache: CatalogCache) -> None:
         self._categories = categories
+        self._cache = cache
+
+    async def list_categories(self) -> str:
+        """JSON списка категорий как есть из кэша."""
+
+        async def load() -> tuple[str, list[str]]:
+            categories = await self._categories.list_active()
+            return _CATEGORY_LIST_ADAPTER.dump_json(
+                _CATEGORY_LIST_ADAPTER.validate_python(categories, from_attributes=True)
+            ).decode(), [CATEGORIES_TAG]
 
-    async def list_categories(self) -> list[CategoryModel]:
-        return await self._categories.list_active()
+        return await self._cache.get_or_load("categories", load)
 
     async def _validate_parent(self, parent_id: int | None) -> None:
         if parent_id is None:
@@ -27,6 +46,7 @@ class CategoryService:
         category = CategoryModel(**data.model_dump())
         await self._categories.add(category)
         await self._categories.commit()
+        await self._cache.invalidate(CATEGORIES_TAG)
         loaded = await self._categories.get_with_parent(category.id)
         return loaded or category
 
@@ -45,6 +65,7 @@ class CategoryService:
         update_data = data.model_dump(exclude_unset=True)
         await self._categories.update_fields(category_id, update_data)
         await self._categories.commit()
+        await self._cache.invalidate(CATEGORIES_TAG, category_tag(category_id))
         loaded = await self._categories.get_with_parent(category_id)
         return loaded or category
 
@@ -55,4 +76,5 @@ class CategoryService:
 
         await self._categories.soft_delete(category_id)
         await self._categories.commit()
+        await self._cache.invalidate(CATEGORIES_TAG, category_tag(category_id))
         return category
@@ -1,4 +1,5 @@
 from fastapi import UploadFile
+from pydantic import TypeAdapter
 
 from app.catalog.exceptions import (
     CatalogProductNotFoundError,
@@ -7,14 +8,45 @@ from app.catalog.exceptions import (
     InvalidPriceRangeError,
     ProductAccessDeniedError,
 )
+from app.catalog.pagination import ProductCursor
+from app.catalog.repositories.catalog_cache import (
+    ALL_PRODUCTS_TAG,
+    CatalogCache,
+    category_tag,
+    product_tag,
+    seller_tag,
+)
 from app.catalog.repositories.category_repository import CategoryRepository
+from app.catalog.repositories.product_count_cache import ProductCountCache
 from app.catalog.repositories.product_repository import (
     ProductListFilters,
     ProductRepository,
 )
-from app.catalog.schemas.product import ProductCreate
+from app.catalog.schemas.product import ProductCreate, product_list_schema
 from app.catalog.services.image_storage import ImageStorage
+from app.catalog.services.stock_counter import HotStockCounter
 from app.models.products import Product as ProductModel
+from app.shared.schemas.product import Product as ProductSchema
+from app.shared.schemas.sparse import FieldSet, fields_key, sparse_model
+
+_PRODUCT_LIST_ADAPTER = TypeAdapter(list[ProductSchema])
+
+
+def _product_tags(product: ProductModel) -> list[str]:
+    return [
+        product_tag(product.id),
+        category_tag(product.category_id),
+        seller_tag(product.seller_id),
+        ALL_PRODUCTS_TAG,
+    ]
+
+
+def _list_scope_tag(filters: ProductListFilters) -> str:
+    if filters.category_id is not None:
+        return category_tag(filters.category_id)
+    if filters.seller_id is not None:
+        return seller_tag(filters.seller_id)
+    return ALL_PRODUCTS_TAG
 
 
 class ProductService:
@@ -23,35 +55,101 @@ class ProductService:
         products: ProductRepository,
         categories: CategoryRepository,
         images: ImageStorage,
+        counts: ProductCountCache,
+        cache: CatalogCache,
+        hot_stock: HotStockCounter | None,
     ) -> None:
         self._products = products
         self._categories = categories
         self._images = images
+        self._counts = counts
+        self._cache = cache
+        self._hot_stock = hot_stock
 
-    async def list_products(self, filters: ProductListFilters) -> tuple[list, int]:
+    async def list_products(self, filters: ProductListFilters) -> str:
+        """JSON страницы (ProductList) как есть из кэша — без разбора в модели."""
         if (
             filters.min_price is not None
             and filters.max_price is not None
             and filters.min_price > filters.max_price
         ):
             raise InvalidPriceRangeError
-        return await self._products.list_filtered(filters)
-
-    async def list_by_category(self, category_id: int) -> list[ProductModel]:
-        category = await self._categories.get_active_by_id(category_id)
-        if category is None:
-            raise CategoryNotFoundError
-        return await self._products.list_by_category(category_id)
-
-    async def get_product(self, product_id: int) -> ProductModel:
-        product = await self._products.get_active_by_id(product_id)
-        if product is None:
-            raise CatalogProductNotFoundError()
-
-        category = await self._categories.get_by_id(product.category_id)
-        if category is None:
-            raise InactiveCategoryError("Category not found")
-        return product
+        after = ProductCursor.decode(filters.cursor) if filters.cursor else None
+
+        async def load() -> tuple[str, list[str]]:
+            page = await self._products.list_filtered(filters, after=after)
+            if filters.include_total:
+                page.total, page.total_estimated = await self._count_products(filters)
+            item_schema = sparse_model(ProductSchema, filters.fields)
+            result = product_list_schema(filters.fields)(
+                items=[item_schema.model_validate(item) for item in page.items],
+                total=page.total,
+                total_estimated=page.total_estimated,
+                page=filters.page,
+                page_size=filters.page_size,
+                next_cursor=page.next_cursor.encode() if page.next_cursor else None,
+            )
+            tags = [_list_scope_tag(filters)]
+            for item in page.items:
+                tags += [product_tag(item.id), category_tag(item.category_id)]
+            return result.model_dump_json(), tags
+
+        key = (
+            f"products:{filters.count_key()}:{filters.page}:{filters.page_size}:"
+            f"{filters.cursor or ''}:{int(filters.include_total)}:{filters.total_mode}:"
+            f"{fields_key(filters.fields)}"
+        )
+        return await self._cache.get_or_load(key, load)
+
+    async def _count_products(self, filters: ProductListFilters) -> tuple[int, bool]:
+        if filters.total_mode == "estimated" and filters.is_estimable:
+            estimate = await self._products.estimate_count(filters)
+            if estimate is not None:
+                return estimate, True
+
+        key = filters.count_key()
+        total = await self._counts.get(key)
+        if total is None:
+            total = await self._products.count_filtered(filters)
+            await self._counts.set(key, total)
+        return total, False
+
+    async def list_by_category(self, category_id: int) -> str:
+        """JSON списка товаров категории как есть из кэша."""
+
+        async def load() -> tuple[str, list[str]]:
+            category = await self._categories.get_active_by_id(category_id)
+            if category is None:
+                raise CategoryNotFoundError
+            products = await self._products.list_by_category(category_id)
+            # Как и в листинге: рейтинг и остаток меняются без правки товара,
+            # и сбрасывают только его тег.
+            tags = [category_tag(category_id)]
+            tags += [product_tag(product.id) for product in products]
+            return _PRODUCT_LIST_ADAPTER.dump_json(
+                _PRODUCT_LIST_ADAPTER.validate_python(products, from_attributes=True)
+            ).decode(), tags
+
+        return await self._cache.get_or_load(f"category:{category_id}:products", load)
+
+    async def get_product(self, product_id: int, fields: FieldSet = None) -> str:
+        """JSON товара из кэша; fields сужает и колонки, и ответ."""
+
+        async def load() -> tuple[str, list[str]]:
+            product = await self._products.get_active_by_id(product_id, fields=fields)
+            if product is None:
+                raise CatalogProductNotFoundError()
+
+            category = await self._categories.get_by_id(product.category_id)
+            if category is None:
+                raise InactiveCategoryError("Category not found")
+            schema = sparse_model(ProductSchema, fields).model_validate(product)
+            return schema.model_dump_json(), _product_tags(product)
+
+        key = f"product:{product_id}"
+        if fields is not None:
+            key += f":{fields_key(fields)}"
+        return await self._cache.get_or_load(key, load)
 
     async def _ensure_active_category(self, category_id: int) -> None:
         category = await self._categories.get_active_by_id(category_id)
@@ -72,6 +170,7 @@ class ProductService:
         )
         await self._products.add(product)
         await self._products.commit()
+        await self._cache.invalidate(*_product_tags(product))
         loaded = await self._products.get_with_category(product.id)
         return loaded or product
 
@@ -93,16 +192,37 @@ class ProductService:
         if category is None:
             raise InactiveCategoryError("Category not found")
 
-        await self._products.update_fields(product_id, data.model_dump())
-
-        if image:
-            self._images.remove_product_image(product.image_url)
-            product.image_url = await self._images.save_product_image(image)
-
-        await self._products.commit()
+        stale_tags = _product_tags(product)
+        values = data.model_dump()
+        delta = data.stock - product.stock
+        # У «горячего» товара checkout идёт мимо products.stock: правку
+        # продавца переносим в счётчик той же разницей, а в БД пишем
+        # относительно, чтобы не затереть параллельную сверку.
+        hot = await self._adjust_hot_stock(product_id, delta)
+        if hot:
+            values["stock"] = ProductModel.stock + delta
+
+        try:
+            await self._products.update_fields(product_id, values)
+
+            if image:
+                self._images.remove_product_image(product.image_url)
+                product.image_url = await self._images.save_product_image(image)
+
+            await self._products.commit()
+        except BaseException:
+            if hot:
+                await self._hot_stock.adjust(product_id, -delta)
+            raise
+        await self._cache.invalidate(*stale_tags, category_tag(data.category_id))
         loaded = await self._products.get_with_category(product_id)
         return loaded or product
 
+    async def _adjust_hot_stock(self, product_id: int, delta: int) -> bool:
+        if self._hot_stock is None or not delta:
+            return False
+        return await self._hot_stock.adjust(product_id, delta)
+
     async def delete(self, product_id: int, seller_id: int) -> ProductModel:
         product = await self._products.get_active_by_id(product_id)
         if product is None:
@@ -114,5 +234,6 @@ class ProductService:
         await self._products.soft_delete(product_id)
         self._images.remove_product_image(product.image_url)
         await self._products.commit()
+        await self._cache.invalidate(*_product_tags(product))
         loaded = await self._products.get_with_category(product_id)
         return loaded or product
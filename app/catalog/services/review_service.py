@@ -1,4 +1,5 @@
 from app.catalog.exceptions import CatalogProductNotFoundError, ReviewNotFoundError
+from app.catalog.repositories.catalog_cache import CatalogCache, product_tag
 from app.catalog.repositories.product_repository import ProductRepository
 from app.catalog.repositories.review_repository import ReviewRepository
 from app.catalog.schemas.review import ReviewCreate
@@ -10,9 +11,11 @@ class ReviewService:
         self,
         reviews: ReviewRepository,
         products: ProductRepository,
+        cache: CatalogCache,
     ) -> None:
         self._reviews = reviews
         self._products = products
+        self._cache = cache
 
     async def list_reviews(self) -> list[ReviewModel]:
         return await self._reviews.list_active()
@@ -53,3 +56,4 @@ class ReviewService:
             raise CatalogProductNotFoundError()
         await self._products.set_rating(product_id, avg_rating)
         await self._products.commit()
+        await self._cache.invalidate(product_tag(product_id))
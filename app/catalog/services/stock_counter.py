@@ -0,0 +1,9 @@
+from typing import Protocol
+
+
+class HotStockCounter(Protocol):
+    """Порт: каталог не знает про checkout в Redis, только «сдвинуть остаток»."""
+
+    async def adjust(self, product_id: int, delta: int) -> bool:
+        """Сдвигает «горячий» счётчик; False — товар не в этом режиме."""
+        ...
@@ -1,3 +1,4 @@
+from datetime import datetime
 from functools import lru_cache
 from typing import Annotated, Literal
 
@@ -14,12 +15,62 @@ class Settings(BaseSettings):
     )
 
     app_env: Literal["development", "production"] = "development"
+    # web — имя сервиса в compose: по нему Prometheus снимает /metrics.
+    allowed_hosts: list[str] = ["localhost", "127.0.0.1", "web"]
     secret_key: SecretStr
     algorithm: str = "HS256"
     database_url: str
+    database_echo: bool = False
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_timeout: float = 30.0
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = True
+    database_statement_cache_size: int = 100
+    database_pgbouncer: bool = False
+    database_replica_urls: list[str] = []
+    log_level: str = "INFO"
+    log_format: Literal["text", "json"] = "text"
+    log_enqueue: bool = True
+    log_sample_rate: float = 1.0
+    log_slow_request_threshold: float = 1.0
+    sql_slow_query_threshold: float = 0.1
+    sql_n_plus_one_threshold: int = 5
     redis_url: str
     celery_broker_url: str
     celery_result_backend: str
+    product_count_cache_ttl: int = 30
+    catalog_cache_ttl: int = 60
+    catalog_cache_lock_timeout: float = 5.0
+    bcrypt_rounds: int = 12
+    password_hash_executor: Literal["thread", "process"] = "thread"
+    password_hash_concurrency: int = 4
+    password_hash_max_queue: int = 64
+    principal_cache_ttl: int = 300
+    # До этого момента отзыв ищет через SCAN и refresh-токены, выданные до
+    # индекса refresh_index:{uid}: выкладка индекса + 7 дней (срок жизни токена).
+    refresh_legacy_scan_until: datetime | None = None
+    principal_local_cache_ttl: float = 10.0
+    principal_local_cache_size: int = 10_000
+    ws_stats_interval: float = 5.0
+    ws_send_queue_size: int = 64
+    ws_slow_consumer_policy: Literal["disconnect", "drop_oldest"] = "disconnect"
+    # Протокольный ping uvicorn под gunicorn, см. gunicorn.conf.py.
+    ws_ping_interval: float = 20.0
+    ws_ping_timeout: float = 20.0
+    ws_max_connections_per_user: int = 10
+    ws_max_connections_per_worker: int = 10_000
+    ws_event_stream_maxlen: int = 100
+    ws_event_retention: int = 86_400
+    sse_keepalive_interval: float = 15.0
+    # Retry-After в ответе 503, когда лимит SSE-подписок исчерпан.
+    sse_retry_after: int = 5
+    hot_inventory_enabled: bool = False
+    hot_inventory_hold_timeout: float = 30.0
+    # Пачка дельт старше этого считается брошенной и применяется повторно.
+    hot_inventory_batch_timeout: float = 60.0
+    hot_inventory_reconcile_interval: float = 1.0
+    hot_inventory_flush_batch: int = 500
 
     @property
     def jwt_secret(self) -> str:
@@ -1,9 +1,9 @@
 from collections.abc import AsyncGenerator
 
 from redis.client import Redis
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from app.db.session import async_session_maker
+from app.db.session import async_engine, async_session_maker
 from app.redis import redis_client
 
 
@@ -14,3 +14,7 @@ async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
 
 async def get_redis() -> AsyncGenerator[Redis, None]:
     yield redis_client
+
+
+def get_async_engine() -> AsyncEngine:
+    return async_engine
@@ -0,0 +1,95 @@
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.shared.metrics import (
+    DB_POOL_ACQUIRE_DURATION,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_TIMEOUTS,
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """QueuePool, который считает ожидание свободного соединения.
+
+    Время меряется вокруг выдачи соединения из пула: если оно растёт при
+    нормальной длительности запросов — упираемся в пул/БД, а не в код.
+    В ожидание входит и открытие нового соединения в пределах overflow.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.waiting -= 1
+            self.acquisitions += 1
+            self.wait_total += elapsed
+            self.wait_max = max(self.wait_max, elapsed)
+            DB_POOL_ACQUIRE_DURATION.observe(elapsed)
+        DB_POOL_CHECKED_OUT.inc()
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        DB_POOL_CHECKED_OUT.dec()
+        super()._do_return_conn(record)
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    pool: str
+    size: int | None = None
+    checked_out: int | None = None
+    checked_in: int | None = None
+    overflow: int | None = None
+    max_overflow: int | None = None
+    waiting: int | None = None
+    acquisitions: int | None = None
+    timeouts: int | None = None
+    wait_avg_ms: float | None = None
+    wait_max_ms: float | None = None
+
+
+def pool_stats(engine: AsyncEngine) -> PoolStats:
+    """Снимок пула; у пулов без очереди (SQLite) — только имя класса."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return PoolStats(pool=type(pool).__name__)
+    stats = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # overflow() отрицателен, пока пул не заполнен до pool_size.
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        acquisitions = pool.acquisitions
+        stats |= {
+            "waiting": pool.waiting,
+            "acquisitions": acquisitions,
+            "timeouts": pool.timeouts,
+            "wait_avg_ms": round(pool.wait_total / acquisitions * 1000, 3)
+            if acquisitions
+            else 0.0,
+            "wait_max_ms": round(pool.wait_max * 1000, 3),
+        }
+    return PoolStats(**stats)
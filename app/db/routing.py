@@ -0,0 +1,55 @@
+import random
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import wraps
+
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+READ_REPLICA = "read_replica"
+_WROTE = "wrote_to_primary"
+
+
+class RoutingSession(Session):
+    """Session, которая отправляет помеченные чтения на реплику.
+
+    Чтение идёт на реплику, только пока сессия ничего не писала: после
+    flush или DML-выражения она до конца жизни читает с primary, иначе
+    запрос не увидел бы собственную запись из-за лага репликации.
+    """
+
+    def __init__(self, *args, replicas: list[Engine] | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas or []
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info[_WROTE] = True
+        elif (
+            self.replicas and self.info.get(READ_REPLICA) and not self.info.get(_WROTE)
+        ):
+            return random.choice(self.replicas)
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@contextmanager
+def replica_reads(db: AsyncSession) -> Iterator[None]:
+    """Запросы внутри блока, включая selectinload, можно читать с реплики."""
+    previous = db.info.get(READ_REPLICA, False)
+    db.info[READ_REPLICA] = True
+    try:
+        yield
+    finally:
+        db.info[READ_REPLICA] = previous
+
+
+def reads_from_replica(method):
+    """Помечает метод репозитория (с сессией в self._db) как чистое чтение."""
+
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        with replica_reads(self._db):
+            return await method(self, *args, **kwargs)
+
+    return wrapper
@@ -1,11 +1,61 @@
+from uuid import uuid4
+
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
-from app.config import settings
+from app.config import Settings, settings
+from app.db.pool import InstrumentedQueuePool
+from app.db.routing import RoutingSession
+
+
+def engine_options(settings: Settings, url: str | None = None) -> dict:
+    """Параметры create_async_engine из настроек.
+
+    Для SQLite пул не настраивается — у него свой StaticPool/NullPool.
+    В режиме pgbouncer (transaction pooling) кэши prepared statements
+    asyncpg выключены, а имена выражений уникальны: соединение сервера
+    может достаться другому клиенту между транзакциями.
+    """
+    options: dict = {"echo": settings.database_echo}
+    url = make_url(url or settings.database_url)
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options |= {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout,
+        "pool_recycle": settings.database_pool_recycle,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+    }
+    if url.get_driver_name() == "asyncpg":
+        # Кэш prepared statements, который держит адаптер SQLAlchemy.
+        connect_args: dict = {
+            "prepared_statement_cache_size": settings.database_statement_cache_size
+        }
+        if settings.database_pgbouncer:
+            connect_args = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        options["connect_args"] = connect_args
+    return options
+
 
-async_engine = create_async_engine(settings.database_url, echo=True)
+async_engine = create_async_engine(settings.database_url, **engine_options(settings))
+replica_engines = [
+    create_async_engine(url, **engine_options(settings, url))
+    for url in settings.database_replica_urls
+]
 async_session_maker = async_sessionmaker(
-    async_engine, expire_on_commit=False, class_=AsyncSession
+    async_engine,
+    expire_on_commit=False,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=[engine.sync_engine for engine in replica_engines],
 )
 
 
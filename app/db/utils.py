@@ -1,5 +1,8 @@
+from collections.abc import Iterable
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 from sqlalchemy.orm.interfaces import LoaderOption
 
 from app.db.session import Base
@@ -18,3 +21,12 @@ async def get_by_id[M: Base](
         stmt = stmt.options(*options)
     result = await db.scalars(stmt)
     return result.first()
+
+
+def load_only_fields(
+    model: type[Base], fields: Iterable[str], *, always: Iterable[str] = ("id",)
+) -> LoaderOption:
+    """load_only по именам полей схемы; не-колонки (связи) пропускаются."""
+    columns = model.__table__.c
+    names = {*fields, *always}
+    return load_only(*(getattr(model, name) for name in names if name in columns))
@@ -3,6 +3,7 @@ from pathlib import Path
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
+from app.db.instrumentation import install_query_instrumentation
 from app.lifespan import lifespan
 from app.logging import setup_logging
 from app.middleware import setup_middleware
@@ -15,6 +16,7 @@ STATIC_DIR = Path("static")
 
 def create_app() -> FastAPI:
     setup_logging()
+    install_query_instrumentation()
 
     app = FastAPI(
         title="FastAPI интеренет-магазин",
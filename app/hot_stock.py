@@ -0,0 +1,21 @@
+"""Сборка «горячих» остатков: одна зависимость на каталог и заказы.
+
+Каталог видит только порт HotStockCounter, реализацию из ordering
+подставляет этот модуль.
+"""
+
+from fastapi import Depends
+from redis.asyncio import Redis
+
+from app.config import SettingsDep
+from app.db.deps import get_redis
+from app.ordering.repositories.hot_stock_store import HotStockStore
+
+
+def get_hot_stock_store(
+    settings: SettingsDep,
+    redis: Redis = Depends(get_redis),
+) -> HotStockStore | None:
+    if not settings.hot_inventory_enabled:
+        return None
+    return HotStockStore(redis)
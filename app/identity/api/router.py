@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.identity.deps import get_auth_service, get_user_service
+from app.identity.deps import get_auth_service, get_current_admin, get_user_service
+from app.identity.repositories.principal_cache import Principal
 from app.identity.schemas.user import User as UserSchema
-from app.identity.schemas.user import UserCreate
+from app.identity.schemas.user import UserAdminUpdate, UserCreate
 from app.identity.services.auth_service import AuthService
 from app.identity.services.token_service import REFRESH_COOKIE_MAX_AGE
 from app.identity.services.user_service import UserService
@@ -43,6 +44,16 @@ async def create_user(
     return await service.register(user)
 
 
+@router.patch("/{user_id}", response_model=UserSchema)
+async def update_user(
+    user_id: int,
+    payload: UserAdminUpdate,
+    current_user: Principal = Depends(get_current_admin),
+    service: UserService = Depends(get_user_service),
+):
+    return await service.update_status(user_id, payload)
+
+
 @router.post("/token")
 async def login(
     response: Response,
@@ -5,12 +5,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import SettingsDep
 from app.db.deps import get_async_db, get_redis
+from app.identity.repositories.principal_cache import (
+    Principal,
+    PrincipalCache,
+    local_principal_cache,
+)
 from app.identity.repositories.refresh_token_store import RefreshTokenStore
 from app.identity.repositories.user_repository import UserRepository
 from app.identity.services.auth_service import AuthService
+from app.identity.services.password_hasher import PasswordHasher, password_hasher
 from app.identity.services.token_service import decode_token
 from app.identity.services.user_service import UserService
-from app.models.users import User as UserModel
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/token")
 
@@ -21,29 +26,50 @@ def get_user_repository(
     return UserRepository(db)
 
 
-def get_refresh_token_store(redis=Depends(get_redis)) -> RefreshTokenStore:
-    return RefreshTokenStore(redis)
+def get_refresh_token_store(
+    settings: SettingsDep, redis=Depends(get_redis)
+) -> RefreshTokenStore:
+    until = settings.refresh_legacy_scan_until
+    return RefreshTokenStore(
+        redis, legacy_scan_until=until.timestamp() if until else None
+    )
+
+
+def get_principal_cache(
+    settings: SettingsDep, redis=Depends(get_redis)
+) -> PrincipalCache:
+    return PrincipalCache(
+        redis, local_principal_cache, ttl=settings.principal_cache_ttl
+    )
+
+
+def get_password_hasher() -> PasswordHasher:
+    return password_hasher
 
 
 def get_user_service(
     users: UserRepository = Depends(get_user_repository),
+    principals: PrincipalCache = Depends(get_principal_cache),
+    hasher: PasswordHasher = Depends(get_password_hasher),
 ) -> UserService:
-    return UserService(users)
+    return UserService(users, principals, hasher)
 
 
 def get_auth_service(
     settings: SettingsDep,
     users: UserRepository = Depends(get_user_repository),
     refresh_store: RefreshTokenStore = Depends(get_refresh_token_store),
+    hasher: PasswordHasher = Depends(get_password_hasher),
 ) -> AuthService:
-    return AuthService(users, refresh_store, settings)
+    return AuthService(users, refresh_store, hasher, settings)
 
 
 async def get_current_user(
     settings: SettingsDep,
     token: str = Depends(oauth2_scheme),
+    principals: PrincipalCache = Depends(get_principal_cache),
     db: AsyncSession = Depends(get_async_db),
-) -> UserModel:
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -53,6 +79,8 @@ async def get_current_user(
         payload = decode_token(token, settings)
         email: str = payload.get("sub")
         token_type: str = payload.get("token_type")
+        user_id: int | None = payload.get("id")
+        jti: str | None = payload.get("jti")
 
         if email is None or token_type != "access":
             raise credentials_exception
@@ -66,15 +94,24 @@ async def get_current_user(
     except jwt.PyJWTError:
         raise credentials_exception
 
+    if user_id is not None and jti:
+        principal = await principals.get(user_id, jti)
+        if principal is not None and principal.email == email:
+            return principal
+
+    generation = await principals.generation(user_id) if user_id is not None else None
     users = UserRepository(db)
     user = await users.get_active_by_email(email)
     if user is None:
         raise credentials_exception
-    return user
+    principal = Principal(id=user.id, email=user.email, role=user.role)
+    if user.id == user_id and jti and generation is not None:
+        await principals.set(jti, principal, generation)
+    return principal
 
 
 def required_role(role: str):
-    async def dep(current_user: UserModel = Depends(get_current_user)) -> UserModel:
+    async def dep(current_user: Principal = Depends(get_current_user)) -> Principal:
         if current_user.role != role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
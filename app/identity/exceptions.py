@@ -60,3 +60,17 @@ class TokenReuseDetectedError(IdentityError):
 class UserInactiveOrNotFoundError(IdentityError):
     def __init__(self) -> None:
         super().__init__("User not found or inactive")
+
+
+class UserNotFoundError(IdentityError):
+    def __init__(self) -> None:
+        super().__init__("User not found", status_code=status.HTTP_404_NOT_FOUND)
+
+
+class PasswordHasherBusyError(IdentityError):
+    def __init__(self) -> None:
+        super().__init__(
+            "Too many concurrent authentication requests",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": "1"},
+        )
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+
+INVALIDATION_CHANNEL = "principal:invalidate"
+
+_MAX_RECONNECT_DELAY = 30.0
+
+# KEYS: запись принципала, поколение; ARGV: поколение до чтения из БД,
+# запись, ttl. Запись только если инвалидации с тех пор не было.
+_SET_IF_CURRENT_LUA = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+  return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Аутентифицированный пользователь без похода в таблицу users."""
+
+    id: int
+    email: str
+    role: str
+
+
+class LocalPrincipalCache:
+    """TTL LRU в памяти процесса, ключ — (user_id, jti)."""
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._items: OrderedDict[tuple[int, str], tuple[float, Principal]] = (
+            OrderedDict()
+        )
+
+    def get(self, user_id: int, jti: str) -> Principal | None:
+        key = (user_id, jti)
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, principal = item
+        if expires_at < time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return principal
+
+    def set(self, jti: str, principal: Principal) -> None:
+        if self._ttl <= 0 or self._maxsize <= 0:
+            return
+        key = (principal.id, jti)
+        self._items[key] = (time.monotonic() + self._ttl, principal)
+        self._items.move_to_end(key)
+        while len(self._items) > self._maxsize:
+            self._items.popitem(last=False)
+
+    def evict_user(self, user_id: int) -> None:
+        for key in [key for key in self._items if key[0] == user_id]:
+            del self._items[key]
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+local_principal_cache = LocalPrincipalCache(
+    maxsize=settings.principal_local_cache_size,
+    ttl=settings.principal_local_cache_ttl,
+)
+
+
+class PrincipalCache:
+    """Двухуровневый кэш принципала: память процесса → Redis → БД.
+
+    В Redis на каждый jti свой ключ ``principal:{user_id}:{jti}`` со своим
+    ttl, рядом с принципалом записано поколение пользователя
+    ``principal:gen:{user_id}``. Инвалидация увеличивает поколение и через
+    pub/sub просит каждый воркер выбросить локальную копию; записи старых
+    поколений чтение пропускает, а Redis удаляет их по ttl.
+
+    Запрос читает поколение до похода в БД и кэширует результат, только если
+    оно не изменилось: иначе прочитанные до PATCH роль или is_active
+    вернулись бы в кэш на ttl. Поколение живёт без срока: истеки оно, счёт
+    начался бы с нуля и старое значение могло бы совпасть снова.
+    """
+
+    def __init__(self, redis: Redis, local: LocalPrincipalCache, *, ttl: int) -> None:
+        self._redis = redis
+        self._local = local
+        self._ttl = ttl
+        self._set_if_current = redis.register_script(_SET_IF_CURRENT_LUA)
+
+    @staticmethod
+    def _key(user_id: int, jti: str) -> str:
+        return f"principal:{user_id}:{jti}"
+
+    @staticmethod
+    def _generation_key(user_id: int) -> str:
+        return f"principal:gen:{user_id}"
+
+    async def get(self, user_id: int, jti: str) -> Principal | None:
+        principal = self._local.get(user_id, jti)
+        if principal is not None or self._ttl <= 0:
+            return principal
+        try:
+            cached, generation = await self._redis.mget(
+                self._key(user_id, jti), self._generation_key(user_id)
+            )
+        except RedisError as exc:
+            logger.warning("Principal cache read failed: {}", exc)
+            return None
+        if cached is None:
+            return None
+        entry = json.loads(cached)
+        if entry["generation"] != (generation or "0"):
+            return None
+        principal = Principal(**entry["principal"])
+        self._local.set(jti, principal)
+        return principal
+
+    async def generation(self, user_id: int) -> str | None:
+        """Поколение перед чтением из БД; None — Redis недоступен, не кэшируем."""
+        if self._ttl <= 0:
+            return "0"
+        try:
+            return await self._redis.get(self._generation_key(user_id)) or "0"
+        except RedisError as exc:
+            logger.warning("Principal cache read failed: {}", exc)
+            return None
+
+    async def set(self, jti: str, principal: Principal, generation: str) -> None:
+        if self._ttl <= 0:
+            self._local.set(jti, principal)
+            return
+        entry = {"generation": generation, "principal": asdict(principal)}
+        try:
+            stored = await self._set_if_current(
+                keys=[
+                    self._key(principal.id, jti),
+                    self._generation_key(principal.id),
+                ],
+                args=[generation, json.dumps(entry), self._ttl],
+            )
+        except RedisError as exc:
+            logger.warning("Principal cache write failed: {}", exc)
+            return
+        if stored:
+            self._local.set(jti, principal)
+
+    async def invalidate(self, user_id: int) -> None:
+        self._local.evict_user(user_id)
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.incr(self._generation_key(user_id))
+                pipe.publish(INVALIDATION_CHANNEL, user_id)
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning("Principal cache invalidation failed: {}", exc)
+
+
+async def listen_for_invalidations(redis: Redis, local: LocalPrincipalCache) -> None:
+    """Подписка воркера на инвалидации; переподключается с backoff.
+
+    После обрыва локальный кэш очищается целиком — сообщения, пришедшие
+    пока подписки не было, потеряны.
+    """
+    delay = 1.0
+    while True:
+        try:
+            async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                local.clear()
+                delay = 1.0
+                async for message in pubsub.listen():
+                    local.evict_user(int(message["data"]))
+        except RedisError as exc:
+            logger.warning(
+                "Principal invalidation listener disconnected: {}; retry in {}s",
+                exc,
+                delay,
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _MAX_RECONNECT_DELAY)
@@ -1,22 +1,111 @@
+import time
+
 from redis.asyncio import Redis
 
+_SCAN_BATCH = 500
+
+# KEYS: index, ключи токенов; ARGV: jti из индекса в том же порядке.
+# Удаление идёт, только если индекс не изменился с чтения: токен, выданный
+# параллельно, либо попадёт под отзыв, либо будет выдан уже после него.
+# -1 — индекс изменился, вызывающий перечитывает его.
+_REVOKE_ALL_LUA = """
+local jtis = redis.call('ZRANGE', KEYS[1], 0, -1)
+if #jtis ~= #ARGV then
+  return -1
+end
+for i = 1, #jtis do
+  if jtis[i] ~= ARGV[i] then
+    return -1
+  end
+end
+redis.call('DEL', unpack(KEYS))
+return #jtis
+"""
+
 
 class RefreshTokenStore:
-    """Хранение refresh jti в Redis — только I/O, без JWT-логики."""
+    """Хранение refresh jti в Redis — только I/O, без JWT-логики.
+
+    Кроме ключа на каждый jti у пользователя есть индекс — sorted set
+    ``refresh_index:{user_id}`` со временем истечения в score. Отзыв всех
+    токенов читает индекс, а не сканирует keyspace; истёкшие элементы
+    вычищаются при каждом save.
+
+    Токены, выданные до появления индекса, в нём не числятся: пока они
+    могут быть живы (до legacy_scan_until, unix time), отзыв дополнительно
+    ищет ключи через SCAN. После этого момента SCAN не выполняется.
+
+    Скрипт отзыва получает все ключи через KEYS, но ключи пользователя
+    лежат в разных слотах: как и MULTI в save, это рассчитано на один узел
+    Redis, не на Cluster.
+    """
 
-    def __init__(self, redis: Redis) -> None:
+    def __init__(self, redis: Redis, *, legacy_scan_until: float | None = None) -> None:
         self._redis = redis
+        self._legacy_scan_until = legacy_scan_until
+        self._revoke_all = redis.register_script(_REVOKE_ALL_LUA)
 
     @staticmethod
     def _key(user_id: int, jti: str) -> str:
         return f"refresh:{user_id}:{jti}"
 
+    @staticmethod
+    def _index_key(user_id: int) -> str:
+        return f"refresh_index:{user_id}"
+
     async def save(self, user_id: int, jti: str, ttl: int) -> None:
-        await self._redis.set(self._key(user_id, jti), str(user_id), ex=ttl)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            self._queue_save(pipe, user_id, jti, ttl)
+            await pipe.execute()
+
+    async def rotate(self, user_id: int, old_jti: str, new_jti: str, ttl: int) -> bool:
+        """Заменяет old_jti на new_jti одной транзакцией MULTI.
+
+        False — старого jti уже не было (повторное использование токена);
+        новый jti при этом тоже записан, вызывающий должен отозвать все.
+        """
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._key(user_id, old_jti))
+            pipe.zrem(self._index_key(user_id), old_jti)
+            self._queue_save(pipe, user_id, new_jti, ttl)
+            deleted, *_ = await pipe.execute()
+        return bool(deleted)
+
+    def _queue_save(self, pipe, user_id: int, jti: str, ttl: int) -> None:
+        now = time.time()
+        index_key = self._index_key(user_id)
+        pipe.set(self._key(user_id, jti), str(user_id), ex=ttl)
+        pipe.zadd(index_key, {jti: now + ttl})
+        pipe.zremrangebyscore(index_key, "-inf", now)
+        # Индекс живёт не меньше самого долгого токена в нём.
+        pipe.expire(index_key, ttl, nx=True)
+        pipe.expire(index_key, ttl, gt=True)
 
     async def delete(self, user_id: int, jti: str) -> int:
-        return await self._redis.delete(self._key(user_id, jti))
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._key(user_id, jti))
+            pipe.zrem(self._index_key(user_id), jti)
+            deleted, _ = await pipe.execute()
+        return deleted
 
     async def delete_all_for_user(self, user_id: int) -> None:
-        async for key in self._redis.scan_iter(f"refresh:{user_id}:*"):
-            await self._redis.delete(key)
+        index_key = self._index_key(user_id)
+        while True:
+            jtis = await self._redis.zrange(index_key, 0, -1)
+            keys = [index_key, *(self._key(user_id, jti) for jti in jtis)]
+            if await self._revoke_all(keys=keys, args=jtis) >= 0:
+                break
+        if self._legacy_scan_until and time.time() < self._legacy_scan_until:
+            await self._delete_unindexed(user_id)
+
+    async def _delete_unindexed(self, user_id: int) -> None:
+        batch: list[str] = []
+        async for key in self._redis.scan_iter(
+            match=self._key(user_id, "*"), count=_SCAN_BATCH
+        ):
+            batch.append(key)
+            if len(batch) >= _SCAN_BATCH:
+                await self._redis.delete(*batch)
+                batch = []
+        if batch:
+            await self._redis.delete(*batch)
@@ -8,6 +8,9 @@ class UserRepository:
     def __init__(self, db: AsyncSession) -> None:
         self._db = db
 
+    async def get_by_id(self, user_id: int) -> UserModel | None:
+        return await self._db.get(UserModel, user_id)
+
     async def get_by_email(self, email: str) -> UserModel | None:
         return await self._db.scalar(select(UserModel).where(UserModel.email == email))
 
@@ -18,6 +18,18 @@ class UserCreate(BaseModel):
     ]
 
 
+class UserAdminUpdate(BaseModel):
+    is_active: Annotated[bool | None, Field(None, description="Активность")]
+    role: Annotated[
+        str | None,
+        Field(
+            None,
+            pattern="^(buyer|seller|admin)$",
+            description="Роль: 'buyer', 'seller' или 'admin'",
+        ),
+    ]
+
+
 class User(BaseModel):
     id: Annotated[int, Field(description="Уникальный идентификатор пользователя")]
     email: Annotated[EmailStr, Field(description="Логин или почта")]
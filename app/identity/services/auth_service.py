@@ -14,14 +14,14 @@ from app.identity.exceptions import (
 )
 from app.identity.repositories.refresh_token_store import RefreshTokenStore
 from app.identity.repositories.user_repository import UserRepository
+from app.identity.services.password_hasher import PasswordHasher
 from app.identity.services.token_service import (
     REFRESH_COOKIE_MAX_AGE,
     create_access_token,
-    create_refresh_token,
+    create_refresh_token_with_jti,
     decode_token,
     refresh_ttl_seconds,
     token_user_data,
-    verify_password,
 )
 
 
@@ -36,16 +36,28 @@ class AuthService:
         self,
         users: UserRepository,
         refresh_store: RefreshTokenStore,
+        hasher: PasswordHasher,
         settings: Settings,
     ) -> None:
         self._users = users
         self._refresh_store = refresh_store
+        self._hasher = hasher
         self._settings = settings
 
     async def login(self, email: str, password: str) -> TokenPair:
         user = await self._users.get_active_by_email(email)
-        if not user or not verify_password(password, user.hashed_password):
+        if not user:
+            raise InvalidCredentialsError
+
+        valid, new_hash = await self._hasher.verify_and_update(
+            password, user.hashed_password
+        )
+        if not valid:
             raise InvalidCredentialsError
+        if new_hash:
+            # Сменился BCRYPT_ROUNDS — перехэшируем, пока знаем пароль.
+            user.hashed_password = new_hash
+            await self._users.commit()
 
         return await self._issue_token_pair(user)
 
@@ -68,18 +80,19 @@ class AuthService:
         if not jti or not user_id:
             raise InvalidRefreshTokenError
 
-        deleted = await self._refresh_store.delete(user_id, jti)
-        if not deleted:
-            await self._refresh_store.delete_all_for_user(user_id)
-            raise TokenReuseDetectedError
-
         user = await self._users.get_active_by_id(user_id)
         if not user:
+            await self._refresh_store.delete(user_id, jti)
             raise UserInactiveOrNotFoundError
 
-        return await self._issue_token_pair(
-            user, refresh_ttl=refresh_ttl_seconds(payload)
+        tokens, new_jti = self._create_token_pair(user)
+        rotated = await self._refresh_store.rotate(
+            user_id, jti, new_jti, refresh_ttl_seconds(payload)
         )
+        if not rotated:
+            await self._refresh_store.delete_all_for_user(user_id)
+            raise TokenReuseDetectedError
+        return tokens
 
     async def logout(self, refresh_token: str | None) -> None:
         if not refresh_token:
@@ -94,15 +107,13 @@ class AuthService:
         except jwt.PyJWTError:
             pass
 
-    async def _issue_token_pair(
-        self, user, *, refresh_ttl: int | None = None
-    ) -> TokenPair:
+    async def _issue_token_pair(self, user) -> TokenPair:
+        tokens, jti = self._create_token_pair(user)
+        await self._refresh_store.save(user.id, jti, REFRESH_COOKIE_MAX_AGE)
+        return tokens
+
+    def _create_token_pair(self, user) -> tuple[TokenPair, str]:
         user_data = token_user_data(user)
         access_token = create_access_token(user_data, self._settings)
-        refresh_token = create_refresh_token(user_data, self._settings)
-
-        payload = decode_token(refresh_token, self._settings, verify_exp=False)
-        ttl = refresh_ttl if refresh_ttl is not None else REFRESH_COOKIE_MAX_AGE
-        await self._refresh_store.save(user.id, payload["jti"], ttl)
-
-        return TokenPair(access_token=access_token, refresh_token=refresh_token)
+        refresh_token, jti = create_refresh_token_with_jti(user_data, self._settings)
+        return TokenPair(access_token=access_token, refresh_token=refresh_token), jti
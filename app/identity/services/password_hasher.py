@@ -0,0 +1,141 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.identity.exceptions import PasswordHasherBusyError
+
+
+@lru_cache
+def _context(rounds: int) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+# Функции уровня модуля — их можно передать в ProcessPoolExecutor.
+def _hash(rounds: int, password: str) -> str:
+    return _context(rounds).hash(password)
+
+
+def _verify_and_update(
+    rounds: int, password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return _context(rounds).verify_and_update(password, hashed_password)
+
+
+@dataclass(frozen=True)
+class PasswordHasherStats:
+    executor: str
+    max_concurrency: int
+    in_flight: int
+    queued: int
+    max_queue: int
+    peak_queued: int
+    rejected: int
+
+
+class PasswordHasher:
+    """bcrypt вне event loop: пул потоков или процессов с ограничением.
+
+    Одновременно в пуле не больше max_concurrency задач, остальные ждут
+    в очереди; если очередь длиннее max_queue — запрос отклоняется сразу,
+    а не копит задержку.
+    """
+
+    def __init__(
+        self,
+        *,
+        rounds: int,
+        max_concurrency: int,
+        max_queue: int,
+        executor: Literal["thread", "process"] = "thread",
+    ) -> None:
+        self._rounds = rounds
+        self._max_concurrency = max_concurrency
+        self._max_queue = max_queue
+        self._executor_kind = executor
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._in_flight = 0
+        self._queued = 0
+        self._peak_queued = 0
+        self._rejected = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, self._rounds, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """Проверка пароля; второй элемент — новый хэш, если сменился cost."""
+        return await self._run(
+            _verify_and_update, self._rounds, password, hashed_password
+        )
+
+    def stats(self) -> PasswordHasherStats:
+        return PasswordHasherStats(
+            executor=self._executor_kind,
+            max_concurrency=self._max_concurrency,
+            in_flight=self._in_flight,
+            queued=self._queued,
+            max_queue=self._max_queue,
+            peak_queued=self._peak_queued,
+            rejected=self._rejected,
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self._executor_kind == "process":
+                self._executor = ProcessPoolExecutor(self._max_concurrency)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self._max_concurrency, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def _run(self, func, *args):
+        semaphore = self._get_semaphore()
+        if semaphore.locked():
+            if self._queued >= self._max_queue:
+                self._rejected += 1
+                raise PasswordHasherBusyError
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+            try:
+                await semaphore.acquire()
+            finally:
+                self._queued -= 1
+        else:
+            await semaphore.acquire()
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._in_flight -= 1
+            semaphore.release()
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.bcrypt_rounds,
+    max_concurrency=settings.password_hash_concurrency,
+    max_queue=settings.password_hash_max_queue,
+    executor=settings.password_hash_executor,
+)
@@ -5,9 +5,11 @@ from uuid import uuid4
 import jwt
 from passlib.context import CryptContext
 
-from app.config import Settings
+from app.config import Settings, settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds
+)
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
@@ -38,10 +40,20 @@ def create_access_token(data: TokenUserData, settings: Settings) -> str:
 
 
 def create_refresh_token(data: TokenUserData, settings: Settings) -> str:
+    token, _ = create_refresh_token_with_jti(data, settings)
+    return token
+
+
+def create_refresh_token_with_jti(
+    data: TokenUserData, settings: Settings
+) -> tuple[str, str]:
+    """Refresh token и его jti — без повторного decode."""
+    jti = str(uuid4())
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "token_type": "refresh", "jti": str(uuid4())})
-    return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.algorithm)
+    to_encode.update({"exp": expire, "token_type": "refresh", "jti": jti})
+    token = jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.algorithm)
+    return token, jti
 
 
 def decode_token(token: str, settings: Settings, *, verify_exp: bool = True) -> dict:
@@ -1,13 +1,21 @@
-from app.identity.exceptions import EmailAlreadyExistsError
+from app.identity.exceptions import EmailAlreadyExistsError, UserNotFoundError
+from app.identity.repositories.principal_cache import PrincipalCache
 from app.identity.repositories.user_repository import UserRepository
-from app.identity.schemas.user import UserCreate
-from app.identity.services.token_service import hash_password
+from app.identity.schemas.user import UserAdminUpdate, UserCreate
+from app.identity.services.password_hasher import PasswordHasher
 from app.models.users import User as UserModel
 
 
 class UserService:
-    def __init__(self, users: UserRepository) -> None:
+    def __init__(
+        self,
+        users: UserRepository,
+        principals: PrincipalCache,
+        hasher: PasswordHasher,
+    ) -> None:
         self._users = users
+        self._principals = principals
+        self._hasher = hasher
 
     async def register(self, data: UserCreate) -> UserModel:
         existing = await self._users.get_by_email(data.email)
@@ -16,9 +24,22 @@ class UserService:
 
         user = UserModel(
             email=data.email,
-            hashed_password=hash_password(data.password),
+            hashed_password=await self._hasher.hash(data.password),
             role=data.role,
         )
         await self._users.add(user)
         await self._users.commit()
         return user
+
+    async def update_status(self, user_id: int, data: UserAdminUpdate) -> UserModel:
+        user = await self._users.get_by_id(user_id)
+        if not user:
+            raise UserNotFoundError
+
+        if data.is_active is not None:
+            user.is_active = data.is_active
+        if data.role is not None:
+            user.role = data.role
+        await self._users.commit()
+        await self._principals.invalidate(user_id)
+        return user
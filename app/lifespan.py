@@ -1,10 +1,22 @@
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from loguru import logger
 
+from app.catalog.repositories.catalog_cache import CatalogCache
 from app.config import get_settings
-from app.db.session import async_engine
+from app.db.session import async_engine, async_session_maker, replica_engines
+from app.identity.repositories.principal_cache import (
+    listen_for_invalidations,
+    local_principal_cache,
+)
+from app.identity.services.password_hasher import password_hasher
+from app.notifications.ws.broker import listen_for_notifications, report_connections
+from app.notifications.ws.manager import ws_manager
+from app.ordering.repositories.hot_stock_store import HotStockStore
+from app.ordering.services.stock_reconciler import StockReconciler
 from app.redis import redis_client
 
 
@@ -12,7 +24,44 @@ from app.redis import redis_client
 async def lifespan(app: FastAPI):
     settings = get_settings()
     logger.info("Application startup (env={})", settings.app_env)
+    background_tasks = [
+        asyncio.create_task(
+            listen_for_invalidations(redis_client, local_principal_cache)
+        ),
+        asyncio.create_task(listen_for_notifications(redis_client, ws_manager)),
+        asyncio.create_task(
+            report_connections(
+                redis_client, ws_manager, interval=settings.ws_stats_interval
+            )
+        ),
+    ]
+    if settings.hot_inventory_enabled:
+        reconciler = StockReconciler(
+            HotStockStore(redis_client),
+            async_session_maker,
+            CatalogCache(
+                redis_client,
+                ttl=settings.catalog_cache_ttl,
+                lock_timeout=settings.catalog_cache_lock_timeout,
+            ),
+            hold_timeout=settings.hot_inventory_hold_timeout,
+            batch_timeout=settings.hot_inventory_batch_timeout,
+            batch_size=settings.hot_inventory_flush_batch,
+        )
+        background_tasks.append(
+            asyncio.create_task(
+                reconciler.run_forever(settings.hot_inventory_reconcile_interval)
+            )
+        )
     yield
     logger.info("Application shutdown")
+    for task in background_tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    password_hasher.shutdown()
     await async_engine.dispose()
+    for engine in replica_engines:
+        await engine.dispose()
     await redis_client.aclose()
+    await logger.complete()
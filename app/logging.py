@@ -1,13 +1,23 @@
+import random
+import re
 import sys
-from time import time
+from time import perf_counter
 from uuid import uuid4
 
-from fastapi import Request
 from loguru import logger
-from starlette.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.db.instrumentation import QueryStats, current_query_stats
+from app.shared.metrics import HTTP_IN_PROGRESS, observe_request, route_template
+
+# Чужой X-Request-Id принимаем, только если он не сломает лог и заголовки.
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
 
 
 def setup_logging() -> None:
+    """stderr-sink: текст или JSON; при enqueue запись идёт из фонового потока."""
     logger.remove()
     logger.configure(extra={"request_id": "-"})
     logger.add(
@@ -16,41 +26,141 @@ def setup_logging() -> None:
             "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level:<8} | "
             "{extra[request_id]} | {message}"
         ),
-        level="INFO",
+        level=settings.log_level,
+        serialize=settings.log_format == "json",
+        enqueue=settings.log_enqueue,
     )
 
 
-async def request_logging_middleware(request: Request, call_next):
-    request_id = str(uuid4())
-    request.state.request_id = request_id
-    start_time = time()
-
-    with logger.contextualize(request_id=request_id):
-        try:
-            response = await call_next(request)
-            duration = time() - start_time
-            response.headers["X-Request-Id"] = request_id
-
-            message = (
-                f"{request.method} {request.url.path} "
-                f"{response.status_code} {duration:.3f}s"
-            )
-            if response.status_code >= 500:
-                logger.error(message)
-            elif response.status_code in (401, 403):
-                logger.warning(message)
+def _report_queries(scope: Scope, stats: QueryStats) -> None:
+    if stats.slowest >= settings.sql_slow_query_threshold:
+        logger.warning(
+            "Slow SQL on {} {} ({:.1f}ms): {}",
+            scope["method"],
+            scope["path"],
+            stats.slowest * 1000,
+            stats.slowest_statement,
+        )
+    for statement, count in stats.repeated(settings.sql_n_plus_one_threshold):
+        logger.warning(
+            "Possible N+1 on {} {}: statement ran {} times: {}",
+            scope["method"],
+            scope["path"],
+            count,
+            statement,
+        )
+
+
+def _log_request(
+    scope: Scope, status_code: int, duration: float, stats: QueryStats
+) -> None:
+    """Строка access-лога; успешные быстрые запросы — с вероятностью sample_rate.
+
+    Ошибки и медленные запросы пишутся всегда, медленные — с контекстом:
+    шаблон маршрута, query string, самое долгое SQL-выражение.
+    """
+    slow = duration >= settings.log_slow_request_threshold
+    if status_code < 400 and not slow and random.random() >= settings.log_sample_rate:
+        return
+
+    fields = {
+        "method": scope["method"],
+        "path": scope["path"],
+        "status": status_code,
+        "duration_ms": round(duration * 1000, 1),
+        "db_queries": stats.count,
+        "db_ms": round(stats.total * 1000, 1),
+    }
+    if slow:
+        level = "WARNING"
+        fields |= {
+            "route": route_template(scope),
+            "query_string": scope.get("query_string", b"").decode("latin-1"),
+            "slowest_sql": stats.slowest_statement,
+            "slowest_sql_ms": round(stats.slowest * 1000, 1),
+        }
+    elif status_code >= 500:
+        level = "ERROR"
+    elif status_code in (401, 403):
+        level = "WARNING"
+    else:
+        level = "INFO"
+    logger.bind(**fields).log(
+        level,
+        "{} {} {} {:.3f}s {}{}",
+        scope["method"],
+        scope["path"],
+        status_code,
+        duration,
+        stats.summary(),
+        " slow" if slow else "",
+    )
+
+
+class RequestLoggingMiddleware:
+    """Access-лог, request id, Server-Timing и метрики — чистый ASGI.
+
+    Заголовки дописываются в ``http.response.start``, тело не буферизуется
+    и не проходит через дополнительные задачи, поэтому стриминг (SSE) и
+    contextvars запроса работают как есть. Строка лога пишется, когда
+    ответ отдан целиком.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id", "")
+        if not _REQUEST_ID_RE.match(request_id):
+            request_id = str(uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+        start_time = perf_counter()
+        # N+1 ищем только вне production: подсчёт текстов выражений не бесплатен.
+        stats = QueryStats(track_statements=settings.app_env != "production")
+        stats_token = current_query_stats.set(stats)
+        status_code = 500
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-Id"] = request_id
+                headers["Server-Timing"] = (
+                    f"{stats.server_timing()}, "
+                    f"app;dur={(perf_counter() - start_time) * 1000:.1f}"
+                )
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        with logger.contextualize(request_id=request_id):
+            try:
+                await self.app(scope, receive, send_with_headers)
+            except Exception:
+                # Сюда доходит только сбой после начала ответа.
+                status_code = 500
+                duration = perf_counter() - start_time
+                logger.exception(
+                    "{} {} failed after {:.3f}s {}",
+                    scope["method"],
+                    scope["path"],
+                    duration,
+                    stats.summary(),
+                )
+                raise
             else:
-                logger.info(message)
-
-            return response
-        except Exception:
-            duration = time() - start_time
-            logger.exception(
-                f"{request.method} {request.url.path} failed after {duration:.3f}s"
-            )
-            response = JSONResponse(
-                status_code=500,
-                content={"detail": "Internal Server Error"},
-            )
-            response.headers["X-Request-Id"] = request_id
-            return response
+                _log_request(scope, status_code, perf_counter() - start_time, stats)
+                _report_queries(scope, stats)
+            finally:
+                observe_request(
+                    scope["method"],
+                    route_template(scope),
+                    status_code,
+                    perf_counter() - start_time,
+                )
+                HTTP_IN_PROGRESS.dec()
+                current_query_stats.reset(stats_token)
@@ -1,37 +1,78 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from loguru import logger
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.gzip import GZipMiddleware
 from starlette.middleware.httpsredirect import HTTPSRedirectMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.config import settings
-from app.logging import request_logging_middleware
+from app.logging import RequestLoggingMiddleware
 
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+    "X-XSS-Protection": "1; mode=block",
+}
 
-async def error_handler(request: Request, exc: Exception):
-    request_id = getattr(request.state, "request_id", "-")
-    with logger.contextualize(request_id=request_id):
-        logger.exception(
-            f"Unhandled error on {request.method} {request.url.path}: {exc}"
-        )
-    return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
+class ErrorHandlerMiddleware:
+    """Необработанное исключение → JSON 500, если ответ ещё не начат."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_tracking)
+        except Exception as exc:
+            logger.exception(
+                f"Unhandled error on {scope['method']} {scope['path']}: {exc}"
+            )
+            if response_started:
+                raise
+            response = JSONResponse(
+                status_code=500, content={"detail": "Internal Server Error"}
+            )
+            await response(scope, receive, send)
 
-async def security_headers_middleware(request: Request, call_next):
-    response = await call_next(request)
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["Strict-Transport-Security"] = (
-        "max-age=31536000; includeSubDomains"
-    )
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    return response
+
+class SecurityHeadersMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in SECURITY_HEADERS.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 
 def setup_middleware(app: FastAPI) -> None:
-    app.add_middleware(TrustedHostMiddleware, allowed_hosts=["localhost", "127.0.0.1"])
+    app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.allowed_hosts)
     if settings.app_env != "production":
         app.add_middleware(HTTPSRedirectMiddleware)
     app.add_middleware(
@@ -43,7 +84,8 @@ def setup_middleware(app: FastAPI) -> None:
     )
     app.add_middleware(GZipMiddleware, minimum_size=1000)
 
-    app.middleware("http")(security_headers_middleware)
-    app.middleware("http")(request_logging_middleware)
-
-    app.exception_handler(Exception)(error_handler)
+    # Последний добавленный — внешний: лог видит итоговый ответ, в том
+    # числе 500 от ErrorHandlerMiddleware с заголовками безопасности.
+    app.add_middleware(ErrorHandlerMiddleware)
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(RequestLoggingMiddleware)
@@ -60,4 +60,30 @@ class Product(Base):
         "OrderItem", back_populates="product"
     )
 
-    __table_args__ = (Index("ix_products_tsv_gin", "tsv", postgresql_using="gin"),)
+    __table_args__ = (
+        Index("ix_products_tsv_gin", "tsv", postgresql_using="gin"),
+        # Частичные индексы под фильтры листинга: каталог читает только is_active.
+        Index(
+            "ix_products_active_category_id",
+            "category_id",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_products_active_seller_id",
+            "seller_id",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_products_active_price",
+            "price",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_products_active_in_stock",
+            "id",
+            postgresql_where=text("is_active AND stock > 0"),
+        ),
+    )
@@ -0,0 +1,138 @@
+import json
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from fastapi.security.utils import get_authorization_scheme_param
+from starlette.types import Receive, Scope, Send
+
+from app.config import SettingsDep
+from app.notifications.deps import get_notification_event_log
+from app.notifications.ws.auth import get_user_id_from_token
+from app.notifications.ws.events import NotificationEventLog
+from app.notifications.ws.manager import (
+    Connection,
+    ConnectionManager,
+    Frame,
+    ws_manager,
+)
+
+router = APIRouter(tags=["sse"])
+
+
+def format_sse(frame: Frame) -> str:
+    event_id, text = frame
+    if event_id is None:
+        return f"data: {text}\n\n"
+    return f"id: {event_id}\ndata: {text}\n\n"
+
+
+class SubscriptionResponse(StreamingResponse):
+    """Снимает подписку после ответа, даже если тело так и не начали отдавать.
+
+    Незапущенный генератор не выполняет свой finally, а клиент может уйти
+    до первого кадра.
+    """
+
+    def __init__(
+        self,
+        content: AsyncIterator[str],
+        *,
+        manager: ConnectionManager,
+        connection: Connection,
+        **kwargs,
+    ) -> None:
+        super().__init__(content, **kwargs)
+        self._manager = manager
+        self._connection = connection
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self._manager.disconnect(self._connection)
+
+
+async def order_event_stream(
+    manager: ConnectionManager,
+    connection: Connection,
+    events: NotificationEventLog,
+    *,
+    last_event_id: str | None,
+    keepalive: float,
+) -> AsyncIterator[str]:
+    """Кадры SSE из той же очереди, что и у WebSocket-подписки.
+
+    Подписку создаёт обработчик запроса — там же, где проверяется лимит;
+    finally снимает её при любом обрыве клиента. Пока кадров нет —
+    комментарий раз в keepalive секунд, чтобы прокси не закрывали
+    простаивающее соединение.
+    """
+    connection.enqueue(
+        json.dumps(
+            {
+                "type": "connected",
+                "message": "Subscribed to order notifications",
+                "user_id": connection.user_id,
+            }
+        )
+    )
+    try:
+        if last_event_id is not None:
+            connection.hold()
+            await connection.replay(
+                await events.since(connection.user_id, last_event_id)
+            )
+        while not connection.closed:
+            frame = await connection.next_frame(keepalive)
+            if frame is not None:
+                yield format_sse(frame)
+            elif not connection.closed:
+                yield ": keepalive\n\n"
+    finally:
+        await manager.disconnect(connection)
+
+
+@router.get("/sse/orders")
+async def orders_events(
+    settings: SettingsDep,
+    token: str | None = Query(
+        None, description="JWT access token, если нельзя передать заголовок"
+    ),
+    authorization: str | None = Header(None),
+    last_event_id: str | None = Header(
+        None, alias="Last-Event-ID", pattern=r"^\d+-\d+$"
+    ),
+    events: NotificationEventLog = Depends(get_notification_event_log),
+):
+    scheme, credentials = get_authorization_scheme_param(authorization)
+    if scheme.lower() == "bearer":
+        token = credentials
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user_id = get_user_id_from_token(token, settings)
+    connection = ws_manager.subscribe(user_id)
+    if connection is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Connection limit reached",
+            headers={"Retry-After": str(settings.sse_retry_after)},
+        )
+
+    return SubscriptionResponse(
+        order_event_stream(
+            ws_manager,
+            connection,
+            events,
+            last_event_id=last_event_id,
+            keepalive=settings.sse_keepalive_interval,
+        ),
+        manager=ws_manager,
+        connection=connection,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
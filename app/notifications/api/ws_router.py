@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+import json
 
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
+from redis.asyncio import Redis
+
+from app.auth import Principal, get_current_admin
 from app.config import SettingsDep
+from app.db.deps import get_redis
+from app.notifications.deps import get_notification_event_log
 from app.notifications.ws.auth import get_user_id_from_token
-from app.notifications.ws.manager import ws_manager
+from app.notifications.ws.broker import cluster_connections, worker_id
+from app.notifications.ws.events import NotificationEventLog
+from app.notifications.ws.manager import ABNORMAL_CLOSE_CODE, ws_manager
 
 router = APIRouter(tags=["websocket"])
 
@@ -27,6 +35,12 @@ async def orders_websocket(
     websocket: WebSocket,
     settings: SettingsDep,
     token: str = Query(..., description="JWT access token"),
+    last_event_id: str | None = Query(
+        None,
+        pattern=r"^\d+-\d+$",
+        description="event_id последнего полученного уведомления",
+    ),
+    events: NotificationEventLog = Depends(get_notification_event_log),
 ):
     try:
         user_id = get_user_id_from_token(token, settings)
@@ -34,19 +48,47 @@ async def orders_websocket(
         await websocket.close(code=1008, reason="Invalid or expired token")
         return
 
-    await ws_manager.connect(user_id, websocket)
-    await websocket.send_json(
-        {
-            "type": "connected",
-            "message": "Subscribed to order notifications",
-            "user_id": user_id,
-        }
+    connection = await ws_manager.connect(user_id, websocket)
+    if connection is None:
+        return
+    connection.enqueue(
+        json.dumps(
+            {
+                "type": "connected",
+                "message": "Subscribed to order notifications",
+                "user_id": user_id,
+            }
+        )
     )
+    if last_event_id is not None:
+        connection.hold()
 
+    reaped = False
     try:
+        if last_event_id is not None:
+            await connection.replay(await events.since(user_id, last_event_id))
         while True:
             text = await websocket.receive_text()
             if text == "ping":
-                await websocket.send_json({"type": "pong"})
-    except WebSocketDisconnect:
-        ws_manager.disconnect(user_id, websocket)
+                connection.enqueue(json.dumps({"type": "pong"}))
+    except WebSocketDisconnect as exc:
+        reaped = exc.code == ABNORMAL_CLOSE_CODE
+    finally:
+        await ws_manager.disconnect(connection, reaped=reaped)
+
+
+@router.get("/ws/stats")
+async def websocket_stats(
+    settings: SettingsDep,
+    current_user: Principal = Depends(get_current_admin),
+    redis: Redis = Depends(get_redis),
+):
+    workers = await cluster_connections(
+        redis, stale_after=settings.ws_stats_interval * 3
+    )
+    return {
+        "worker_id": worker_id(),
+        "worker": ws_manager.stats(),
+        "workers": workers,
+        "total_connections": sum(w["connections"] for w in workers.values()),
+    }
@@ -0,0 +1,17 @@
+from fastapi import Depends
+from redis.asyncio import Redis
+
+from app.config import SettingsDep
+from app.db.deps import get_redis
+from app.notifications.ws.events import NotificationEventLog
+
+
+def get_notification_event_log(
+    settings: SettingsDep,
+    redis: Redis = Depends(get_redis),
+) -> NotificationEventLog:
+    return NotificationEventLog(
+        redis,
+        maxlen=settings.ws_event_stream_maxlen,
+        retention=settings.ws_event_retention,
+    )
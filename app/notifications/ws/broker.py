@@ -0,0 +1,127 @@
+import asyncio
+import json
+import os
+import socket
+import time
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.notifications.ws.events import NotificationEventLog
+from app.notifications.ws.manager import ConnectionManager
+from app.notifications.ws.messages import OrderCreatedMessage
+
+NOTIFY_CHANNEL = "ws:notify"
+CONNECTIONS_KEY = "ws:connections"
+
+_MAX_RECONNECT_DELAY = 30.0
+
+
+def worker_id() -> str:
+    # Считается при вызове: с gunicorn --preload импорт идёт ещё в мастере.
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class NotificationBroker:
+    """Доставка уведомлений между воркерами через Redis pub/sub.
+
+    Публикует любой воркер; каждый воркер подписан на канал и отдаёт
+    сообщение своим локальным сокетам. Если подписчиков нет (Redis
+    недоступен или подписка ещё не поднялась) — доставляем локально.
+    Перед публикацией событие пишется в стрим пользователя, его id
+    уходит клиенту как event_id для последующего переподключения.
+    """
+
+    def __init__(
+        self, redis: Redis, manager: ConnectionManager, events: NotificationEventLog
+    ) -> None:
+        self._redis = redis
+        self._manager = manager
+        self._events = events
+
+    async def publish(self, user_id: int, message: OrderCreatedMessage) -> None:
+        try:
+            event_id = await self._events.append(user_id, message)
+        except RedisError as exc:
+            logger.warning("WS notification persist failed: {}", exc)
+        else:
+            message = {**message, "event_id": event_id}
+        payload = json.dumps({"user_id": user_id, "message": message})
+        try:
+            receivers = await self._redis.publish(NOTIFY_CHANNEL, payload)
+        except RedisError as exc:
+            logger.warning("WS notification publish failed: {}", exc)
+            receivers = 0
+        if not receivers:
+            self._manager.notify_user(user_id, message)
+
+
+def _dispatch(manager: ConnectionManager, raw: str) -> None:
+    # Битое сообщение в канале не должно глушить подписку всего воркера.
+    try:
+        data = json.loads(raw)
+        manager.notify_user(data["user_id"], data["message"])
+    except Exception:
+        logger.exception("Skipping malformed WS notification: {!r}", raw)
+
+
+async def listen_for_notifications(redis: Redis, manager: ConnectionManager) -> None:
+    """Подписка воркера на канал уведомлений; переподключается с backoff."""
+    delay = 1.0
+    while True:
+        try:
+            async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(NOTIFY_CHANNEL)
+                delay = 1.0
+                async for message in pubsub.listen():
+                    _dispatch(manager, message["data"])
+        except RedisError as exc:
+            logger.warning(
+                "WS notification listener disconnected: {}; retry in {}s", exc, delay
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _MAX_RECONNECT_DELAY)
+
+
+async def report_connections(
+    redis: Redis, manager: ConnectionManager, *, interval: float
+) -> None:
+    """Публикует число соединений воркера в общий hash ws:connections."""
+    try:
+        while True:
+            value = json.dumps({**manager.stats(), "updated_at": time.time()})
+            try:
+                await redis.hset(CONNECTIONS_KEY, worker_id(), value)
+            except RedisError as exc:
+                logger.warning("WS connection report failed: {}", exc)
+            await asyncio.sleep(interval)
+    finally:
+        try:
+            await redis.hdel(CONNECTIONS_KEY, worker_id())
+        except RedisError:
+            pass
+
+
+async def cluster_connections(redis: Redis, *, stale_after: float) -> dict[str, dict]:
+    """Счётчики всех живых воркеров; записи упавших воркеров вычищаются."""
+    try:
+        workers = await redis.hgetall(CONNECTIONS_KEY)
+    except RedisError as exc:
+        logger.warning("WS connection stats read failed: {}", exc)
+        return {}
+    now = time.time()
+    alive: dict[str, dict] = {}
+    stale: list[str] = []
+    for worker_id, raw in workers.items():
+        report = json.loads(raw)
+        if now - report["updated_at"] > stale_after:
+            stale.append(worker_id)
+        else:
+            alive[worker_id] = report
+    if stale:
+        try:
+            await redis.hdel(CONNECTIONS_KEY, *stale)
+        except RedisError as exc:
+            logger.warning("WS connection stats cleanup failed: {}", exc)
+    return alive
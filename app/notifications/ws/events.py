@@ -0,0 +1,63 @@
+import json
+import time
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.notifications.ws.messages import OrderCreatedMessage
+
+
+def stream_id(event_id: str) -> tuple[int, int]:
+    """Id записи стрима как кортеж — строки вида ``ms-seq`` нельзя сравнивать."""
+    ms, _, seq = event_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class NotificationEventLog:
+    """Уведомления пользователя в Redis Stream ``ws:events:{user_id}``.
+
+    Стрим ограничен и по длине (MAXLEN ~), и по возрасту (MINID ~): клиент,
+    переподключившийся с last_event_id, получает только то, что пропустил
+    за окно хранения. Стрим неактивного пользователя истекает целиком.
+    """
+
+    def __init__(self, redis: Redis, *, maxlen: int, retention: int) -> None:
+        self._redis = redis
+        self._maxlen = maxlen
+        self._retention = retention
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"ws:events:{user_id}"
+
+    async def append(self, user_id: int, message: OrderCreatedMessage) -> str:
+        key = self._key(user_id)
+        min_id = int((time.time() - self._retention) * 1000)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(key, {"data": json.dumps(message)}, maxlen=self._maxlen)
+            pipe.xtrim(key, minid=min_id)
+            pipe.expire(key, self._retention)
+            event_id, *_ = await pipe.execute()
+        return event_id
+
+    async def since(
+        self, user_id: int, last_event_id: str
+    ) -> list[OrderCreatedMessage]:
+        """События строго после last_event_id, не больше maxlen последних.
+
+        MAXLEN ~ обрезает стрим приблизительно, поэтому берём хвост через
+        XREVRANGE, а не голову через XRANGE с COUNT. Redis недоступен —
+        досылать нечего, живая доставка продолжается.
+        """
+        try:
+            entries = await self._redis.xrevrange(
+                self._key(user_id), min=f"({last_event_id}", count=self._maxlen
+            )
+        except RedisError as exc:
+            logger.warning("WS notification replay failed: {}", exc)
+            return []
+        return [
+            {**json.loads(fields["data"]), "event_id": event_id}
+            for event_id, fields in reversed(entries)
+        ]
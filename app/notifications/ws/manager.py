@@ -1,39 +1,291 @@
+import asyncio
+import contextlib
+import json
+from typing import Literal
+
 from fastapi import WebSocket
+from loguru import logger
 
+from app.config import settings
+from app.notifications.ws.events import stream_id
 from app.notifications.ws.messages import OrderCreatedMessage
+from app.shared.metrics import WS_CONNECTIONS, WS_REAPED, WS_REJECTED
+
+type SlowConsumerPolicy = Literal["disconnect", "drop_oldest"]
+
+SLOW_CONSUMER_CLOSE_CODE = 1008
+TRY_AGAIN_LATER_CLOSE_CODE = 1013
+# Закрытие без close-кадра: uvicorn не дождался pong на протокольный ping
+# или пир пропал.
+ABNORMAL_CLOSE_CODE = 1006
+
+# Кадр очереди: event_id (если событие из стрима) и готовый JSON.
+type Frame = tuple[str | None, str]
+
+
+class Connection:
+    """Подписка на уведомления с ограниченной очередью исходящих кадров.
+
+    Транспорт (WebSocket или SSE) вычитывает очередь через next_frame в
+    своём темпе, поэтому медленный клиент не задерживает ни остальных
+    подписчиков, ни checkout.
+    """
+
+    def __init__(
+        self, user_id: int, *, queue_size: int, policy: SlowConsumerPolicy
+    ) -> None:
+        self.user_id = user_id
+        self._queue: asyncio.Queue[Frame] = asyncio.Queue(queue_size)
+        self._policy = policy
+        self._held: list[Frame] | None = None
+        self._closed = asyncio.Event()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def hold(self) -> None:
+        """Копить живые сообщения, пока клиенту досылаются пропущенные."""
+        self._held = []
+
+    async def replay(self, messages: list[OrderCreatedMessage]) -> None:
+        """Досылает пропущенные события, затем удержанные живые без дублей."""
+        last_id = None
+        for message in messages:
+            # Догоняющий клиент не медленный: ждём места, а не отключаем.
+            frame = (message["event_id"], json.dumps(message))
+            if not await self._put_waiting(frame):
+                return
+            last_id = stream_id(message["event_id"])
+        held, self._held = self._held or [], None
+        for event_id, text in held:
+            if last_id is None or event_id is None or stream_id(event_id) > last_id:
+                self.enqueue(text, event_id)
+
+    def enqueue(self, text: str, event_id: str | None = None) -> bool:
+        """Ставит кадр в очередь без ожидания; False — соединение закрыто."""
+        if self.closed:
+            return False
+        if self._held is not None:
+            self._held.append((event_id, text))
+            return True
+        try:
+            self._queue.put_nowait((event_id, text))
+        except asyncio.QueueFull:
+            if self._policy == "drop_oldest":
+                self._queue.get_nowait()
+                self._queue.put_nowait((event_id, text))
+                return True
+            logger.warning(
+                "Closing slow notification consumer user_id={}", self.user_id
+            )
+            self.abort(SLOW_CONSUMER_CLOSE_CODE, "Slow consumer")
+            return False
+        return True
+
+    async def next_frame(self, timeout: float | None = None) -> Frame | None:
+        """Следующий кадр; None — соединение закрыто или истёк timeout."""
+        if self.closed:
+            return None
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+    def abort(self, code: int, reason: str) -> None:
+        self._closed.set()
+
+    async def stop(self) -> None:
+        self._closed.set()
+
+    async def _put_waiting(self, frame: Frame) -> bool:
+        if self.closed:
+            return False
+        if not self._queue.full():
+            self._queue.put_nowait(frame)
+            return True
+        # Ждём либо места в очереди, либо закрытия — тогда сдаёмся.
+        put = asyncio.ensure_future(self._queue.put(frame))
+        closed = asyncio.ensure_future(self._closed.wait())
+        await asyncio.wait((put, closed), return_when=asyncio.FIRST_COMPLETED)
+        closed.cancel()
+        if put.done():
+            return True
+        put.cancel()
+        return False
+
+
+class WebSocketConnection(Connection):
+    """Подписка поверх WebSocket: очередь вычитывает задача-писатель."""
+
+    def __init__(
+        self,
+        user_id: int,
+        websocket: WebSocket,
+        *,
+        queue_size: int,
+        policy: SlowConsumerPolicy,
+    ) -> None:
+        super().__init__(user_id, queue_size=queue_size, policy=policy)
+        self.websocket = websocket
+        self._writer: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def abort(self, code: int, reason: str) -> None:
+        if self.closed:
+            return
+        super().abort(code, reason)
+        if self._writer is not None:
+            self._writer.cancel()
+        asyncio.create_task(self._close(code, reason))
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self._writer is not None:
+            self._writer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._writer
+
+    async def _write_loop(self) -> None:
+        try:
+            while (frame := await self.next_frame()) is not None:
+                await self.websocket.send_text(frame[1])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Сокет умер — приёмный цикл эндпоинта получит disconnect сам.
+            self._closed.set()
+
+    async def _close(self, code: int, reason: str) -> None:
+        with contextlib.suppress(Exception):
+            await self.websocket.close(code=code, reason=reason)
 
 
 class ConnectionManager:
-    """Хранит активные WebSocket-соединения по user_id."""
+    """Хранит активные подписки (WebSocket и SSE) по user_id.
+
+    Лимиты на пользователя и на воркер проверяются при подключении.
+    Полуоткрытые сокеты находит протокольный ping uvicorn (WS_PING_INTERVAL,
+    WS_PING_TIMEOUT): клиент отвечает pong сам, даже если только слушает, а
+    не ответивший закрывается с 1006 и попадает в счётчик reaped.
+    """
+
+    def __init__(
+        self,
+        *,
+        queue_size: int,
+        policy: SlowConsumerPolicy,
+        max_per_user: int,
+        max_per_worker: int,
+    ) -> None:
+        self._queue_size = queue_size
+        self._policy = policy
+        self._max_per_user = max_per_user
+        self._max_per_worker = max_per_worker
+        self._connections: dict[int, list[Connection]] = {}
+        self._total = 0
+        self.reaped = 0
+        self.rejected = 0
 
-    def __init__(self) -> None:
-        self._connections: dict[int, list[WebSocket]] = {}
+    def admit(self, user_id: int) -> str | None:
+        """Причина отказа, если лимит исчерпан; отказ попадает в счётчик."""
+        if self._total >= self._max_per_worker:
+            reason = "Worker connection limit reached"
+        elif len(self._connections.get(user_id, ())) >= self._max_per_user:
+            reason = "Too many connections"
+        else:
+            return None
+        self.rejected += 1
+        WS_REJECTED.inc()
+        logger.warning(
+            "Rejecting notification subscriber user_id={}: {}", user_id, reason
+        )
+        return reason
 
-    async def connect(self, user_id: int, websocket: WebSocket) -> None:
+    async def connect(
+        self, user_id: int, websocket: WebSocket
+    ) -> WebSocketConnection | None:
+        """Принимает сокет; None — лимит исчерпан, сокет закрыт с 1013."""
         await websocket.accept()
-        self._connections.setdefault(user_id, []).append(websocket)
-
-    def disconnect(self, user_id: int, websocket: WebSocket) -> None:
-        sockets = self._connections.get(user_id, [])
-        if websocket in sockets:
-            sockets.remove(websocket)
-        if not sockets:
-            self._connections.pop(user_id, None)
-
-    async def notify_user(self, user_id: int, message: OrderCreatedMessage) -> None:
-        dead_sockets: list[WebSocket] = []
-        for websocket in self._connections.get(user_id, []):
-            try:
-                await websocket.send_json(message)
-            except Exception:
-                dead_sockets.append(websocket)
-
-        for websocket in dead_sockets:
-            self.disconnect(user_id, websocket)
+        if (reason := self.admit(user_id)) is not None:
+            await websocket.close(code=TRY_AGAIN_LATER_CLOSE_CODE, reason=reason)
+            return None
+        connection = WebSocketConnection(
+            user_id, websocket, queue_size=self._queue_size, policy=self._policy
+        )
+        connection.start()
+        self._add(connection)
+        return connection
+
+    def subscribe(self, user_id: int) -> Connection | None:
+        """Подписка без своего писателя — очередь вычитывает транспорт (SSE).
+
+        Лимит проверяется и место занимается одним шагом, без await между
+        ними; None — лимит исчерпан.
+        """
+        if self.admit(user_id) is not None:
+            return None
+        connection = Connection(
+            user_id, queue_size=self._queue_size, policy=self._policy
+        )
+        self._add(connection)
+        return connection
+
+    async def disconnect(self, connection: Connection, *, reaped: bool = False) -> None:
+        """reaped — соединение сняли как мёртвое, а не закрыл клиент."""
+        self._remove(connection)
+        if reaped:
+            self.reaped += 1
+            WS_REAPED.inc()
+        await connection.stop()
+
+    def notify_user(self, user_id: int, message: OrderCreatedMessage) -> int:
+        """Сериализует сообщение один раз и раскладывает по очередям сокетов."""
+        connections = self._connections.get(user_id)
+        if not connections:
+            return 0
+        text = json.dumps(message)
+        event_id = message.get("event_id")
+        return sum(
+            connection.enqueue(text, event_id) for connection in list(connections)
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "connections": self._total,
+            "users": len(self._connections),
+            "reaped": self.reaped,
+            "rejected": self.rejected,
+        }
 
     @property
     def active_users(self) -> int:
         return len(self._connections)
 
+    @property
+    def active_connections(self) -> int:
+        return self._total
+
+    def _add(self, connection: Connection) -> None:
+        self._connections.setdefault(connection.user_id, []).append(connection)
+        self._total += 1
+        WS_CONNECTIONS.inc()
+
+    def _remove(self, connection: Connection) -> None:
+        connections = self._connections.get(connection.user_id, [])
+        if connection in connections:
+            connections.remove(connection)
+            self._total -= 1
+            WS_CONNECTIONS.dec()
+        if not connections:
+            self._connections.pop(connection.user_id, None)
+
 
-ws_manager = ConnectionManager()
+ws_manager = ConnectionManager(
+    queue_size=settings.ws_send_queue_size,
+    policy=settings.ws_slow_consumer_policy,
+    max_per_user=settings.ws_max_connections_per_user,
+    max_per_worker=settings.ws_max_connections_per_worker,
+)
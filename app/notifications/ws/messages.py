@@ -1,4 +1,4 @@
-from typing import Literal, TypedDict
+from typing import Literal, NotRequired, TypedDict
 
 
 class OrderCreatedMessage(TypedDict):
@@ -6,3 +6,4 @@ class OrderCreatedMessage(TypedDict):
     order_id: int
     status: str
     total_amount: str
+    event_id: NotRequired[str]
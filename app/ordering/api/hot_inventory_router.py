@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, status
+
+from app.auth import Principal, get_current_admin
+from app.ordering.deps import get_hot_inventory_service
+from app.ordering.schemas.hot_inventory import HotInventory
+from app.ordering.services.hot_inventory_service import HotInventoryService
+
+router = APIRouter(
+    prefix="/products/{product_id}/hot-inventory",
+    tags=["inventory"],
+)
+
+
+@router.get("/", response_model=HotInventory)
+async def get_hot_inventory(
+    product_id: int,
+    current_user: Principal = Depends(get_current_admin),
+    service: HotInventoryService = Depends(get_hot_inventory_service),
+):
+    available = await service.get(product_id)
+    return HotInventory(product_id=product_id, available=available)
+
+
+@router.put("/", response_model=HotInventory)
+async def enable_hot_inventory(
+    product_id: int,
+    current_user: Principal = Depends(get_current_admin),
+    service: HotInventoryService = Depends(get_hot_inventory_service),
+):
+    available = await service.enable(product_id)
+    return HotInventory(product_id=product_id, available=available)
+
+
+@router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
+async def disable_hot_inventory(
+    product_id: int,
+    current_user: Principal = Depends(get_current_admin),
+    service: HotInventoryService = Depends(get_hot_inventory_service),
+):
+    await service.disable(product_id)
@@ -1,11 +1,21 @@
+from functools import lru_cache
+
 from fastapi import APIRouter, Depends, Query, status
 
-from app.auth import get_current_user
-from app.models.users import User as UserModel
+from app.auth import Principal, get_current_user
 from app.ordering.deps import get_order_service
 from app.ordering.schemas.order import Order as OrderSchema
 from app.ordering.schemas.order import OrderList
 from app.ordering.services.order_service import OrderService
+from app.shared.metrics import CHECKOUTS, count_outcome
+from app.shared.responses import serialize
+from app.shared.schemas.pagination import PaginationResponse
+from app.shared.schemas.sparse import (
+    FIELDS_DESCRIPTION,
+    FieldSet,
+    parse_fields,
+    sparse_model,
+)
 
 router = APIRouter(
     prefix="/orders",
@@ -13,33 +23,44 @@ router = APIRouter(
 )
 
 
+@lru_cache(maxsize=256)
+def _order_list_schema(fields: FieldSet) -> type[OrderList]:
+    return PaginationResponse[sparse_model(OrderSchema, fields)]
+
+
 @router.post(
     "/checkout", response_model=OrderSchema, status_code=status.HTTP_201_CREATED
 )
 async def checkout_order(
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     service: OrderService = Depends(get_order_service),
 ):
-    return await service.checkout(user_id=current_user.id)
+    with count_outcome(CHECKOUTS):
+        return await service.checkout(user_id=current_user.id)
 
 
 @router.get("/", response_model=OrderList)
 async def list_orders(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    current_user: UserModel = Depends(get_current_user),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: Principal = Depends(get_current_user),
     service: OrderService = Depends(get_order_service),
 ):
+    field_set = parse_fields(fields, OrderSchema)
     orders, total = await service.list_orders(
-        current_user.id, page=page, page_size=page_size
+        current_user.id, page=page, page_size=page_size, fields=field_set
+    )
+    return serialize(
+        _order_list_schema(field_set),
+        {"items": orders, "total": total, "page": page, "page_size": page_size},
     )
-    return OrderList(items=orders, total=total, page=page, page_size=page_size)
 
 
 @router.get("/{order_id}", response_model=OrderSchema)
 async def get_order(
     order_id: int,
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     service: OrderService = Depends(get_order_service),
 ):
     return await service.get_order(current_user.id, order_id)
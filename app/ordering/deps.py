@@ -1,12 +1,18 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.catalog.deps import get_product_repository
+from app.catalog.deps import get_catalog_cache, get_product_repository
+from app.catalog.repositories.catalog_cache import CatalogCache
 from app.catalog.repositories.product_repository import ProductRepository
+from app.config import SettingsDep
 from app.db.deps import get_async_db
+from app.hot_stock import get_hot_stock_store
 from app.ordering.repositories.cart_repository import CartRepository
+from app.ordering.repositories.hot_stock_store import HotStockStore
 from app.ordering.repositories.order_repository import OrderRepository
+from app.ordering.repositories.stock_repository import StockRepository
 from app.ordering.services.cart_service import CartService
+from app.ordering.services.hot_inventory_service import HotInventoryService
 from app.ordering.services.notifier import OrderNotifier
 from app.ordering.services.order_service import OrderService
 from app.ordering.services.ws_notifier import get_ws_order_notifier
@@ -24,6 +30,12 @@ def get_cart_repository(
     return CartRepository(db)
 
 
+def get_stock_repository(
+    db: AsyncSession = Depends(get_async_db),
+) -> StockRepository:
+    return StockRepository(db)
+
+
 def get_cart_service(
     cart_repo: CartRepository = Depends(get_cart_repository),
     product_repo: ProductRepository = Depends(get_product_repository),
@@ -34,6 +46,27 @@ def get_cart_service(
 def get_order_service(
     order_repo: OrderRepository = Depends(get_order_repository),
     cart_repo: CartRepository = Depends(get_cart_repository),
+    stock_repo: StockRepository = Depends(get_stock_repository),
+    hot_stock: HotStockStore | None = Depends(get_hot_stock_store),
     notifier: OrderNotifier = Depends(get_ws_order_notifier),
+    catalog_cache: CatalogCache = Depends(get_catalog_cache),
 ) -> OrderService:
-    return OrderService(order_repo, cart_repo, notifier)
+    return OrderService(
+        order_repo, cart_repo, stock_repo, hot_stock, notifier, catalog_cache
+    )
+
+
+def get_hot_inventory_service(
+    settings: SettingsDep,
+    store: HotStockStore | None = Depends(get_hot_stock_store),
+    product_repo: ProductRepository = Depends(get_product_repository),
+    stock_repo: StockRepository = Depends(get_stock_repository),
+    catalog_cache: CatalogCache = Depends(get_catalog_cache),
+) -> HotInventoryService:
+    return HotInventoryService(
+        store,
+        product_repo,
+        stock_repo,
+        catalog_cache,
+        batch_size=settings.hot_inventory_flush_batch,
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import delete, select
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -38,6 +39,60 @@ class CartRepository:
         )
         return result.first()
 
+    async def upsert_add(
+        self, user_id: int, product_id: int, quantity: int
+    ) -> CartItemModel:
+        """Добавляет товар или увеличивает количество одним INSERT ... ON CONFLICT.
+
+        Возвращает строку из RETURNING; relationship ``product`` не загружен.
+        """
+        stmt = self._upsert_stmt(user_id, {product_id: quantity}, increment=True)
+        result = await self._db.scalars(
+            stmt.returning(CartItemModel),
+            execution_options={"populate_existing": True},
+        )
+        return result.one()
+
+    async def upsert_many(
+        self, user_id: int, quantities: dict[int, int], *, increment: bool
+    ) -> None:
+        """increment=True прибавляет к текущему количеству, иначе заменяет его."""
+        if quantities:
+            await self._db.execute(
+                self._upsert_stmt(user_id, quantities, increment=increment)
+            )
+
+    def _upsert_stmt(
+        self, user_id: int, quantities: dict[int, int], *, increment: bool
+    ):
+        insert = (
+            sqlite.insert
+            if self._db.bind.dialect.name == "sqlite"
+            else postgresql.insert
+        )
+        stmt = insert(CartItemModel).values(
+            [
+                {"user_id": user_id, "product_id": product_id, "quantity": quantity}
+                for product_id, quantity in quantities.items()
+            ]
+        )
+        quantity = stmt.excluded.quantity
+        if increment:
+            quantity = CartItemModel.quantity + quantity
+        return stmt.on_conflict_do_update(
+            index_elements=[CartItemModel.user_id, CartItemModel.product_id],
+            set_={"quantity": quantity, "updated_at": func.now()},
+        )
+
+    async def delete_products(self, user_id: int, product_ids: set[int]) -> None:
+        if product_ids:
+            await self._db.execute(
+                delete(CartItemModel).where(
+                    CartItemModel.user_id == user_id,
+                    CartItemModel.product_id.in_(product_ids),
+                )
+            )
+
     async def add(self, cart_item: CartItemModel) -> None:
         self._db.add(cart_item)
 
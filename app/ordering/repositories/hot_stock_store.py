@@ -0,0 +1,280 @@
+import time
+from dataclasses import dataclass, field
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+_COUNTER_PREFIX = "stock:hot:count:"
+_HOLD_PREFIX = "stock:hot:hold:"
+_HOLDS_KEY = "stock:hot:holds"
+_PENDING_KEY = "stock:hot:pending"
+_BATCH_PREFIX = "stock:hot:batch:"
+_BATCHES_KEY = "stock:hot:batches"
+
+# KEYS: hold, holds, counters...; ARGV: token, now, qty..., product_id...
+# Статус по позиции: 0 — хватает, 1 — не хватает, 2 — товар не «горячий».
+# Списание выполняется, только если все позиции в статусе 0.
+_RESERVE_LUA = """
+local n = #KEYS - 2
+local statuses = {}
+local failed = false
+for i = 1, n do
+  local available = redis.call('GET', KEYS[i + 2])
+  if not available then
+    statuses[i] = 2
+    failed = true
+  elseif tonumber(available) < tonumber(ARGV[i + 2]) then
+    statuses[i] = 1
+    failed = true
+  else
+    statuses[i] = 0
+  end
+end
+if failed then
+  return statuses
+end
+for i = 1, n do
+  redis.call('DECRBY', KEYS[i + 2], ARGV[i + 2])
+  redis.call('HSET', KEYS[1], ARGV[i + 2 + n], ARGV[i + 2])
+end
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+return statuses
+"""
+
+# KEYS: hold, holds, pending; ARGV: token
+_CONFIRM_LUA = """
+local items = redis.call('HGETALL', KEYS[1])
+for i = 1, #items, 2 do
+  redis.call('HINCRBY', KEYS[3], items[i], items[i + 1])
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+return #items / 2
+"""
+
+# KEYS: hold, holds; ARGV: token, counter_prefix
+_RELEASE_LUA = """
+local items = redis.call('HGETALL', KEYS[1])
+for i = 1, #items, 2 do
+  local counter = ARGV[2] .. items[i]
+  if redis.call('EXISTS', counter) == 1 then
+    redis.call('INCRBY', counter, items[i + 1])
+  end
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+return #items / 2
+"""
+
+# KEYS: pending; ARGV: counter_prefix, product_id, qty, product_id, qty...
+_REVERT_LUA = """
+for i = 2, #ARGV, 2 do
+  redis.call('HINCRBY', KEYS[1], ARGV[i], -tonumber(ARGV[i + 1]))
+  local counter = ARGV[1] .. ARGV[i]
+  if redis.call('EXISTS', counter) == 1 then
+    redis.call('INCRBY', counter, ARGV[i + 1])
+  end
+end
+return 1
+"""
+
+# KEYS: counter; ARGV: delta. Ключа нет — товар не «горячий», не создаём.
+_ADJUST_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  return 0
+end
+redis.call('INCRBY', KEYS[1], ARGV[1])
+return 1
+"""
+
+# KEYS: pending, batch, batches; ARGV: now
+# Дельты переезжают в отдельную пачку и удаляются только после коммита в БД.
+_DRAIN_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  return false
+end
+redis.call('RENAME', KEYS[1], KEYS[2])
+redis.call('ZADD', KEYS[3], ARGV[1], KEYS[2])
+return redis.call('HGETALL', KEYS[2])
+"""
+
+# KEYS: batches; ARGV: cutoff, now. Пачки упавших процессов забирает
+# ровно один воркер: отметка времени обновляется в том же скрипте.
+_CLAIM_LUA = """
+local batches = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+for _, batch in ipairs(batches) do
+  redis.call('ZADD', KEYS[1], ARGV[2], batch)
+end
+return batches
+"""
+
+# KEYS: batch, pending, batches
+_RESTORE_LUA = """
+local items = redis.call('HGETALL', KEYS[1])
+for i = 1, #items, 2 do
+  redis.call('HINCRBY', KEYS[2], items[i], items[i + 1])
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[3], KEYS[1])
+return #items / 2
+"""
+
+
+@dataclass
+class PendingBatch:
+    """Забранные из pending дельты; ключ живёт в Redis до коммита в БД."""
+
+    key: str
+    deltas: dict[int, int]
+
+
+@dataclass
+class HotReservation:
+    token: str
+    quantities: dict[int, int]
+    short: set[int] = field(default_factory=set)
+    missing: set[int] = field(default_factory=set)
+
+
+class HotStockStore:
+    """Счётчики «горячих» остатков в Redis — только I/O, без правил checkout.
+
+    Жизненный цикл списания: reserve (hold) → confirm (в pending) →
+    сверка переносит pending в products.stock через пачку (drain → коммит
+    в БД → finish_batch). Незавершённые hold'ы возвращаются в счётчик
+    через release — явно или по таймауту, брошенные пачки забирает
+    claim_stale_batches.
+    """
+
+    def __init__(self, redis: Redis) -> None:
+        self._redis = redis
+        self._reserve = redis.register_script(_RESERVE_LUA)
+        self._confirm = redis.register_script(_CONFIRM_LUA)
+        self._release = redis.register_script(_RELEASE_LUA)
+        self._revert = redis.register_script(_REVERT_LUA)
+        self._drain = redis.register_script(_DRAIN_LUA)
+        self._claim = redis.register_script(_CLAIM_LUA)
+        self._restore = redis.register_script(_RESTORE_LUA)
+        self._adjust = redis.register_script(_ADJUST_LUA)
+
+    @staticmethod
+    def _counter_key(product_id: int) -> str:
+        return f"{_COUNTER_PREFIX}{product_id}"
+
+    @staticmethod
+    def _hold_key(token: str) -> str:
+        return f"{_HOLD_PREFIX}{token}"
+
+    async def enable(self, product_id: int, stock: int) -> int:
+        key = self._counter_key(product_id)
+        await self._redis.set(key, stock, nx=True)
+        return int(await self._redis.get(key))
+
+    async def disable(self, product_id: int) -> bool:
+        return bool(await self._redis.delete(self._counter_key(product_id)))
+
+    async def adjust(self, product_id: int, delta: int) -> bool:
+        """Правка остатка продавцом, пока товар «горячий»; False — не «горячий»."""
+        adjusted = await self._adjust(
+            keys=[self._counter_key(product_id)], args=[delta]
+        )
+        return bool(adjusted)
+
+    async def available(self, product_id: int) -> int | None:
+        value = await self._redis.get(self._counter_key(product_id))
+        return int(value) if value is not None else None
+
+    async def hot_ids(self, product_ids: list[int]) -> set[int]:
+        if not product_ids:
+            return set()
+        values = await self._redis.mget(
+            [self._counter_key(product_id) for product_id in product_ids]
+        )
+        return {
+            product_id
+            for product_id, value in zip(product_ids, values, strict=True)
+            if value is not None
+        }
+
+    async def reserve(self, quantities: dict[int, int]) -> HotReservation:
+        token = uuid4().hex
+        product_ids = list(quantities)
+        statuses = await self._reserve(
+            keys=[
+                self._hold_key(token),
+                _HOLDS_KEY,
+                *(self._counter_key(product_id) for product_id in product_ids),
+            ],
+            args=[
+                token,
+                time.time(),
+                *(quantities[product_id] for product_id in product_ids),
+                *product_ids,
+            ],
+        )
+        reservation = HotReservation(token=token, quantities=dict(quantities))
+        for product_id, status in zip(product_ids, statuses, strict=True):
+            if status == 1:
+                reservation.short.add(product_id)
+            elif status == 2:
+                reservation.missing.add(product_id)
+        return reservation
+
+    async def confirm(self, reservation: HotReservation) -> bool:
+        """False — резерв уже снят по таймауту, списывать нечего."""
+        confirmed = await self._confirm(
+            keys=[self._hold_key(reservation.token), _HOLDS_KEY, _PENDING_KEY],
+            args=[reservation.token],
+        )
+        return bool(confirmed)
+
+    async def release(self, token: str) -> None:
+        await self._release(
+            keys=[self._hold_key(token), _HOLDS_KEY],
+            args=[token, _COUNTER_PREFIX],
+        )
+
+    async def revert(self, reservation: HotReservation) -> None:
+        """Откат уже подтверждённого списания, если транзакция заказа упала."""
+        args: list = [_COUNTER_PREFIX]
+        for product_id, quantity in reservation.quantities.items():
+            args += [product_id, quantity]
+        await self._revert(keys=[_PENDING_KEY], args=args)
+
+    async def expired_holds(self, older_than: float) -> list[str]:
+        return await self._redis.zrangebyscore(_HOLDS_KEY, "-inf", older_than)
+
+    async def drain_pending(self) -> PendingBatch | None:
+        key = f"{_BATCH_PREFIX}{uuid4().hex}"
+        items = await self._drain(
+            keys=[_PENDING_KEY, key, _BATCHES_KEY], args=[time.time()]
+        )
+        if items is None:
+            return None
+        return PendingBatch(key, _parse_deltas(items))
+
+    async def claim_stale_batches(self, older_than: float) -> list[PendingBatch]:
+        """Пачки, которые забрал и не довёл до коммита упавший процесс."""
+        keys = await self._claim(keys=[_BATCHES_KEY], args=[older_than, time.time()])
+        return [
+            PendingBatch(key, _parse_deltas(await self._redis.hgetall(key)))
+            for key in keys
+        ]
+
+    async def finish_batch(self, batch: PendingBatch) -> None:
+        """Дельты пачки уже в БД — удаляем её."""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(batch.key)
+            pipe.zrem(_BATCHES_KEY, batch.key)
+            await pipe.execute()
+
+    async def restore_pending(self, batch: PendingBatch) -> None:
+        """Запись в БД не удалась — дельты пачки обратно в pending."""
+        await self._restore(keys=[batch.key, _PENDING_KEY, _BATCHES_KEY])
+
+
+def _parse_deltas(items) -> dict[int, int]:
+    if isinstance(items, dict):
+        items = [value for pair in items.items() for value in pair]
+    deltas = {int(items[i]): int(items[i + 1]) for i in range(0, len(items), 2)}
+    return {product_id: delta for product_id, delta in deltas.items() if delta}
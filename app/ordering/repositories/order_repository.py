@@ -1,14 +1,28 @@
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
-from app.db.utils import get_by_id
+from app.db.routing import reads_from_replica
+from app.db.utils import get_by_id, load_only_fields
 from app.models.orders import Order as OrderModel
 from app.models.orders import OrderItem as OrderItemModel
+from app.shared.schemas.sparse import FieldSet
 
-_ORDER_WITH_ITEMS = (
-    selectinload(OrderModel.items).selectinload(OrderItemModel.product),
-)
+_ORDER_ITEMS = selectinload(OrderModel.items).selectinload(OrderItemModel.product)
+_ORDER_USER = joinedload(OrderModel.user)
+_ORDER_WITH_ITEMS = (_ORDER_ITEMS, _ORDER_USER)
+
+
+def _order_options(fields: FieldSet) -> tuple:
+    """Колонки под запрошенные поля; позиции и покупатель — только по запросу."""
+    if fields is None:
+        return _ORDER_WITH_ITEMS
+    options = [load_only_fields(OrderModel, fields)]
+    if "items" in fields:
+        options.append(_ORDER_ITEMS)
+    if "user" in fields:
+        options.append(_ORDER_USER)
+    return tuple(options)
 
 
 class OrderRepository:
@@ -31,6 +45,7 @@ class OrderRepository:
     async def commit(self) -> None:
         await self._db.commit()
 
+    @reads_from_replica
     async def count_for_user(self, user_id: int) -> int:
         return (
             await self._db.scalar(
@@ -38,12 +53,13 @@ class OrderRepository:
             )
         ) or 0
 
+    @reads_from_replica
     async def list_for_user(
-        self, user_id: int, *, page: int, page_size: int
+        self, user_id: int, *, page: int, page_size: int, fields: FieldSet = None
     ) -> list[OrderModel]:
         result = await self._db.scalars(
             select(OrderModel)
-            .options(_ORDER_WITH_ITEMS)
+            .options(*_order_options(fields))
             .where(OrderModel.user_id == user_id)
             .order_by(OrderModel.created_at.desc())
             .offset((page - 1) * page_size)
@@ -0,0 +1,57 @@
+from sqlalchemy import case, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.products import Product as ProductModel
+
+
+class StockRepository:
+    """Списание остатков товаров. Только SQL — без бизнес-правил."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self._db = db
+
+    async def reserve(self, quantities: dict[int, int]) -> set[int]:
+        """Списывает остатки одним UPDATE и возвращает id списанных товаров.
+
+        Проверка ``stock >= qty`` выполняется в том же UPDATE под блокировкой
+        строки, поэтому параллельные checkout не уводят остаток в минус.
+        Товары, которых нет в ответе, списать не удалось.
+        """
+        if not quantities:
+            return set()
+        quantity = case(quantities, value=ProductModel.id)
+        stmt = (
+            update(ProductModel)
+            .where(
+                ProductModel.id.in_(quantities),
+                ProductModel.is_active,
+                ProductModel.stock >= quantity,
+            )
+            .values(stock=ProductModel.stock - quantity)
+            .returning(ProductModel.id)
+        )
+        result = await self._db.execute(
+            stmt, execution_options={"synchronize_session": False}
+        )
+        return set(result.scalars().all())
+
+    async def apply_deltas(self, deltas: dict[int, int]) -> None:
+        """Вычитает проданное через Redis количество без проверки остатка.
+
+        Проверка уже сделана атомарно в счётчике, здесь только перенос в БД.
+        """
+        if not deltas:
+            return
+        delta = case(deltas, value=ProductModel.id)
+        stmt = (
+            update(ProductModel)
+            .where(ProductModel.id.in_(deltas))
+            .values(stock=ProductModel.stock - delta)
+        )
+        await self._db.execute(stmt, execution_options={"synchronize_session": False})
+
+    async def commit(self) -> None:
+        await self._db.commit()
+
+    async def rollback(self) -> None:
+        await self._db.rollback()
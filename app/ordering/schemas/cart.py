@@ -1,5 +1,5 @@
 from decimal import Decimal
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -19,6 +19,36 @@ class CartItemUpdate(BaseModel):
     quantity: Annotated[int, Field(..., ge=1, description="Новое количество товара")]
 
 
+class CartAddOperation(CartItemBase):
+    op: Literal["add"]
+
+
+class CartSetOperation(CartItemBase):
+    op: Literal["set"]
+
+
+class CartRemoveOperation(BaseModel):
+    op: Literal["remove"]
+    product_id: Annotated[int, Field(description="ID товара")]
+
+
+type CartOperation = Annotated[
+    CartAddOperation | CartSetOperation | CartRemoveOperation,
+    Field(discriminator="op"),
+]
+
+
+class CartBatchUpdate(BaseModel):
+    operations: Annotated[
+        list[CartOperation],
+        Field(
+            min_length=1,
+            max_length=100,
+            description="Операции применяются по порядку в одной транзакции",
+        ),
+    ]
+
+
 class CartItem(BaseModel):
     id: Annotated[int, Field(..., description="ID позиции корзины")]
     quantity: Annotated[int, Field(..., ge=1, description="Количество товара")]
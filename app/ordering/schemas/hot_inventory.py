@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+
+class HotInventory(BaseModel):
+    product_id: int = Field(..., description="ID товара")
+    available: int | None = Field(
+        None, description="Остаток в счётчике Redis; null — режим выключен"
+    )
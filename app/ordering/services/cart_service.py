@@ -1,13 +1,32 @@
+from dataclasses import dataclass
 from decimal import Decimal
 
+from sqlalchemy.orm.attributes import set_committed_value
+
 from app.catalog.repositories.product_repository import ProductRepository
 from app.models.cart_items import CartItem as CartItemModel
+from app.models.products import Product as ProductModel
 from app.ordering.repositories.cart_repository import CartRepository
-from app.ordering.schemas.cart import Cart as CartSchema
-from app.ordering.schemas.cart import CartItemCreate, CartItemUpdate
+from app.ordering.schemas.cart import (
+    CartAddOperation,
+    CartBatchUpdate,
+    CartItemCreate,
+    CartItemUpdate,
+    CartRemoveOperation,
+)
 from app.shared.exceptions import CartItemNotFoundError, ProductNotFoundError
 
 
+@dataclass
+class CartContents:
+    """Корзина с ORM-позициями; в схему Cart её переводит маршрут."""
+
+    user_id: int
+    items: list[CartItemModel]
+    total_quantity: int
+    total_price: Decimal
+
+
 class CartService:
     """Бизнес-логика корзины: просмотр, добавление, изменение, очистка."""
 
@@ -19,12 +38,13 @@ class CartService:
         self._cart = cart_repo
         self._products = product_repo
 
-    async def _ensure_product_available(self, product_id: int) -> None:
+    async def _ensure_product_available(self, product_id: int) -> ProductModel:
         product = await self._products.get_active_by_id(product_id)
         if not product:
             raise ProductNotFoundError(product_id)
+        return product
 
-    async def get_cart(self, user_id: int) -> CartSchema:
+    async def get_cart(self, user_id: int) -> CartContents:
         items = await self._cart.get_items_for_user(user_id)
         total_quantity = sum(item.quantity for item in items)
         price_items = (
@@ -33,32 +53,62 @@ class CartService:
             for item in items
         )
         total_price = sum(price_items, Decimal("0"))
-        return CartSchema(
-            user_id=user_id,
-            items=items,
-            total_quantity=total_quantity,
-            total_price=total_price,
-        )
+        return CartContents(user_id, items, total_quantity, total_price)
 
     async def add_item(self, user_id: int, payload: CartItemCreate) -> CartItemModel:
-        await self._ensure_product_available(payload.product_id)
-
-        cart_item = await self._cart.get_item_for_user(user_id, payload.product_id)
-        if cart_item:
-            cart_item.quantity += payload.quantity
-        else:
-            cart_item = CartItemModel(
-                user_id=user_id,
-                product_id=payload.product_id,
-                quantity=payload.quantity,
-            )
-            await self._cart.add(cart_item)
+        product = await self._ensure_product_available(payload.product_id)
+
+        cart_item = await self._cart.upsert_add(
+            user_id, payload.product_id, payload.quantity
+        )
+        await self._cart.commit()
+        # Товар уже загружен вместе с категорией — перечитывать позицию не нужно.
+        set_committed_value(cart_item, "product", product)
+        return cart_item
+
+    async def apply_batch(self, user_id: int, payload: CartBatchUpdate) -> CartContents:
+        """Применяет пачку add/set/remove одной транзакцией.
+
+        Операции сворачиваются в памяти до одной на товар: итоговое
+        количество либо прибавляется к текущему (только add), либо
+        заменяет его (был set), либо позиция удаляется.
+        """
+        referenced = {
+            op.product_id
+            for op in payload.operations
+            if not isinstance(op, CartRemoveOperation)
+        }
+        missing = referenced - await self._products.get_active_ids(referenced)
+        if missing:
+            raise ProductNotFoundError(min(missing))
 
+        increments: dict[int, int] = {}
+        replacements: dict[int, int] = {}
+        removals: set[int] = set()
+        for op in payload.operations:
+            pid = op.product_id
+            if isinstance(op, CartRemoveOperation):
+                increments.pop(pid, None)
+                replacements.pop(pid, None)
+                removals.add(pid)
+            elif isinstance(op, CartAddOperation):
+                if pid in replacements:
+                    replacements[pid] += op.quantity
+                elif pid in removals:
+                    removals.discard(pid)
+                    replacements[pid] = op.quantity
+                else:
+                    increments[pid] = increments.get(pid, 0) + op.quantity
+            else:
+                increments.pop(pid, None)
+                removals.discard(pid)
+                replacements[pid] = op.quantity
+
+        await self._cart.delete_products(user_id, removals)
+        await self._cart.upsert_many(user_id, increments, increment=True)
+        await self._cart.upsert_many(user_id, replacements, increment=False)
         await self._cart.commit()
-        updated = await self._cart.get_item_for_user(user_id, payload.product_id)
-        if not updated:
-            raise CartItemNotFoundError(payload.product_id)
-        return updated
+        return await self.get_cart(user_id)
 
     async def update_item(
         self, user_id: int, product_id: int, payload: CartItemUpdate
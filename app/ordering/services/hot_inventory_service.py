@@ -0,0 +1,49 @@
+from app.catalog.repositories.catalog_cache import CatalogCache
+from app.catalog.repositories.product_repository import ProductRepository
+from app.ordering.repositories.hot_stock_store import HotStockStore
+from app.ordering.repositories.stock_repository import StockRepository
+from app.ordering.services.stock_reconciler import flush_pending
+from app.shared.exceptions import HotInventoryDisabledError, ProductNotFoundError
+
+
+class HotInventoryService:
+    """Включение и выключение режима «горячих» остатков для товара."""
+
+    def __init__(
+        self,
+        store: HotStockStore | None,
+        products: ProductRepository,
+        stock_repo: StockRepository,
+        catalog_cache: CatalogCache,
+        *,
+        batch_size: int,
+    ) -> None:
+        self._store = store
+        self._products = products
+        self._stock = stock_repo
+        self._catalog_cache = catalog_cache
+        self._batch_size = batch_size
+
+    def _require_store(self) -> HotStockStore:
+        if self._store is None:
+            raise HotInventoryDisabledError
+        return self._store
+
+    async def get(self, product_id: int) -> int | None:
+        return await self._require_store().available(product_id)
+
+    async def enable(self, product_id: int) -> int:
+        store = self._require_store()
+        product = await self._products.get_active_by_id(product_id)
+        if not product:
+            raise ProductNotFoundError(product_id)
+        return await store.enable(product_id, product.stock)
+
+    async def disable(self, product_id: int) -> None:
+        store = self._require_store()
+        # Сначала убираем счётчик, чтобы новые checkout пошли через БД,
+        # затем переносим уже подтверждённые продажи в products.stock.
+        await store.disable(product_id)
+        await flush_pending(
+            store, self._stock, self._catalog_cache, batch_size=self._batch_size
+        )
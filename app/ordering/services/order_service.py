@@ -1,9 +1,12 @@
 from decimal import Decimal
 
+from app.catalog.repositories.catalog_cache import CatalogCache, product_tag
 from app.models.orders import Order as OrderModel
 from app.models.orders import OrderItem as OrderItemModel
 from app.ordering.repositories.cart_repository import CartRepository
+from app.ordering.repositories.hot_stock_store import HotReservation, HotStockStore
 from app.ordering.repositories.order_repository import OrderRepository
+from app.ordering.repositories.stock_repository import StockRepository
 from app.ordering.services.notifier import OrderNotifier
 from app.shared.exceptions import (
     CartEmptyError,
@@ -13,6 +16,7 @@ from app.shared.exceptions import (
     ProductPriceMissingError,
     ProductUnavailableError,
 )
+from app.shared.schemas.sparse import FieldSet
 
 
 class OrderService:
@@ -22,11 +26,17 @@ class OrderService:
         self,
         order_repo: OrderRepository,
         cart_repo: CartRepository,
+        stock_repo: StockRepository,
+        hot_stock: HotStockStore | None,
         notifier: OrderNotifier,
+        catalog_cache: CatalogCache,
     ) -> None:
         self._orders = order_repo
         self._cart = cart_repo
+        self._stock = stock_repo
+        self._hot_stock = hot_stock
         self._notifier = notifier
+        self._catalog_cache = catalog_cache
 
     async def checkout(self, user_id: int) -> OrderModel:
         cart_items = await self._cart.get_items_for_user(user_id)
@@ -40,8 +50,6 @@ class OrderService:
             product = cart_item.product
             if not product or not product.is_active:
                 raise ProductUnavailableError(cart_item.product_id)
-            if product.stock < cart_item.quantity:
-                raise NotEnoughStockError(product.name)
 
             unit_price = product.price
             if unit_price is None:
@@ -58,12 +66,44 @@ class OrderService:
                     total_price=total_price,
                 )
             )
-            product.stock -= cart_item.quantity
 
-        order.total_amount = total_amount
-        await self._orders.add(order)
-        await self._cart.clear_for_user(user_id)
-        await self._orders.commit()
+        quantities = {item.product_id: item.quantity for item in cart_items}
+        names = {item.product_id: item.product.name for item in cart_items}
+        hot = await self._reserve_hot(quantities, names)
+
+        confirmed = False
+        try:
+            reserved = await self._stock.reserve(quantities)
+            shortfalls = [names[pid] for pid in quantities if pid not in reserved]
+            if shortfalls:
+                await self._stock.rollback()
+                raise NotEnoughStockError(", ".join(shortfalls))
+
+            order.total_amount = total_amount
+            await self._orders.add(order)
+            await self._cart.clear_for_user(user_id)
+            if hot is not None:
+                # Подтверждаем до commit: при падении процесса между ними
+                # товар скорее недопродадим, чем продадим дважды.
+                confirmed = await self._hot_stock.confirm(hot)
+                if not confirmed:
+                    # Резерв истёк и уже возвращён в счётчик сверкой.
+                    await self._stock.rollback()
+                    raise NotEnoughStockError(
+                        ", ".join(names[pid] for pid in hot.quantities)
+                    )
+            await self._orders.commit()
+        except BaseException:
+            if hot is not None:
+                if confirmed:
+                    await self._hot_stock.revert(hot)
+                else:
+                    await self._hot_stock.release(hot.token)
+            raise
+
+        # Остаток в БД изменился только у списанных UPDATE; «горячие»
+        # товары сбросит сверка, когда перенесёт продажи в products.stock.
+        await self._catalog_cache.invalidate(*map(product_tag, reserved))
 
         created_order = await self._orders.get_by_id_with_items(order.id)
         if not created_order:
@@ -72,12 +112,38 @@ class OrderService:
         await self._notifier.order_created(user_id, created_order)
         return created_order
 
+    async def _reserve_hot(
+        self, quantities: dict[int, int], names: dict[int, str]
+    ) -> HotReservation | None:
+        """Списывает «горячие» товары в Redis и убирает их из quantities.
+
+        Остальные позиции списываются обычным UPDATE в БД.
+        """
+        if self._hot_stock is None:
+            return None
+        hot_ids = await self._hot_stock.hot_ids(list(quantities))
+        hot = {pid: quantities[pid] for pid in hot_ids}
+        while hot:
+            reservation = await self._hot_stock.reserve(hot)
+            if reservation.short:
+                raise NotEnoughStockError(
+                    ", ".join(names[pid] for pid in hot if pid in reservation.short)
+                )
+            if not reservation.missing:
+                for pid in hot:
+                    del quantities[pid]
+                return reservation
+            # Режим выключили между проверкой и резервом — эти товары идут в БД.
+            for pid in reservation.missing:
+                del hot[pid]
+        return None
+
     async def list_orders(
-        self, user_id: int, *, page: int, page_size: int
+        self, user_id: int, *, page: int, page_size: int, fields: FieldSet = None
     ) -> tuple[list[OrderModel], int]:
         total = await self._orders.count_for_user(user_id)
         orders = await self._orders.list_for_user(
-            user_id, page=page, page_size=page_size
+            user_id, page=page, page_size=page_size, fields=fields
         )
         return orders, total
 
@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.catalog.repositories.catalog_cache import CatalogCache, product_tag
+from app.ordering.repositories.hot_stock_store import HotStockStore, PendingBatch
+from app.ordering.repositories.stock_repository import StockRepository
+
+
+async def flush_pending(
+    store: HotStockStore,
+    stock_repo: StockRepository,
+    catalog_cache: CatalogCache,
+    *,
+    batch_size: int,
+) -> int:
+    """Переносит подтверждённые продажи из Redis в products.stock.
+
+    Дельты атомарно переезжают из pending в отдельную пачку, поэтому
+    несколько воркеров не применят одну продажу дважды. Пачка удаляется
+    только после коммита в БД; если запись упала — дельты возвращаются
+    в pending и уйдут со следующей попыткой.
+    """
+    batch = await store.drain_pending()
+    if batch is None:
+        return 0
+    return await apply_batch(
+        store, stock_repo, catalog_cache, batch, batch_size=batch_size
+    )
+
+
+async def apply_batch(
+    store: HotStockStore,
+    stock_repo: StockRepository,
+    catalog_cache: CatalogCache,
+    batch: PendingBatch,
+    *,
+    batch_size: int,
+) -> int:
+    """Записывает пачку в products.stock и удаляет её из Redis.
+
+    Процесс может упасть между коммитом и удалением пачки — тогда
+    сверка применит её ещё раз и остаток в БД окажется меньше реального.
+    Это безопаснее обратного: недосчитанный товар не продаётся дважды.
+    """
+    items = list(batch.deltas.items())
+    try:
+        for start in range(0, len(items), batch_size):
+            await stock_repo.apply_deltas(dict(items[start : start + batch_size]))
+        await stock_repo.commit()
+    except BaseException:
+        await stock_repo.rollback()
+        await store.restore_pending(batch)
+        raise
+    await store.finish_batch(batch)
+    if batch.deltas:
+        await catalog_cache.invalidate(*map(product_tag, batch.deltas))
+    return len(batch.deltas)
+
+
+class StockReconciler:
+    """Фоновая сверка «горячих» остатков: Redis → products.stock."""
+
+    def __init__(
+        self,
+        store: HotStockStore,
+        session_maker: async_sessionmaker[AsyncSession],
+        catalog_cache: CatalogCache,
+        *,
+        hold_timeout: float,
+        batch_timeout: float,
+        batch_size: int,
+    ) -> None:
+        self._store = store
+        self._session_maker = session_maker
+        self._catalog_cache = catalog_cache
+        self._hold_timeout = hold_timeout
+        self._batch_timeout = batch_timeout
+        self._batch_size = batch_size
+
+    async def release_expired_holds(self) -> int:
+        """Возвращает в счётчик резервы checkout, который не дошёл до confirm."""
+        tokens = await self._store.expired_holds(time.time() - self._hold_timeout)
+        for token in tokens:
+            await self._store.release(token)
+        return len(tokens)
+
+    async def recover_batches(self) -> int:
+        """Дописывает в БД пачки, брошенные упавшим воркером после drain."""
+        batches = await self._store.claim_stale_batches(
+            time.time() - self._batch_timeout
+        )
+        for batch in batches:
+            async with self._session_maker() as session:
+                await apply_batch(
+                    self._store,
+                    StockRepository(session),
+                    self._catalog_cache,
+                    batch,
+                    batch_size=self._batch_size,
+                )
+        return len(batches)
+
+    async def run_once(self) -> int:
+        released = await self.release_expired_holds()
+        if released:
+            logger.warning("Released {} stale hot stock holds", released)
+        recovered = await self.recover_batches()
+        if recovered:
+            logger.warning("Recovered {} abandoned hot stock batches", recovered)
+        async with self._session_maker() as session:
+            return await flush_pending(
+                self._store,
+                StockRepository(session),
+                self._catalog_cache,
+                batch_size=self._batch_size,
+            )
+
+    async def run_forever(self, interval: float) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Hot stock reconciliation failed")
+            await asyncio.sleep(interval)
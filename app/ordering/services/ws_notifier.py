@@ -1,11 +1,21 @@
+from fastapi import Depends
+from redis.asyncio import Redis
+
+from app.db.deps import get_redis
 from app.models.orders import Order as OrderModel
+from app.notifications.deps import get_notification_event_log
+from app.notifications.ws.broker import NotificationBroker
+from app.notifications.ws.events import NotificationEventLog
 from app.notifications.ws.manager import ws_manager
 from app.notifications.ws.messages import OrderCreatedMessage
 from app.ordering.services.notifier import OrderNotifier
 
 
 class WebSocketOrderNotifier:
-    """Адаптер: реализация OrderNotifier через ws_manager."""
+    """Адаптер: реализация OrderNotifier через брокер WS-уведомлений."""
+
+    def __init__(self, broker: NotificationBroker) -> None:
+        self._broker = broker
 
     async def order_created(self, user_id: int, order: OrderModel) -> None:
         message: OrderCreatedMessage = {
@@ -14,11 +24,11 @@ class WebSocketOrderNotifier:
             "status": order.status,
             "total_amount": str(order.total_amount),
         }
-        await ws_manager.notify_user(user_id, message)
-
-
-_ws_notifier = WebSocketOrderNotifier()
+        await self._broker.publish(user_id, message)
 
 
-def get_ws_order_notifier() -> OrderNotifier:
-    return _ws_notifier
+def get_ws_order_notifier(
+    redis: Redis = Depends(get_redis),
+    events: NotificationEventLog = Depends(get_notification_event_log),
+) -> OrderNotifier:
+    return WebSocketOrderNotifier(NotificationBroker(redis, ws_manager, events))
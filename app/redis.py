@@ -1,5 +1,40 @@
+import time
+
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
 
 from app.config import settings
+from app.shared.metrics import REDIS_COMMAND_DURATION
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            command = "MULTI" if self.is_transaction else "PIPELINE"
+            REDIS_COMMAND_DURATION.labels(command).observe(
+                time.perf_counter() - started
+            )
+
+
+class InstrumentedRedis(Redis):
+    """Клиент Redis, который пишет время каждой команды в метрики."""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_DURATION.labels(str(args[0]).upper()).observe(
+                time.perf_counter() - started
+            )
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
 
-redis_client = Redis.from_url(settings.redis_url, decode_responses=True)
+redis_client = InstrumentedRedis.from_url(settings.redis_url, decode_responses=True)
@@ -7,8 +7,12 @@ ROUTER_MODULES = (
     "app.catalog.api.reviews_router",
     "app.ordering.api.router",
     "app.ordering.api.cart_router",
+    "app.ordering.api.hot_inventory_router",
     "app.notifications.api.ws_router",
+    "app.notifications.api.sse_router",
     "app.shared.api.health_router",
+    "app.shared.api.admin_router",
+    "app.shared.api.metrics_router",
 )
 
 
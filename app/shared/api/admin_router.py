@@ -0,0 +1,28 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.auth import Principal, get_current_admin
+from app.db.deps import get_async_engine
+from app.db.pool import pool_stats
+from app.identity.deps import get_password_hasher
+from app.identity.services.password_hasher import PasswordHasher
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/password-hasher")
+async def password_hasher_stats(
+    current_user: Principal = Depends(get_current_admin),
+    hasher: PasswordHasher = Depends(get_password_hasher),
+):
+    return asdict(hasher.stats())
+
+
+@router.get("/db/pool")
+async def db_pool_stats(
+    current_user: Principal = Depends(get_current_admin),
+    engine: AsyncEngine = Depends(get_async_engine),
+):
+    return asdict(pool_stats(engine))
@@ -6,12 +6,14 @@ from app.identity.exceptions import IdentityError
 from app.shared.exceptions import (
     CartEmptyError,
     CartItemNotFoundError,
+    HotInventoryDisabledError,
     NotEnoughStockError,
     OrderLoadError,
     OrderNotFoundError,
     ProductNotFoundError,
     ProductPriceMissingError,
     ProductUnavailableError,
+    UnknownFieldsError,
 )
 
 
@@ -75,6 +77,12 @@ async def order_load_handler(_request: Request, _exc: OrderLoadError) -> JSONRes
     return _json_error(status.HTTP_500_INTERNAL_SERVER_ERROR, "Failed to load order")
 
 
+async def hot_inventory_disabled_handler(
+    _request: Request, _exc: HotInventoryDisabledError
+) -> JSONResponse:
+    return _json_error(status.HTTP_409_CONFLICT, "Hot inventory mode is disabled")
+
+
 async def identity_error_handler(_request: Request, exc: IdentityError) -> JSONResponse:
     return JSONResponse(
         status_code=exc.status_code,
@@ -90,6 +98,14 @@ async def catalog_error_handler(_request: Request, exc: CatalogError) -> JSONRes
     )
 
 
+async def unknown_fields_handler(
+    _request: Request, exc: UnknownFieldsError
+) -> JSONResponse:
+    return _json_error(
+        status.HTTP_400_BAD_REQUEST, f"Unknown fields: {', '.join(exc.fields)}"
+    )
+
+
 def register_exception_handlers(app: FastAPI) -> None:
     app.add_exception_handler(CartEmptyError, cart_empty_handler)
     app.add_exception_handler(ProductNotFoundError, product_not_found_handler)
@@ -99,5 +115,7 @@ def register_exception_handlers(app: FastAPI) -> None:
     app.add_exception_handler(ProductPriceMissingError, product_price_missing_handler)
     app.add_exception_handler(OrderNotFoundError, order_not_found_handler)
     app.add_exception_handler(OrderLoadError, order_load_handler)
+    app.add_exception_handler(HotInventoryDisabledError, hot_inventory_disabled_handler)
+    app.add_exception_handler(UnknownFieldsError, unknown_fields_handler)
     app.add_exception_handler(IdentityError, identity_error_handler)
     app.add_exception_handler(CatalogError, catalog_error_handler)
@@ -39,3 +39,13 @@ class OrderNotFoundError(Exception):
 
 class OrderLoadError(Exception):
     """Заказ создан, но не удалось перечитать из БД."""
+
+
+class HotInventoryDisabledError(Exception):
+    pass
+
+
+class UnknownFieldsError(Exception):
+    def __init__(self, fields: list[str]) -> None:
+        self.fields = fields
+        super().__init__(f"Unknown fields: {', '.join(fields)}")
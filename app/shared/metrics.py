@@ -0,0 +1,101 @@
+"""Метрики Prometheus.
+
+Под gunicorn каждый воркер пишет значения в свои файлы в
+``PROMETHEUS_MULTIPROC_DIR``, а ``/metrics`` на любом воркере собирает их
+в одну выборку. Без этой переменной — обычный реестр процесса.
+"""
+
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+if _multiproc_dir := os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    # livesum-гейджи создают файл сразу при импорте; без каталога падает
+    # любой процесс с этой переменной (alembic, celery), а не только воркер.
+    os.makedirs(_multiproc_dir, exist_ok=True)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "DB connections checked out of the pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_ACQUIRE_DURATION = Histogram(
+    "db_pool_acquire_seconds",
+    "Time to get a connection from the pool",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "DB pool checkout timeouts")
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Redis round trip by command",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+WS_CONNECTIONS = Gauge(
+    "ws_connections",
+    "Open notification subscriptions (WebSocket and SSE)",
+    multiprocess_mode="livesum",
+)
+WS_REAPED = Counter(
+    "ws_connections_reaped_total", "WebSocket subscriptions dropped by ping timeout"
+)
+WS_REJECTED = Counter(
+    "ws_connections_rejected_total", "Subscriptions rejected by connection limits"
+)
+CHECKOUTS = Counter("checkouts_total", "Checkout attempts by outcome", ["outcome"])
+
+
+def route_template(scope: dict) -> str:
+    """Шаблон маршрута (``/products/{product_id}``), а не сырой путь."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def observe_request(method: str, route: str, status: int, duration: float) -> None:
+    HTTP_REQUESTS.labels(method, route, status).inc()
+    HTTP_REQUEST_DURATION.labels(method, route).observe(duration)
+
+
+@contextmanager
+def count_outcome(counter: Counter) -> Iterator[None]:
+    """success или имя класса исключения как метка outcome."""
+    try:
+        yield
+    except Exception as exc:
+        counter.labels(type(exc).__name__).inc()
+        raise
+    counter.labels("success").inc()
+
+
+def render_metrics() -> bytes:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
@@ -0,0 +1,99 @@
+from collections.abc import Callable
+from functools import lru_cache
+from operator import itemgetter
+from types import NoneType, UnionType
+from typing import Annotated, Any, TypeAliasType, Union, get_args, get_origin
+
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+type Converter = Callable[[Any], Any]
+
+_MISSING = object()
+
+
+class RawJSONResponse(Response):
+    """Ответ из готовых байтов JSON: FastAPI не валидирует и не сериализует его."""
+
+    media_type = "application/json"
+
+
+def serialize(tp: type | TypeAliasType, value: Any) -> RawJSONResponse:
+    """ORM-объекты -> байты JSON по полям схемы tp, без прохода валидации.
+
+    Выход репозитория доверенный: по заранее собранному на тип плану поля
+    копируются в dict (вложенные схемы и списки — рекурсивно), а байты
+    делает pydantic-core. Кастомных сериализаторов у схем ответов нет,
+    поэтому JSON совпадает с тем, что дал бы response_model, — он у
+    маршрута остаётся для OpenAPI.
+    """
+    convert = _converter(tp)
+    return RawJSONResponse(to_json(value if convert is None else convert(value)))
+
+
+@lru_cache(maxsize=256)
+def _converter(tp: Any) -> Converter | None:
+    """План конвертации для типа; None — значение берётся как есть."""
+    if isinstance(tp, TypeAliasType):
+        return _converter(tp.__value__)
+    origin = get_origin(tp)
+    if origin is Annotated:
+        return _converter(get_args(tp)[0])
+    if origin is Union or origin is UnionType:
+        args = [arg for arg in get_args(tp) if arg is not NoneType]
+        inner = _converter(args[0]) if len(args) == 1 else None
+        if inner is None:
+            return None
+        return lambda value: None if value is None else inner(value)
+    if origin is list:
+        inner = _converter(get_args(tp)[0])
+        if inner is None:
+            return None
+        return lambda value: [inner(item) for item in value]
+    if isinstance(tp, type) and issubclass(tp, BaseModel):
+        return _model_converter(tp)
+    return None
+
+
+def _model_converter(model: type[BaseModel]) -> Converter:
+    fields = model.model_fields
+    names = tuple(fields)
+    # Геттер на одно поле вернул бы значение, а не кортеж: дублируем первое
+    # поле, лишнее отрежет zip.
+    by_key = itemgetter(*names, *names[:1])
+    # Вложенные поля разбираются при первом вызове: так работают и схемы,
+    # ссылающиеся сами на себя, — _converter уже закэшировал эту функцию.
+    nested: list[tuple[str, Converter]] | None = None
+
+    def read(source: Any, name: str) -> Any:
+        if isinstance(source, dict):
+            if name in source:
+                return source[name]
+        elif (value := getattr(source, name, _MISSING)) is not _MISSING:
+            return value
+        if fields[name].is_required():
+            raise KeyError(name)
+        return fields[name].get_default(call_default_factory=True)
+
+    def convert(source: Any) -> dict[str, Any]:
+        nonlocal nested
+        if nested is None:
+            nested = [
+                (name, field_converter)
+                for name, info in fields.items()
+                if (field_converter := _converter(info.annotation)) is not None
+            ]
+        # Загруженные колонки и связи ORM лежат в __dict__ объекта: читаем
+        # оттуда, минуя дескрипторы. Не загруженное и значения по умолчанию —
+        # по одному полю через getattr, как сделала бы валидация.
+        try:
+            row = by_key(source if isinstance(source, dict) else source.__dict__)
+        except KeyError:
+            row = [read(source, name) for name in names]
+        values = dict(zip(names, row, strict=False))
+        for name, field_converter in nested:
+            values[name] = field_converter(values[name])
+        return values
+
+    return convert
@@ -0,0 +1,44 @@
+from functools import lru_cache
+
+from pydantic import BaseModel, create_model
+
+from app.shared.exceptions import UnknownFieldsError
+
+# Набор полей из ?fields=; None — все поля схемы.
+type FieldSet = frozenset[str] | None
+
+FIELDS_DESCRIPTION = (
+    "Поля ответа через запятую, например id,name,price,image_url; id отдаётся всегда"
+)
+
+
+def parse_fields(raw: str | None, model: type[BaseModel]) -> FieldSet:
+    if raw is None:
+        return None
+    fields = frozenset(name for part in raw.split(",") if (name := part.strip()))
+    if unknown := fields - model.model_fields.keys():
+        raise UnknownFieldsError(sorted(unknown))
+    return fields | {"id"}
+
+
+def fields_key(fields: FieldSet) -> str:
+    """Часть ключа кэша: разные наборы полей — разные записи."""
+    return ",".join(sorted(fields)) if fields is not None else "*"
+
+
+def sparse_model[M: BaseModel](model: type[M], fields: FieldSet) -> type[M]:
+    """Схема из подмножества полей model; на каждый набор создаётся один раз."""
+    return model if fields is None else _build_sparse_model(model, fields)
+
+
+@lru_cache(maxsize=256)
+def _build_sparse_model(model: type[BaseModel], fields: frozenset[str]):
+    return create_model(
+        f"{model.__name__}Sparse",
+        __config__=model.model_config,
+        **{
+            name: (info.annotation, info)
+            for name, info in model.model_fields.items()
+            if name in fields
+        },
+    )
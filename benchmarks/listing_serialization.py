@@ -0,0 +1,209 @@
+"""CPU на сериализацию ответа листингов: response_model против байтового пути.
+
+Для каждого эндпоинта (/products, /reviews, /orders, /cart) поднимается пара
+маршрутов с одинаковыми заранее собранными данными: прежний — возвращает
+ORM-объекты или модели и отдаёт их на валидацию response_model, новый —
+отдаёт готовые байты JSON (app.shared.responses). БД и Redis не участвуют,
+приложение зовётся напрямую по ASGI. Запуск из корня репозитория:
+
+    DATABASE_URL=sqlite+aiosqlite:// SECRET_KEY=x REDIS_URL=redis://localhost \\
+    CELERY_BROKER_URL=x CELERY_RESULT_BACKEND=x \\
+    python -m benchmarks.listing_serialization --items 100 --requests 2000
+"""
+
+import argparse
+import asyncio
+from datetime import UTC, datetime
+from decimal import Decimal
+from time import process_time
+
+from fastapi import FastAPI
+
+from app.catalog.schemas.product import ProductList
+from app.catalog.schemas.review import Review as ReviewSchema
+from app.models.cart_items import CartItem
+from app.models.categories import Category
+from app.models.orders import Order, OrderItem
+from app.models.products import Product
+from app.models.reviews import Review
+from app.models.users import User
+from app.ordering.schemas.cart import Cart as CartSchema
+from app.ordering.schemas.order import OrderList
+from app.shared.responses import RawJSONResponse, serialize
+from app.shared.schemas.product import Product as ProductSchema
+
+
+def build_fixtures(items: int) -> dict:
+    now = datetime.now(UTC)
+    category = Category(id=1, name="Электроника", is_active=True)
+    user = User(id=1, email="buyer@example.com", role="buyer", is_active=True)
+    products = [
+        Product(
+            id=i,
+            name=f"Товар {i}",
+            description="Описание товара " * 5,
+            price=Decimal("1999.90"),
+            image_url=f"/media/products/{i}.jpg",
+            stock=10,
+            rating=4.5,
+            category_id=category.id,
+            category=category,
+            seller_id=2,
+            is_active=True,
+        )
+        for i in range(1, items + 1)
+    ]
+    reviews = [
+        Review(
+            id=i,
+            user_id=user.id,
+            user=user,
+            product_id=product.id,
+            product=product,
+            comment="Хороший товар",
+            comment_date=now,
+            grade=5,
+            is_active=True,
+        )
+        for i, product in enumerate(products, 1)
+    ]
+    # Страница заказов: десять заказов по items // 10 позиций.
+    per_order = max(items // 10, 1)
+    orders = [
+        Order(
+            id=n,
+            user_id=user.id,
+            status="paid",
+            total_amount=Decimal("1999.90") * per_order,
+            created_at=now,
+            updated_at=now,
+            items=[
+                OrderItem(
+                    id=n * per_order + k,
+                    product_id=product.id,
+                    product=product,
+                    quantity=1,
+                    unit_price=product.price,
+                    total_price=product.price,
+                )
+                for k, product in enumerate(products[:per_order])
+            ],
+        )
+        for n in range(1, 11)
+    ]
+    cart_items = [
+        CartItem(id=i, user_id=user.id, product_id=p.id, product=p, quantity=1)
+        for i, p in enumerate(products, 1)
+    ]
+    product_page = ProductList(
+        items=[ProductSchema.model_validate(product) for product in products],
+        total=items,
+        page=1,
+        page_size=items,
+    ).model_dump_json()
+    return {
+        "product_page": product_page,
+        "reviews": reviews,
+        "orders": orders,
+        "cart": {
+            "user_id": user.id,
+            "items": cart_items,
+            "total_quantity": items,
+            "total_price": Decimal("1999.90") * items,
+        },
+    }
+
+
+def build_app(data: dict) -> FastAPI:
+    app = FastAPI()
+    orders = {"items": data["orders"], "total": 10, "page": 1, "page_size": 10}
+
+    # /products: страница лежит в кэше как JSON.
+    @app.get("/legacy/products", response_model=ProductList)
+    async def legacy_products():
+        return ProductList.model_validate_json(data["product_page"])
+
+    @app.get("/fast/products", response_model=ProductList)
+    async def fast_products():
+        return RawJSONResponse(data["product_page"])
+
+    @app.get("/legacy/reviews", response_model=list[ReviewSchema])
+    async def legacy_reviews():
+        return data["reviews"]
+
+    @app.get("/fast/reviews", response_model=list[ReviewSchema])
+    async def fast_reviews():
+        return serialize(list[ReviewSchema], data["reviews"])
+
+    @app.get("/legacy/orders", response_model=OrderList)
+    async def legacy_orders():
+        return OrderList.__value__(**orders)
+
+    @app.get("/fast/orders", response_model=OrderList)
+    async def fast_orders():
+        return serialize(OrderList, orders)
+
+    # /cart: сервис отдаёт маршруту корзину с ORM-позициями.
+    @app.get("/legacy/cart", response_model=CartSchema)
+    async def legacy_cart():
+        return CartSchema(**data["cart"])
+
+    @app.get("/fast/cart", response_model=CartSchema)
+    async def fast_cart():
+        return serialize(CartSchema, data["cart"])
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> tuple[float, bytes]:
+    """CPU на запрос в микросекундах и тело ответа."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    body = b""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal body
+        if message["type"] == "http.response.body":
+            body = message["body"]
+
+    for _ in range(min(requests // 10, 200)):
+        await app(dict(scope), receive, send)
+    started = process_time()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (process_time() - started) / requests * 1_000_000, body
+
+
+async def main(items: int, requests: int) -> None:
+    app = build_app(build_fixtures(items))
+    for endpoint in ("products", "reviews", "orders", "cart"):
+        legacy, legacy_body = await measure(app, f"/legacy/{endpoint}", requests)
+        fast, fast_body = await measure(app, f"/fast/{endpoint}", requests)
+        assert legacy_body == fast_body, endpoint
+        print(
+            f"{endpoint:>9}: response_model {legacy:8.1f} us, "
+            f"fast path {fast:8.1f} us, x{legacy / fast:4.1f}, {len(fast_body)} bytes"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.requests))
@@ -0,0 +1,153 @@
+"""Накладные расходы middleware на запрос: function-style против чистого ASGI.
+
+Приложение зовётся напрямую по ASGI, без сервера и сети, поэтому разница
+между вариантами — это сами middleware. Запуск из корня репозитория:
+
+    DATABASE_URL=sqlite+aiosqlite:// SECRET_KEY=x REDIS_URL=redis://localhost \\
+    CELERY_BROKER_URL=x CELERY_RESULT_BACKEND=x \\
+    python -m benchmarks.middleware_overhead --requests 20000
+"""
+
+import argparse
+import asyncio
+from time import perf_counter, time
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from loguru import logger
+
+from app.config import settings
+from app.db.instrumentation import QueryStats, current_query_stats
+from app.logging import RequestLoggingMiddleware, _report_queries
+from app.middleware import ErrorHandlerMiddleware, SecurityHeadersMiddleware
+from app.shared.metrics import HTTP_IN_PROGRESS, observe_request, route_template
+
+
+# Прежняя реализация через app.middleware("http") — для сравнения.
+async def legacy_request_logging(request: Request, call_next):
+    request_id = str(uuid4())
+    request.state.request_id = request_id
+    start_time = time()
+    stats = QueryStats(track_statements=settings.app_env != "production")
+    stats_token = current_query_stats.set(stats)
+    HTTP_IN_PROGRESS.inc()
+    with logger.contextualize(request_id=request_id):
+        try:
+            response = await call_next(request)
+            duration = time() - start_time
+            observe_request(
+                request.method,
+                route_template(request.scope),
+                response.status_code,
+                duration,
+            )
+            response.headers["X-Request-Id"] = request_id
+            response.headers["Server-Timing"] = (
+                f"{stats.server_timing()}, app;dur={duration * 1000:.1f}"
+            )
+            logger.info(
+                f"{request.method} {request.url.path} "
+                f"{response.status_code} {duration:.3f}s {stats.summary()}"
+            )
+            _report_queries(request.scope, stats)
+            return response
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            current_query_stats.reset(stats_token)
+
+
+async def legacy_security_headers(request: Request, call_next):
+    response = await call_next(request)
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    response.headers["X-Frame-Options"] = "DENY"
+    response.headers["Strict-Transport-Security"] = (
+        "max-age=31536000; includeSubDomains"
+    )
+    response.headers["X-XSS-Protection"] = "1; mode=block"
+    return response
+
+
+async def legacy_error_handler(request: Request, exc: Exception):
+    return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if variant == "function":
+        app.exception_handler(Exception)(legacy_error_handler)
+        app.middleware("http")(legacy_security_headers)
+        app.middleware("http")(legacy_request_logging)
+    elif variant == "asgi":
+        app.add_middleware(ErrorHandlerMiddleware)
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, requests: int) -> float:
+    """Среднее время запроса в микросекундах."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+
+    async def send(message):
+        pass
+
+    async def run_once():
+        delivered = False
+
+        async def receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Клиент не отключается — ждём, пока ответ не будет отдан.
+            await asyncio.Event().wait()
+
+        await app(dict(scope), receive, send)
+
+    for _ in range(min(requests // 10, 1000)):
+        await run_once()
+    started = perf_counter()
+    for _ in range(requests):
+        await run_once()
+    return (perf_counter() - started) / requests * 1_000_000
+
+
+async def main(requests: int) -> None:
+    # Вывод лога одинаково дорог для всех вариантов и только шумит.
+    logger.remove()
+    results = {
+        variant: await measure(build_app(variant), requests)
+        for variant in ("none", "function", "asgi")
+    }
+    baseline = results["none"]
+    for variant, micros in results.items():
+        print(
+            f"{variant:>9}: {micros:8.1f} us/request, "
+            f"overhead {micros - baseline:7.1f} us, "
+            f"{1_000_000 / micros:8.0f} req/s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    asyncio.run(main(parser.parse_args().requests))
@@ -0,0 +1,36 @@
+import os
+from pathlib import Path
+
+from prometheus_client import multiprocess
+from uvicorn.workers import UvicornWorker
+
+from app.config import settings
+
+
+class PingingUvicornWorker(UvicornWorker):
+    # Протокольный ping WebSocket: клиент отвечает pong сам, не ответивший
+    # за WS_PING_TIMEOUT закрывается с 1006 — полуоткрытые сокеты не копятся.
+    CONFIG_KWARGS = {
+        **UvicornWorker.CONFIG_KWARGS,
+        "ws_ping_interval": settings.ws_ping_interval,
+        "ws_ping_timeout": settings.ws_ping_timeout,
+    }
+
+
+worker_class = PingingUvicornWorker
+
+
+def on_starting(server):
+    # Файлы метрик прошлого запуска иначе попадут в выборку. Чистим
+    # содержимое, а не сам каталог: он может быть точкой монтирования.
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        for stale in directory.glob("*.db"):
+            stale.unlink(missing_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,11 +1,17 @@
+import fnmatch
+import time
+
 import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.auth import create_access_token
+from app.catalog.repositories.catalog_cache import _BUMP_LUA, _STORE_LUA
 from app.config import get_settings
 from app.db.deps import get_async_db, get_redis
+from app.identity.repositories.principal_cache import _SET_IF_CURRENT_LUA
+from app.identity.repositories.refresh_token_store import _REVOKE_ALL_LUA
 from app.main import app
 from app.models.cart_items import CartItem
 from app.models.categories import Category
@@ -43,27 +49,205 @@ async def _create_test_schema(conn) -> None:
     await conn.run_sync(CartItem.__table__.create)
 
 
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis"):
+        self._redis = redis
+        self._commands: list = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        commands, self._commands = self._commands, []
+        return [
+            await getattr(self._redis, name)(*args, **kwargs)
+            for name, args, kwargs in commands
+        ]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._commands = []
+
+
+async def _revoke_all(redis: "FakeRedis", keys, args):
+    if await redis.zrange(keys[0], 0, -1) != list(args):
+        return -1
+    await redis.delete(*keys)
+    return len(args)
+
+
+async def _set_if_current(redis: "FakeRedis", keys, args):
+    if (await redis.get(keys[1]) or "0") != str(args[0]):
+        return 0
+    await redis.set(keys[0], args[1], ex=args[2])
+    return 1
+
+
+async def _bump_tags(redis: "FakeRedis", keys, args):
+    sequence = await redis.incr(keys[0])
+    for key in keys[1:]:
+        await redis.set(key, str(sequence), ex=args[0])
+    return sequence
+
+
+async def _store_if_current(redis: "FakeRedis", keys, args):
+    n = (len(keys) - 1) // 2
+    versions = await redis.mget(*keys[1 + n :])
+    if any(int(version or 0) > int(args[2]) for version in versions):
+        return 0
+    await redis.set(keys[0], args[0], ex=args[1])
+    for tag_key in keys[1 : 1 + n]:
+        await redis.sadd(tag_key, keys[0])
+    return 1
+
+
+# Lua-скрипты приложения, переписанные на Python для FakeRedis.
+FAKE_SCRIPTS = {
+    _REVOKE_ALL_LUA: _revoke_all,
+    _SET_IF_CURRENT_LUA: _set_if_current,
+    _BUMP_LUA: _bump_tags,
+    _STORE_LUA: _store_if_current,
+}
+
+
 class FakeRedis:
     def __init__(self):
-        self._store: dict[str, str] = {}
+        self._store: dict[str, str | set[str] | dict[str, str]] = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
 
-    async def set(self, key, value, ex=None):
+    def register_script(self, script):
+        handler = FAKE_SCRIPTS[script]
+
+        async def run(keys=(), args=()):
+            return await handler(self, list(keys), list(args))
+
+        return run
+
+    async def scan_iter(self, match="*", count=None):
+        for key in list(self._store):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def get(self, key):
+        return self._store.get(key)
+
+    async def mget(self, *keys):
+        return [self._store.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self._store:
+            return None
         self._store[key] = value
         return True
 
-    async def delete(self, key):
-        if key in self._store:
-            del self._store[key]
-            return 1
+    async def incr(self, key):
+        self._store[key] = str(int(self._store.get(key, 0)) + 1)
+        return int(self._store[key])
+
+    async def delete(self, *keys):
+        deleted = 0
+        for key in keys:
+            if key in self._store:
+                del self._store[key]
+                deleted += 1
+        return deleted
+
+    async def expire(self, key, seconds, nx=False, gt=False):
+        return key in self._store
+
+    async def sadd(self, key, *members):
+        current = self._store.setdefault(key, set())
+        added = len(set(members) - current)
+        current.update(members)
+        return added
+
+    async def smembers(self, key):
+        return set(self._store.get(key, set()))
+
+    async def hget(self, key, field):
+        return self._store.get(key, {}).get(field)
+
+    async def hgetall(self, key):
+        return dict(self._store.get(key, {}))
+
+    async def hdel(self, key, *fields):
+        current = self._store.get(key, {})
+        return sum(current.pop(field, None) is not None for field in fields)
+
+    async def hset(self, key, field, value):
+        current = self._store.setdefault(key, {})
+        added = field not in current
+        current[field] = value
+        return int(added)
+
+    async def zadd(self, key, mapping):
+        current = self._store.setdefault(key, {})
+        added = len(set(mapping) - set(current))
+        current.update(mapping)
+        return added
+
+    async def zrem(self, key, *members):
+        current = self._store.get(key, {})
+        removed = 0
+        for member in members:
+            if current.pop(member, None) is not None:
+                removed += 1
+        return removed
+
+    async def zrange(self, key, start, end):
+        members = sorted(self._store.get(key, {}).items(), key=lambda item: item[1])
+        end = len(members) if end == -1 else end + 1
+        return [member for member, _ in members[start:end]]
+
+    async def zremrangebyscore(self, key, min_score, max_score):
+        current = self._store.get(key, {})
+        low = float(min_score)
+        high = float(max_score)
+        expired = [m for m, score in current.items() if low <= score <= high]
+        for member in expired:
+            del current[member]
+        return len(expired)
+
+    async def xadd(self, key, fields, maxlen=None, approximate=True):
+        entries = self._store.setdefault(key, [])
+        ms = int(time.time() * 1000)
+        seq = 0
+        if entries:
+            last_ms, last_seq = map(int, entries[-1][0].split("-"))
+            if last_ms >= ms:
+                ms, seq = last_ms, last_seq + 1
+        event_id = f"{ms}-{seq}"
+        entries.append((event_id, dict(fields)))
+        if maxlen is not None:
+            del entries[:-maxlen]
+        return event_id
+
+    async def xtrim(self, key, minid=None, approximate=True):
+        entries = self._store.get(key, [])
+        kept = [e for e in entries if int(e[0].split("-")[0]) >= minid]
+        self._store[key] = kept
+        return len(entries) - len(kept)
+
+    async def xrevrange(self, key, max="+", min="-", count=None):
+        def as_tuple(event_id):
+            return tuple(map(int, event_id.split("-")))
+
+        entries = self._store.get(key, [])
+        if min.startswith("("):
+            entries = [e for e in entries if as_tuple(e[0]) > as_tuple(min[1:])]
+        return entries[::-1][:count]
+
+    async def publish(self, channel, message):
         return 0
 
-    async def scan_iter(self, match=None):
-        if match and match.endswith("*"):
-            prefix = match[:-1]
-            for key in list(self._store):
-                if key.startswith(prefix):
-                    yield key
-
 
 @pytest_asyncio.fixture
 async def client():
@@ -1,5 +1,28 @@
+import asyncio
+import os
+import time
+
+import pytest
+from redis.asyncio import Redis
+
 from app.auth import hash_password, verify_password
-from tests.conftest import login_user, register_user
+from app.identity.deps import get_password_hasher
+from app.identity.exceptions import PasswordHasherBusyError
+from app.identity.repositories.principal_cache import (
+    LocalPrincipalCache,
+    Principal,
+    PrincipalCache,
+)
+from app.identity.repositories.refresh_token_store import RefreshTokenStore
+from app.identity.services.password_hasher import PasswordHasher
+from app.main import app
+from tests.conftest import FakeRedis, login_user, register_user
+
+TEST_REDIS_URL = os.getenv("TEST_REDIS_URL")
+
+requires_redis = pytest.mark.skipif(
+    not TEST_REDIS_URL, reason="TEST_REDIS_URL is not set"
+)
 
 
 def test_hash_password():
@@ -21,6 +44,58 @@ def test_hash_password_produces_different_hashes():
     assert verify_password(password, hashed2)
 
 
+async def test_password_hasher_rejects_when_queue_is_full():
+    hasher = PasswordHasher(rounds=4, max_concurrency=1, max_queue=1)
+
+    results = await asyncio.gather(
+        *(hasher.hash("password123") for _ in range(3)), return_exceptions=True
+    )
+
+    assert sum(isinstance(r, PasswordHasherBusyError) for r in results) == 1
+    assert hasher.stats().rejected == 1
+    assert hasher.stats().peak_queued == 1
+    assert hasher.stats().in_flight == 0
+    hasher.shutdown()
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+async def test_password_hasher_rehashes_when_rounds_change(executor):
+    old = PasswordHasher(rounds=4, max_concurrency=1, max_queue=1, executor=executor)
+    new = PasswordHasher(rounds=5, max_concurrency=1, max_queue=1, executor=executor)
+    hashed = await old.hash("password123")
+
+    assert await old.verify_and_update("password123", hashed) == (True, None)
+    valid, rehashed = await new.verify_and_update("password123", hashed)
+    assert valid is True
+    assert rehashed.startswith("$2b$05$")
+    assert await new.verify_and_update("wrong", hashed) == (False, None)
+    old.shutdown()
+    new.shutdown()
+
+
+def test_login_stores_rehashed_password(client):
+    app.dependency_overrides[get_password_hasher] = lambda: PasswordHasher(
+        rounds=4, max_concurrency=1, max_queue=1
+    )
+    register_user(client, email="rehash@test.com", password="password123")
+
+    seen: list[str] = []
+
+    class RecordingHasher(PasswordHasher):
+        async def verify_and_update(self, password, hashed_password):
+            seen.append(hashed_password)
+            return await super().verify_and_update(password, hashed_password)
+
+    app.dependency_overrides[get_password_hasher] = lambda: RecordingHasher(
+        rounds=5, max_concurrency=1, max_queue=1
+    )
+    assert login_user(client, email="rehash@test.com").status_code == 200
+    assert login_user(client, email="rehash@test.com").status_code == 200
+
+    assert seen[0].startswith("$2b$04$")
+    assert seen[1].startswith("$2b$05$")
+
+
 def test_refresh_returns_new_access_token(client):
     register_user(client, email="refresh@test.com", password="password123")
     login_user(client, email="refresh@test.com", password="password123")
@@ -62,3 +137,156 @@ def test_refresh_token_reuse_returns_401(client):
 
     assert response.status_code == 401
     assert response.json()["detail"] == "Token reuse detected"
+
+
+def test_reuse_revokes_every_refresh_token_of_user(client):
+    register_user(client, email="reuse@test.com", password="password123")
+    login_user(client, email="reuse@test.com", password="password123")
+    stolen = client.cookies.get("refresh_token")
+    client.post("/users/refresh")
+    client.cookies.clear()
+    login_user(client, email="reuse@test.com", password="password123")
+    second_session = client.cookies.get("refresh_token")
+
+    client.cookies.clear()
+    client.cookies.set("refresh_token", stolen, path="/users")
+    assert client.post("/users/refresh").status_code == 401
+
+    client.cookies.clear()
+    client.cookies.set("refresh_token", second_session, path="/users")
+    response = client.post("/users/refresh")
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token reuse detected"
+
+
+async def test_refresh_store_prunes_expired_index_members():
+    redis = FakeRedis()
+    store = RefreshTokenStore(redis)
+    await redis.zadd("refresh_index:1", {"expired": 1.0})
+    await store.save(1, "live", ttl=60)
+
+    assert await redis.zrange("refresh_index:1", 0, -1) == ["live"]
+
+    await store.delete_all_for_user(1)
+    assert await redis.get("refresh:1:live") is None
+    assert await redis.zrange("refresh_index:1", 0, -1) == []
+
+
+async def test_refresh_store_rotate_is_single_use():
+    redis = FakeRedis()
+    store = RefreshTokenStore(redis)
+    await store.save(1, "old", ttl=60)
+
+    assert await store.rotate(1, "old", "new", ttl=60) is True
+    assert await redis.get("refresh:1:old") is None
+    assert await redis.get("refresh:1:new") == "1"
+    assert await redis.zrange("refresh_index:1", 0, -1) == ["new"]
+
+    assert await store.rotate(1, "old", "other", ttl=60) is False
+
+
+async def test_refresh_store_revokes_tokens_issued_before_index():
+    redis = FakeRedis()
+    store = RefreshTokenStore(redis, legacy_scan_until=time.time() + 60)
+    await redis.set("refresh:1:legacy", "1")
+    await redis.set("refresh:12:other-user", "12")
+    await store.save(1, "indexed", ttl=60)
+
+    await store.delete_all_for_user(1)
+
+    assert await redis.get("refresh:1:legacy") is None
+    assert await redis.get("refresh:1:indexed") is None
+    assert await redis.get("refresh:12:other-user") == "12"
+
+
+async def test_refresh_store_stops_scanning_after_cutoff(monkeypatch):
+    redis = FakeRedis()
+    store = RefreshTokenStore(redis, legacy_scan_until=time.time() - 1)
+
+    async def forbidden_scan(*args, **kwargs):
+        raise AssertionError("SCAN after cutoff")
+        yield
+
+    monkeypatch.setattr(redis, "scan_iter", forbidden_scan)
+    await store.save(1, "indexed", ttl=60)
+
+    await store.delete_all_for_user(1)
+
+    assert await redis.get("refresh:1:indexed") is None
+
+
+async def test_refresh_store_revoke_all_rereads_changed_index(monkeypatch):
+    redis = FakeRedis()
+    store = RefreshTokenStore(redis)
+    await store.save(1, "a", ttl=60)
+    zrange = redis.zrange
+
+    async def zrange_then_login(*args, **kwargs):
+        # Между чтением индекса и скриптом выдан ещё один токен.
+        jtis = await zrange(*args, **kwargs)
+        if await redis.get("refresh:1:b") is None:
+            await store.save(1, "b", ttl=60)
+        return jtis
+
+    monkeypatch.setattr(redis, "zrange", zrange_then_login)
+    await store.delete_all_for_user(1)
+
+    assert await redis.get("refresh:1:a") is None
+    assert await redis.get("refresh:1:b") is None
+
+
+@requires_redis
+async def test_refresh_store_revoke_all_script_on_redis():
+    redis = Redis.from_url(TEST_REDIS_URL, decode_responses=True)
+    await redis.flushdb()
+    store = RefreshTokenStore(redis)
+    await redis.mset({"refresh:1:a": "1", "refresh:1:b": "1", "refresh:2:c": "2"})
+    await redis.zadd("refresh_index:1", {"a": 1e12, "b": 1e12})
+
+    await store.delete_all_for_user(1)
+
+    assert await redis.keys("refresh*:1*") == []
+    assert await redis.get("refresh:2:c") == "2"
+    await redis.aclose()
+
+
+async def _race_principal_cache(redis) -> PrincipalCache:
+    cache = PrincipalCache(redis, LocalPrincipalCache(maxsize=10, ttl=60), ttl=60)
+    principal = Principal(id=1, email="buyer@test.com", role="seller")
+    # Запрос прочитал поколение и пользователя, тут пришёл PATCH.
+    generation = await cache.generation(1)
+    await cache.invalidate(1)
+    await cache.set("jti", principal, generation)
+    return cache
+
+
+async def test_principal_cache_skips_write_after_invalidation():
+    cache = await _race_principal_cache(FakeRedis())
+
+    assert await cache.get(1, "jti") is None
+
+
+@requires_redis
+async def test_principal_cache_generation_check_on_redis():
+    redis = Redis.from_url(TEST_REDIS_URL, decode_responses=True)
+    await redis.flushdb()
+    cache = await _race_principal_cache(redis)
+
+    assert await cache.get(1, "jti") is None
+    principal = Principal(id=1, email="buyer@test.com", role="buyer")
+    await cache.set("jti", principal, await cache.generation(1))
+    assert 0 < await redis.ttl("principal:1:jti") <= 60
+    assert await redis.ttl("principal:gen:1") == -1
+    await redis.aclose()
+
+
+async def test_principal_cache_ignores_entries_of_old_generation():
+    redis = FakeRedis()
+    cache = PrincipalCache(redis, LocalPrincipalCache(maxsize=10, ttl=0), ttl=60)
+    principal = Principal(id=1, email="buyer@test.com", role="seller")
+    await cache.set("jti", principal, await cache.generation(1))
+    assert await cache.get(1, "jti") == principal
+
+    await cache.invalidate(1)
+
+    assert await cache.get(1, "jti") is None
@@ -77,3 +77,46 @@ def test_login_then_access_cart(client):
 
     assert cart_response.status_code == 200
     assert cart_response.json()["user_id"] == user["id"]
+
+
+def _admin_headers(client) -> dict:
+    admin = register_user(client, email="admin@test.com", role="admin").json()
+    return auth_headers(admin["email"], admin["id"], admin["role"])
+
+
+def test_deactivated_user_is_evicted_from_principal_cache(client):
+    user = register_user(client).json()
+    headers = auth_headers(user["email"], user["id"], user["role"])
+    assert client.get("/cart/", headers=headers).status_code == 200
+
+    response = client.patch(
+        f"/users/{user['id']}",
+        headers=_admin_headers(client),
+        json={"is_active": False},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["is_active"] is False
+    assert client.get("/cart/", headers=headers).status_code == 401
+
+
+def test_role_change_is_visible_to_cached_token(client):
+    user = register_user(client, email="seller@test.com", role="seller").json()
+    headers = auth_headers(user["email"], user["id"], user["role"])
+    assert client.get("/cart/", headers=headers).status_code == 200
+
+    client.patch(
+        f"/users/{user['id']}", headers=_admin_headers(client), json={"role": "buyer"}
+    )
+
+    response = client.post("/products/", headers=headers, data={})
+    assert response.status_code == 403
+
+
+def test_update_unknown_user_returns_404(client):
+    response = client.patch(
+        "/users/999", headers=_admin_headers(client), json={"is_active": False}
+    )
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User not found"
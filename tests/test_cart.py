@@ -0,0 +1,113 @@
+from tests.conftest import (
+    auth_headers,
+    create_category,
+    create_product,
+    register_seller,
+    register_user,
+)
+
+
+def _setup(client, count: int = 1):
+    seller = register_seller(client).json()
+    seller_headers = auth_headers(seller["email"], seller["id"], seller["role"])
+    category_id = create_category(client).json()["id"]
+    product_ids = [
+        create_product(client, seller_headers, category_id, name=f"Phone {i}").json()[
+            "id"
+        ]
+        for i in range(count)
+    ]
+    buyer = register_user(client, email="buyer@test.com").json()
+    buyer_headers = auth_headers(buyer["email"], buyer["id"], buyer["role"])
+    return product_ids, buyer_headers, category_id
+
+
+def test_add_item_upserts_quantity(client):
+    [product_id], headers, category_id = _setup(client)
+
+    first = client.post(
+        "/cart/items/", headers=headers, json={"product_id": product_id, "quantity": 2}
+    )
+    second = client.post(
+        "/cart/items/", headers=headers, json={"product_id": product_id, "quantity": 3}
+    )
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert second.json()["id"] == first.json()["id"]
+    assert second.json()["quantity"] == 5
+    assert second.json()["product"]["category"] == {
+        "id": category_id,
+        "name": "Phones",
+    }
+    cart = client.get("/cart/", headers=headers).json()
+    assert cart["total_quantity"] == 5
+
+
+def test_add_item_unknown_product_returns_404(client):
+    _, headers, _ = _setup(client)
+
+    response = client.post(
+        "/cart/items/", headers=headers, json={"product_id": 999, "quantity": 1}
+    )
+
+    assert response.status_code == 404
+
+
+def test_batch_update_applies_operations_in_order(client):
+    (first, second, third), headers, _ = _setup(client, count=3)
+    client.post(
+        "/cart/items/", headers=headers, json={"product_id": first, "quantity": 1}
+    )
+    client.post(
+        "/cart/items/", headers=headers, json={"product_id": third, "quantity": 4}
+    )
+
+    response = client.patch(
+        "/cart/items/",
+        headers=headers,
+        json={
+            "operations": [
+                {"op": "add", "product_id": first, "quantity": 2},
+                {"op": "set", "product_id": second, "quantity": 5},
+                {"op": "add", "product_id": second, "quantity": 1},
+                {"op": "remove", "product_id": third},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    cart = response.json()
+    quantities = {item["product"]["id"]: item["quantity"] for item in cart["items"]}
+    assert quantities == {first: 3, second: 6}
+    assert cart["total_quantity"] == 9
+
+
+def test_batch_update_with_unknown_product_changes_nothing(client):
+    [product_id], headers, _ = _setup(client)
+
+    response = client.patch(
+        "/cart/items/",
+        headers=headers,
+        json={
+            "operations": [
+                {"op": "add", "product_id": product_id, "quantity": 1},
+                {"op": "set", "product_id": 999, "quantity": 1},
+            ]
+        },
+    )
+
+    assert response.status_code == 404
+    assert client.get("/cart/", headers=headers).json()["items"] == []
+
+
+def test_batch_update_rejects_unknown_operation(client):
+    [product_id], headers, _ = _setup(client)
+
+    response = client.patch(
+        "/cart/items/",
+        headers=headers,
+        json={"operations": [{"op": "clear", "product_id": product_id}]},
+    )
+
+    assert response.status_code == 422
@@ -0,0 +1,129 @@
+import pytest
+from sqlalchemy import Column, MetaData, String, Table, insert, select
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import Settings
+from app.db.instrumentation import QueryStats
+from app.db.pool import InstrumentedQueuePool, pool_stats
+from app.db.routing import RoutingSession, replica_reads
+from app.db.session import engine_options
+from tests.conftest import auth_headers, register_user
+
+
+def _settings(**overrides) -> Settings:
+    return Settings(
+        secret_key="test",
+        redis_url="redis://localhost",
+        celery_broker_url="redis://localhost",
+        celery_result_backend="redis://localhost",
+        **overrides,
+    )
+
+
+def test_engine_options_skip_pool_for_sqlite():
+    options = engine_options(_settings(database_url="sqlite+aiosqlite:///:memory:"))
+
+    assert options == {"echo": False}
+
+
+def test_engine_options_for_pgbouncer():
+    options = engine_options(
+        _settings(
+            database_url="postgresql+asyncpg://app@pgbouncer/shop",
+            database_pool_size=5,
+            database_pgbouncer=True,
+        )
+    )
+
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 5
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    name_func = options["connect_args"]["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+async def test_pool_stats_count_checkouts_and_timeouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    async with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            async with engine.connect():
+                pass
+        stats = pool_stats(engine)
+    await engine.dispose()
+
+    assert stats.checked_out == 1
+    assert stats.overflow == 0
+    assert stats.acquisitions == 2
+    assert stats.timeouts == 1
+    assert stats.wait_max_ms >= 50
+
+
+source = Table("source", MetaData(), Column("name", String))
+
+
+async def test_replica_reads_stick_to_primary_after_write(tmp_path):
+    engines = {}
+    for name in ("primary", "replica"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(source.metadata.create_all)
+            await conn.execute(insert(source).values(name=name))
+        engines[name] = engine
+    session_maker = async_sessionmaker(
+        engines["primary"],
+        sync_session_class=RoutingSession,
+        replicas=[engines["replica"].sync_engine],
+    )
+    query = select(source.c.name).limit(1)
+
+    async with session_maker() as db:
+        assert await db.scalar(query) == "primary"
+        with replica_reads(db):
+            assert await db.scalar(query) == "replica"
+        await db.execute(insert(source).values(name="written"))
+        await db.commit()
+        with replica_reads(db):
+            assert await db.scalar(query) == "primary"
+
+    for engine in engines.values():
+        await engine.dispose()
+
+
+def test_admin_db_pool_stats(client):
+    admin = register_user(client, email="admin@test.com", role="admin").json()
+    headers = auth_headers(admin["email"], admin["id"], admin["role"])
+
+    response = client.get("/admin/db/pool", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["pool"]
+
+
+def test_requests_report_sql_in_server_timing(client):
+    response = client.get("/products/")
+
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    queries = int(timing.split('desc="')[1].split(" ")[0])
+    assert queries >= 1
+    assert ", app;dur=" in timing
+
+
+def test_query_stats_flag_repeated_statements():
+    stats = QueryStats(track_statements=True)
+    for elapsed in (0.001, 0.004, 0.002):
+        stats.record("SELECT * FROM reviews WHERE product_id = ?", elapsed)
+    stats.record("SELECT * FROM products", 0.003)
+
+    assert stats.count == 4
+    assert stats.slowest == 0.004
+    assert stats.repeated(3) == [("SELECT * FROM reviews WHERE product_id = ?", 3)]
+    assert stats.repeated(4) == []
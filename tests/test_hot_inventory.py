@@ -0,0 +1,297 @@
+"""Режим «горячих» остатков. Lua-скрипты нужен настоящий Redis — тесты с ним
+пропускаются без TEST_REDIS_URL, например ``redis://localhost:6379/15``.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from redis.asyncio import Redis
+
+from app.catalog.schemas.product import ProductCreate
+from app.catalog.services.product_service import ProductService
+from app.config import get_settings
+from app.db.deps import get_redis
+from app.main import app
+from app.ordering.repositories.hot_stock_store import HotStockStore
+from app.ordering.services import stock_reconciler
+from app.ordering.services.stock_reconciler import StockReconciler, flush_pending
+from tests.conftest import (
+    auth_headers,
+    create_category,
+    create_product,
+    register_seller,
+    register_user,
+)
+
+TEST_REDIS_URL = os.getenv("TEST_REDIS_URL")
+
+requires_redis = pytest.mark.skipif(
+    not TEST_REDIS_URL, reason="TEST_REDIS_URL is not set"
+)
+
+
+@pytest.fixture
+def hot_client(client):
+    settings = get_settings().model_copy(
+        update={"hot_inventory_enabled": True, "catalog_cache_ttl": 0}
+    )
+
+    async def override_get_redis():
+        redis = Redis.from_url(TEST_REDIS_URL, decode_responses=True)
+        yield redis
+        await redis.aclose()
+
+    app.dependency_overrides[get_settings] = lambda: settings
+    app.dependency_overrides[get_redis] = override_get_redis
+    client.portal.call(_flush_redis)
+    return client
+
+
+async def _flush_redis() -> None:
+    redis = Redis.from_url(TEST_REDIS_URL, decode_responses=True)
+    await redis.flushdb()
+    await redis.aclose()
+
+
+def _setup(client, stock: str):
+    seller = register_seller(client).json()
+    seller_headers = auth_headers(seller["email"], seller["id"], seller["role"])
+    category_id = create_category(client).json()["id"]
+    product_id = create_product(
+        client, seller_headers, category_id, name="Pixel", stock=stock
+    ).json()["id"]
+    admin = register_user(client, email="admin@test.com", role="admin").json()
+    admin_headers = auth_headers(admin["email"], admin["id"], admin["role"])
+    buyer = register_user(client, email="buyer@test.com").json()
+    buyer_headers = auth_headers(buyer["email"], buyer["id"], buyer["role"])
+    return product_id, admin_headers, buyer_headers, seller_headers
+
+
+def _add_to_cart(client, headers, product_id: int, quantity: int) -> None:
+    client.post(
+        "/cart/items/",
+        headers=headers,
+        json={"product_id": product_id, "quantity": quantity},
+    )
+
+
+def test_hot_inventory_is_disabled_by_default(client):
+    product_id, admin_headers, *_ = _setup(client, stock="5")
+
+    response = client.put(
+        f"/products/{product_id}/hot-inventory/", headers=admin_headers
+    )
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Hot inventory mode is disabled"
+
+
+@requires_redis
+def test_hot_checkout_decrements_counter_and_flushes_on_disable(hot_client):
+    product_id, admin_headers, buyer_headers, _ = _setup(hot_client, stock="5")
+    url = f"/products/{product_id}/hot-inventory/"
+    assert hot_client.put(url, headers=admin_headers).json()["available"] == 5
+
+    _add_to_cart(hot_client, buyer_headers, product_id, 3)
+    response = hot_client.post("/orders/checkout", headers=buyer_headers)
+
+    assert response.status_code == 201
+    assert hot_client.get(url, headers=admin_headers).json()["available"] == 2
+    assert hot_client.get(f"/products/{product_id}").json()["stock"] == 5
+
+    assert hot_client.delete(url, headers=admin_headers).status_code == 204
+    assert hot_client.get(url, headers=admin_headers).json()["available"] is None
+    assert hot_client.get(f"/products/{product_id}").json()["stock"] == 2
+
+
+@requires_redis
+def test_hot_checkout_not_enough_stock_keeps_counter_and_cart(hot_client):
+    product_id, admin_headers, buyer_headers, _ = _setup(hot_client, stock="2")
+    url = f"/products/{product_id}/hot-inventory/"
+    hot_client.put(url, headers=admin_headers)
+
+    _add_to_cart(hot_client, buyer_headers, product_id, 3)
+    response = hot_client.post("/orders/checkout", headers=buyer_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Not enough stock for product Pixel"
+    assert hot_client.get(url, headers=admin_headers).json()["available"] == 2
+    cart = hot_client.get("/cart/", headers=buyer_headers).json()
+    assert cart["items"][0]["quantity"] == 3
+
+
+@requires_redis
+def test_stock_edit_of_hot_product_moves_counter(hot_client):
+    product_id, admin_headers, buyer_headers, seller_headers = _setup(
+        hot_client, stock="5"
+    )
+    url = f"/products/{product_id}/hot-inventory/"
+    hot_client.put(url, headers=admin_headers)
+    _add_to_cart(hot_client, buyer_headers, product_id, 3)
+    hot_client.post("/orders/checkout", headers=buyer_headers)
+    category_id = hot_client.get(f"/products/{product_id}").json()["category_id"]
+
+    # Продавец видит 5 (продажи ещё не сверены) и довозит 10 штук.
+    response = hot_client.put(
+        f"/products/{product_id}",
+        headers=seller_headers,
+        data={
+            "name": "Pixel",
+            "price": "99.99",
+            "stock": "15",
+            "category_id": str(category_id),
+        },
+    )
+
+    assert response.status_code == 200
+    assert hot_client.get(url, headers=admin_headers).json()["available"] == 12
+    hot_client.delete(url, headers=admin_headers)
+    assert hot_client.get(f"/products/{product_id}").json()["stock"] == 12
+
+
+@requires_redis
+async def test_reconciler_releases_stale_holds():
+    redis = Redis.from_url(TEST_REDIS_URL, decode_responses=True)
+    await redis.flushdb()
+    store = HotStockStore(redis)
+    await store.enable(1, 10)
+    reservation = await store.reserve({1: 4})
+    assert await store.available(1) == 6
+
+    reconciler = StockReconciler(
+        store, None, None, hold_timeout=-1, batch_timeout=60, batch_size=100
+    )
+    assert await reconciler.release_expired_holds() == 1
+
+    assert await store.available(1) == 10
+    assert await store.confirm(reservation) is False
+    assert await store.drain_pending() is None
+    await redis.aclose()
+
+
+class _StockRepo:
+    def __init__(self, *, fail: bool = False) -> None:
+        self.fail = fail
+        self.applied: dict[int, int] = {}
+
+    async def apply_deltas(self, deltas: dict[int, int]) -> None:
+        self.applied.update(deltas)
+
+    async def commit(self) -> None:
+        if self.fail:
+            raise RuntimeError("db is down")
+
+    async def rollback(self) -> None:
+        self.applied.clear()
+
+
+class _Cache:
+    async def invalidate(self, *tags: str) -> None:
+        pass
+
+
+@requires_redis
+async def test_failed_flush_returns_deltas_to_pending():
+    redis = Redis.from_url(TEST_REDIS_URL, decode_responses=True)
+    await redis.flushdb()
+    store = HotStockStore(redis)
+    await store.enable(1, 10)
+    assert await store.confirm(await store.reserve({1: 3}))
+
+    with pytest.raises(RuntimeError):
+        await flush_pending(store, _StockRepo(fail=True), _Cache(), batch_size=100)
+
+    repo = _StockRepo()
+    assert await flush_pending(store, repo, _Cache(), batch_size=100) == 1
+    assert repo.applied == {1: 3}
+    assert await store.claim_stale_batches(time.time() + 1) == []
+    await redis.aclose()
+
+
+@requires_redis
+async def test_reconciler_recovers_batch_of_crashed_worker(monkeypatch):
+    redis = Redis.from_url(TEST_REDIS_URL, decode_responses=True)
+    await redis.flushdb()
+    store = HotStockStore(redis)
+    await store.enable(1, 10)
+    assert await store.confirm(await store.reserve({1: 3}))
+    # Воркер забрал дельты и упал, не дойдя до коммита.
+    assert (await store.drain_pending()).deltas == {1: 3}
+
+    repo = _StockRepo()
+    monkeypatch.setattr(stock_reconciler, "StockRepository", lambda session: repo)
+
+    @asynccontextmanager
+    async def session_maker():
+        yield None
+
+    fresh = StockReconciler(
+        store,
+        session_maker,
+        _Cache(),
+        hold_timeout=30,
+        batch_timeout=60,
+        batch_size=100,
+    )
+    assert await fresh.recover_batches() == 0
+
+    stale = StockReconciler(
+        store,
+        session_maker,
+        _Cache(),
+        hold_timeout=30,
+        batch_timeout=-1,
+        batch_size=100,
+    )
+    assert await stale.recover_batches() == 1
+    assert repo.applied == {1: 3}
+    assert await stale.recover_batches() == 0
+    assert await store.drain_pending() is None
+    await redis.aclose()
+
+
+class _CancelledCommitProducts:
+    def __init__(self) -> None:
+        self.product = SimpleNamespace(
+            id=1, seller_id=7, category_id=2, stock=5, image_url=None
+        )
+
+    async def get_active_by_id(self, product_id: int):
+        return self.product
+
+    async def update_fields(self, product_id: int, values: dict) -> None:
+        pass
+
+    async def commit(self) -> None:
+        raise asyncio.CancelledError
+
+
+class _Categories:
+    async def get_active_by_id(self, category_id: int):
+        return SimpleNamespace(id=category_id)
+
+
+class _Counter:
+    def __init__(self) -> None:
+        self.value = 5
+
+    async def adjust(self, product_id: int, delta: int) -> bool:
+        self.value += delta
+        return True
+
+
+async def test_cancelled_stock_edit_rolls_back_hot_counter():
+    counter = _Counter()
+    service = ProductService(
+        _CancelledCommitProducts(), _Categories(), None, None, None, counter
+    )
+    data = ProductCreate(name="Pixel", price="99.99", stock=15, category_id=2)
+
+    with pytest.raises(asyncio.CancelledError):
+        await service.update(1, data, seller_id=7, image=None)
+
+    assert counter.value == 5
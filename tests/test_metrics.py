@@ -0,0 +1,86 @@
+import os
+import runpy
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.main import app
+from tests.conftest import auth_headers, register_user
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_use_route_templates(client):
+    before = _sample(
+        "http_requests_total",
+        method="GET",
+        route="/products/{product_id}",
+        status="404",
+    )
+
+    client.get("/products/999")
+    client.get("/products/998")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/products/{product_id}"' in response.text
+    assert "/products/999" not in response.text
+    after = _sample(
+        "http_requests_total",
+        method="GET",
+        route="/products/{product_id}",
+        status="404",
+    )
+    assert after - before == 2
+
+
+def test_checkout_outcomes_are_counted(client):
+    user = register_user(client).json()
+    headers = auth_headers(user["email"], user["id"], user["role"])
+    before = _sample("checkouts_total", outcome="CartEmptyError")
+
+    response = client.post("/orders/checkout", headers=headers)
+
+    assert response.status_code == 404
+    assert _sample("checkouts_total", outcome="CartEmptyError") - before == 1
+
+
+def test_multiprocess_dir_is_created_on_import(tmp_path):
+    path = tmp_path / "prometheus"
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(path)}
+
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.shared.metrics"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert path.is_dir()
+
+
+def test_gunicorn_on_starting_clears_stale_files(tmp_path, monkeypatch):
+    (tmp_path / "gauge_livesum_1.db").write_bytes(b"stale")
+    (tmp_path / "counter_1.db").write_bytes(b"stale")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    config = runpy.run_path(str(Path(__file__).parents[1] / "gunicorn.conf.py"))
+
+    config["on_starting"](None)
+
+    assert tmp_path.is_dir()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_metrics_are_scraped_by_service_name():
+    # Prometheus ходит на web:8000 внутри сети compose, мимо nginx.
+    response = TestClient(app, base_url="https://web:8000").get("/metrics")
+
+    assert response.status_code == 200
+    assert "http_requests_total" in response.text
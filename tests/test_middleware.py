@@ -0,0 +1,95 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from loguru import logger
+
+from app.config import settings
+from app.middleware import setup_middleware
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    setup_middleware(app)
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404)
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield b"first,"
+            yield b"second"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+
+def test_unhandled_error_becomes_json_500_with_headers():
+    with TestClient(_app(), base_url="https://localhost") as client:
+        response = client.get("/boom")
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Internal Server Error"}
+    assert response.headers["X-Request-Id"]
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+
+
+def test_streaming_response_passes_through_with_headers():
+    with TestClient(_app(), base_url="https://localhost") as client:
+        response = client.get("/stream")
+
+    assert response.text == "first,second"
+    assert response.headers["X-Frame-Options"] == "DENY"
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+
+@pytest.fixture
+def access_log():
+    records = []
+    handler_id = logger.add(lambda message: records.append(message.record))
+    yield records
+    logger.remove(handler_id)
+
+
+def test_incoming_request_id_is_kept_only_when_safe():
+    with TestClient(_app(), base_url="https://localhost") as client:
+        kept = client.get("/ok", headers={"X-Request-Id": "edge-42.a:b"})
+        replaced = client.get("/ok", headers={"X-Request-Id": "bad id\nforged"})
+
+    assert kept.headers["X-Request-Id"] == "edge-42.a:b"
+    assert replaced.headers["X-Request-Id"] != "bad id\nforged"
+
+
+def test_sampling_drops_successes_but_keeps_errors(access_log, monkeypatch):
+    monkeypatch.setattr(settings, "log_sample_rate", 0.0)
+
+    with TestClient(_app(), base_url="https://localhost") as client:
+        client.get("/ok")
+        client.get("/missing")
+
+    statuses = [r["extra"]["status"] for r in access_log if "status" in r["extra"]]
+    assert statuses == [404]
+
+
+def test_slow_requests_are_logged_with_context(access_log, monkeypatch):
+    monkeypatch.setattr(settings, "log_sample_rate", 0.0)
+    monkeypatch.setattr(settings, "log_slow_request_threshold", 0.0)
+
+    with TestClient(_app(), base_url="https://localhost") as client:
+        client.get("/ok", headers={"X-Request-Id": "slow-1"})
+
+    (record,) = [r for r in access_log if "status" in r["extra"]]
+    assert record["level"].name == "WARNING"
+    assert record["extra"]["route"] == "/ok"
+    assert record["extra"]["request_id"] == "slow-1"
@@ -1,3 +1,11 @@
+from decimal import Decimal
+
+from pydantic import TypeAdapter
+
+from app.catalog.schemas.product import ProductList
+from app.models.categories import Category
+from app.models.products import Product
+from app.shared.responses import serialize
 from tests.conftest import (
     auth_headers,
     create_category,
@@ -109,3 +117,28 @@ def test_order_item_includes_product_snapshot(client):
     assert snapshot == {"id": product_id, "name": "Pixel", "image_url": None}
     assert "stock" not in snapshot
     assert "price" not in snapshot
+
+
+def _product(product_id: int, category: Category | None) -> Product:
+    return Product(
+        id=product_id,
+        name="Pixel",
+        price=Decimal("99.90"),
+        stock=3,
+        rating=4.5,
+        category_id=1,
+        category=category,
+        seller_id=2,
+        is_active=True,
+    )
+
+
+def test_serialize_matches_response_model_output():
+    category = Category(id=1, name="Phones", is_active=True)
+    products = [_product(1, category), _product(2, None)]
+    page = {"items": products, "total": 2, "page": 1, "page_size": 20}
+    adapter = TypeAdapter(ProductList)
+
+    expected = adapter.dump_json(adapter.validate_python(page, from_attributes=True))
+
+    assert serialize(ProductList, page).body == expected
@@ -0,0 +1,315 @@
+import asyncio
+import contextlib
+import json
+import runpy
+import socket
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI
+from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+from websockets.asyncio.client import connect
+from websockets.protocol import State
+
+from app.config import get_settings
+from app.notifications.api import ws_router
+from app.notifications.ws.broker import listen_for_notifications
+from app.notifications.ws.events import stream_id
+from app.notifications.ws.manager import (
+    SLOW_CONSUMER_CLOSE_CODE,
+    TRY_AGAIN_LATER_CLOSE_CODE,
+    ConnectionManager,
+    ws_manager,
+)
+from tests.conftest import (
+    auth_headers,
+    create_category,
+    create_product,
+    register_seller,
+    register_user,
+)
+
+# HTTPSRedirectMiddleware вне production: WebSocket сразу по wss.
+WS_URL = "wss://localhost/ws/orders"
+
+
+def _setup(client):
+    seller = register_seller(client).json()
+    seller_headers = auth_headers(seller["email"], seller["id"], seller["role"])
+    category_id = create_category(client).json()["id"]
+    product_id = create_product(client, seller_headers, category_id).json()["id"]
+    buyer = register_user(client, email="buyer@test.com").json()
+    buyer_headers = auth_headers(buyer["email"], buyer["id"], buyer["role"])
+    client.post(
+        "/cart/items/",
+        headers=buyer_headers,
+        json={"product_id": product_id, "quantity": 1},
+    )
+    token = buyer_headers["Authorization"].removeprefix("Bearer ")
+    return buyer_headers, token
+
+
+def test_checkout_notifies_open_websocket(client):
+    buyer_headers, token = _setup(client)
+
+    with client.websocket_connect(f"{WS_URL}?token={token}") as websocket:
+        assert websocket.receive_json()["type"] == "connected"
+
+        order = client.post("/orders/checkout", headers=buyer_headers).json()
+
+        message = websocket.receive_json()
+        assert message["type"] == "order_created"
+        assert message["order_id"] == order["id"]
+
+
+def test_websocket_stats_count_local_connections(client):
+    _, token = _setup(client)
+    admin = register_user(client, email="admin@test.com", role="admin").json()
+    admin_headers = auth_headers(admin["email"], admin["id"], admin["role"])
+
+    with client.websocket_connect(f"{WS_URL}?token={token}") as websocket:
+        websocket.receive_json()
+        stats = client.get("/ws/stats", headers=admin_headers).json()
+
+    assert stats["worker"] == {
+        "connections": 1,
+        "users": 1,
+        "reaped": 0,
+        "rejected": 0,
+    }
+
+
+def _manager(queue_size=8, policy="disconnect", **limits) -> ConnectionManager:
+    limits = {"max_per_user": 10, "max_per_worker": 100} | limits
+    return ConnectionManager(queue_size=queue_size, policy=policy, **limits)
+
+
+class StuckWebSocket:
+    """Клиент, который принимает первый кадр и дальше не читает."""
+
+    def __init__(self):
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(text)
+        await asyncio.Event().wait()
+
+    async def close(self, code=1000, reason=None):
+        self.closed_with = code
+
+
+class RecordingWebSocket(StuckWebSocket):
+    async def send_text(self, text):
+        self.sent.append(text)
+
+
+async def test_slow_consumer_is_disconnected_without_blocking_others():
+    manager = _manager(queue_size=2, policy="disconnect")
+    slow, fast = StuckWebSocket(), StuckWebSocket()
+    slow_connection = await manager.connect(1, slow)
+    await manager.connect(2, fast)
+    await asyncio.sleep(0)
+
+    # Первый кадр уходит писателю и застревает в send, дальше копится очередь.
+    assert manager.notify_user(1, {"n": 0}) == 1
+    await asyncio.sleep(0)
+    delivered = [manager.notify_user(1, {"n": i}) for i in range(1, 4)]
+    assert manager.notify_user(2, {"n": 0}) == 1
+    await asyncio.sleep(0)
+
+    assert delivered == [1, 1, 0]
+    assert slow_connection.closed
+    assert slow.closed_with == SLOW_CONSUMER_CLOSE_CODE
+    assert fast.sent == ['{"n": 0}']
+
+
+async def test_drop_oldest_policy_keeps_latest_messages():
+    manager = _manager(queue_size=2, policy="drop_oldest")
+    websocket = StuckWebSocket()
+    connection = await manager.connect(1, websocket)
+    await asyncio.sleep(0)
+
+    assert manager.notify_user(1, {"n": 0}) == 1
+    await asyncio.sleep(0)
+    for i in range(1, 5):
+        assert manager.notify_user(1, {"n": i}) == 1
+
+    assert not connection.closed
+    assert websocket.sent == ['{"n": 0}']
+    await manager.disconnect(connection)
+    assert manager.active_connections == 0
+
+
+def test_reconnect_replays_only_missed_notifications(client):
+    buyer_headers, token = _setup(client)
+
+    with client.websocket_connect(f"{WS_URL}?token={token}") as websocket:
+        websocket.receive_json()
+        first_order = client.post("/orders/checkout", headers=buyer_headers).json()
+        first = websocket.receive_json()
+    assert first["order_id"] == first_order["id"]
+
+    # Сокет закрыт, заказ оформлен — уведомление осталось только в стриме.
+    product_id = client.get("/products/").json()["items"][0]["id"]
+    client.post(
+        "/cart/items/",
+        headers=buyer_headers,
+        json={"product_id": product_id, "quantity": 1},
+    )
+    missed_order = client.post("/orders/checkout", headers=buyer_headers).json()
+
+    url = f"{WS_URL}?token={token}&last_event_id={first['event_id']}"
+    with client.websocket_connect(url) as websocket:
+        assert websocket.receive_json()["type"] == "connected"
+        replayed = websocket.receive_json()
+        websocket.send_text("ping")
+        assert websocket.receive_json() == {"type": "pong"}
+
+    assert replayed["order_id"] == missed_order["id"]
+    assert stream_id(replayed["event_id"]) > stream_id(first["event_id"])
+
+
+async def test_replay_skips_live_messages_already_replayed():
+    manager = _manager()
+    websocket = RecordingWebSocket()
+    connection = await manager.connect(1, websocket)
+    connection.hold()
+
+    manager.notify_user(1, {"n": 1, "event_id": "100-1"})
+    manager.notify_user(1, {"n": 2, "event_id": "100-2"})
+    await connection.replay([{"n": 1, "event_id": "100-1"}])
+    await asyncio.sleep(0)
+
+    assert [json.loads(text)["n"] for text in websocket.sent] == [1, 2]
+    await manager.disconnect(connection)
+
+
+class _QuickCloseProtocol(WebSocketProtocol):
+    # Иначе после таймаута ping uvicorn ещё 10 с ждёт close-кадра от пира.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.close_timeout = 0.1
+
+
+@contextlib.asynccontextmanager
+async def _serve_ws_router(**config):
+    """Настоящий uvicorn с роутером уведомлений: протокольный ping — его."""
+    app = FastAPI()
+    app.include_router(ws_router.router)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app,
+            port=port,
+            ws=_QuickCloseProtocol,
+            lifespan="off",
+            log_level="warning",
+            **config,
+        )
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    try:
+        yield port
+    finally:
+        server.should_exit = True
+        await serving
+
+
+async def test_protocol_ping_keeps_silent_client_and_reaps_dead_peer():
+    token = auth_headers("buyer@test.com", 1)["Authorization"].removeprefix("Bearer ")
+    path = f"/ws/orders?token={token}"
+    reaped = ws_manager.stats()["reaped"]
+    async with _serve_ws_router(ws_ping_interval=0.1, ws_ping_timeout=0.1) as port:
+        # Клиент только слушает, pong на протокольный ping шлёт библиотека.
+        async with connect(f"ws://127.0.0.1:{port}{path}") as listener:
+            assert json.loads(await listener.recv())["type"] == "connected"
+            # Пир, который не отвечает на ping: рукопожатие и тишина.
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: localhost\r\n"
+                "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                "Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n"
+                "Sec-WebSocket-Version: 13\r\n\r\n".encode()
+            )
+            assert (await reader.readline()).startswith(b"HTTP/1.1 101")
+
+            await asyncio.sleep(1)
+
+            assert listener.state is State.OPEN
+            assert ws_manager.stats()["reaped"] == reaped + 1
+            assert ws_manager.active_connections == 1
+            writer.close()
+
+
+def test_gunicorn_worker_enables_protocol_ping():
+    config = runpy.run_path(str(Path(__file__).parents[1] / "gunicorn.conf.py"))
+
+    kwargs = config["worker_class"].CONFIG_KWARGS
+    assert kwargs["ws_ping_interval"] == get_settings().ws_ping_interval
+    assert kwargs["ws_ping_timeout"] == get_settings().ws_ping_timeout
+
+
+async def test_connection_limits_close_with_try_again_later():
+    manager = _manager(max_per_user=1, max_per_worker=2)
+    sockets = [RecordingWebSocket() for _ in range(3)]
+
+    assert await manager.connect(1, sockets[0]) is not None
+    assert await manager.connect(1, sockets[1]) is None
+    assert await manager.connect(2, sockets[2]) is not None
+    assert manager.admit(3) == "Worker connection limit reached"
+
+    assert sockets[1].closed_with == TRY_AGAIN_LATER_CLOSE_CODE
+    assert manager.stats()["rejected"] == 2
+    assert manager.active_connections == 2
+
+
+class ScriptedPubSub:
+    """pubsub, который отдаёт заданные сообщения и дальше ждёт."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def subscribe(self, channel):
+        pass
+
+    async def listen(self):
+        for data in self._messages:
+            yield {"type": "message", "data": data}
+        await asyncio.Event().wait()
+
+
+class ScriptedRedis:
+    def __init__(self, messages):
+        self._messages = messages
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return ScriptedPubSub(self._messages)
+
+
+async def test_listener_survives_malformed_messages():
+    manager = _manager()
+    connection = manager.subscribe(7)
+    valid = json.dumps({"user_id": 7, "message": {"type": "order_created"}})
+    redis = ScriptedRedis(["not json", '{"user_id": 7}', "[]", valid])
+    listener = asyncio.create_task(listen_for_notifications(redis, manager))
+
+    frame = await connection.next_frame(timeout=1)
+    listener.cancel()
+
+    assert frame is not None
+    assert json.loads(frame[1]) == {"type": "order_created"}
+    await manager.disconnect(connection)
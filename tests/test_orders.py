@@ -0,0 +1,107 @@
+from tests.conftest import (
+    auth_headers,
+    create_category,
+    create_product,
+    register_seller,
+    register_user,
+)
+
+
+def _setup(client, stock: str):
+    seller = register_seller(client).json()
+    seller_headers = auth_headers(seller["email"], seller["id"], seller["role"])
+    category_id = create_category(client).json()["id"]
+    product_id = create_product(
+        client, seller_headers, category_id, name="Pixel", stock=stock
+    ).json()["id"]
+    buyer = register_user(client, email="buyer@test.com").json()
+    buyer_headers = auth_headers(buyer["email"], buyer["id"], buyer["role"])
+    return product_id, buyer_headers
+
+
+def test_checkout_reserves_stock(client):
+    product_id, buyer_headers = _setup(client, stock="5")
+    client.post(
+        "/cart/items/",
+        headers=buyer_headers,
+        json={"product_id": product_id, "quantity": 3},
+    )
+
+    response = client.post("/orders/checkout", headers=buyer_headers)
+
+    assert response.status_code == 201
+    assert client.get(f"/products/{product_id}").json()["stock"] == 2
+    assert client.get("/cart/", headers=buyer_headers).json()["items"] == []
+
+
+def test_checkout_not_enough_stock_keeps_stock_and_cart(client):
+    product_id, buyer_headers = _setup(client, stock="2")
+    client.post(
+        "/cart/items/",
+        headers=buyer_headers,
+        json={"product_id": product_id, "quantity": 3},
+    )
+
+    response = client.post("/orders/checkout", headers=buyer_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Not enough stock for product Pixel"
+    assert client.get(f"/products/{product_id}").json()["stock"] == 2
+    cart = client.get("/cart/", headers=buyer_headers).json()
+    assert cart["items"][0]["quantity"] == 3
+
+
+def test_list_orders_returns_page(client):
+    product_id, buyer_headers = _setup(client, stock="5")
+    client.post(
+        "/cart/items/",
+        headers=buyer_headers,
+        json={"product_id": product_id, "quantity": 2},
+    )
+    order_id = client.post("/orders/checkout", headers=buyer_headers).json()["id"]
+
+    response = client.get("/orders/", headers=buyer_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    page = response.json()
+    assert (page["total"], page["page"], page["page_size"]) == (1, 1, 10)
+    (order,) = page["items"]
+    assert order["id"] == order_id
+    assert order["items"][0]["product"]["name"] == "Pixel"
+    assert order["items"][0]["quantity"] == 2
+
+
+def test_list_orders_sparse_fields_skip_items(client):
+    product_id, buyer_headers = _setup(client, stock="5")
+    client.post(
+        "/cart/items/",
+        headers=buyer_headers,
+        json={"product_id": product_id, "quantity": 1},
+    )
+    client.post("/orders/checkout", headers=buyer_headers)
+
+    response = client.get(
+        "/orders/", headers=buyer_headers, params={"fields": "status,total_amount"}
+    )
+
+    (order,) = response.json()["items"]
+    assert sorted(order) == ["id", "status", "total_amount"]
+
+
+def test_checkout_invalidates_cached_stock(client):
+    product_id, buyer_headers = _setup(client, stock="5")
+    assert client.get(f"/products/{product_id}").json()["stock"] == 5
+    listed = client.get("/products/", params={"in_stock": True}).json()
+    assert listed["items"][0]["stock"] == 5
+    client.post(
+        "/cart/items/",
+        headers=buyer_headers,
+        json={"product_id": product_id, "quantity": 5},
+    )
+
+    client.post("/orders/checkout", headers=buyer_headers)
+
+    assert client.get(f"/products/{product_id}").json()["stock"] == 0
+    listed = client.get("/products/", params={"in_stock": True}).json()
+    assert listed["items"] == []
@@ -0,0 +1,218 @@
+import contextlib
+import os
+
+import pytest
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.catalog.repositories.catalog_cache import CatalogCache, product_tag
+from tests.conftest import (
+    FakeRedis,
+    auth_headers,
+    create_category,
+    create_product,
+    register_seller,
+    register_user,
+)
+
+TEST_REDIS_URL = os.getenv("TEST_REDIS_URL")
+
+requires_redis = pytest.mark.skipif(
+    not TEST_REDIS_URL, reason="TEST_REDIS_URL is not set"
+)
+
+
+def _create_products(client, count: int) -> list[int]:
+    seller = register_seller(client).json()
+    headers = auth_headers(seller["email"], seller["id"], seller["role"])
+    category_id = create_category(client).json()["id"]
+    return [
+        create_product(client, headers, category_id, name=f"Phone {i}").json()["id"]
+        for i in range(count)
+    ]
+
+
+def test_list_products_cursor_pagination(client):
+    product_ids = _create_products(client, 5)
+
+    first = client.get("/products/", params={"page_size": 2}).json()
+    assert [item["id"] for item in first["items"]] == product_ids[:2]
+    assert first["total"] == 5
+    assert first["next_cursor"]
+
+    second = client.get(
+        "/products/", params={"page_size": 2, "cursor": first["next_cursor"]}
+    ).json()
+    assert [item["id"] for item in second["items"]] == product_ids[2:4]
+
+    last = client.get(
+        "/products/", params={"page_size": 2, "cursor": second["next_cursor"]}
+    ).json()
+    assert [item["id"] for item in last["items"]] == product_ids[4:]
+    assert last["next_cursor"] is None
+
+
+def test_list_products_page_mode_still_works(client):
+    product_ids = _create_products(client, 3)
+
+    response = client.get("/products/", params={"page": 2, "page_size": 2})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == product_ids[2:]
+    assert data["page"] == 2
+    assert data["next_cursor"] is None
+
+
+def test_list_products_invalid_cursor_returns_400(client):
+    response = client.get("/products/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+
+def test_list_products_without_total(client):
+    _create_products(client, 2)
+
+    data = client.get("/products/", params={"include_total": "false"}).json()
+
+    assert data["total"] is None
+    assert len(data["items"]) == 2
+
+
+def test_list_products_estimated_total_falls_back_to_exact(client):
+    _create_products(client, 2)
+
+    data = client.get("/products/", params={"total_mode": "estimated"}).json()
+
+    assert data["total"] == 2
+    assert data["total_estimated"] is False
+
+
+def test_product_reads_are_invalidated_after_update(client):
+    seller = register_seller(client).json()
+    headers = auth_headers(seller["email"], seller["id"], seller["role"])
+    category_id = create_category(client).json()["id"]
+    product_id = create_product(client, headers, category_id).json()["id"]
+
+    assert client.get(f"/products/{product_id}").json()["name"] == "Phone"
+    assert client.get("/products/").json()["items"][0]["name"] == "Phone"
+    assert client.get(f"/categories/{category_id}/products/").json()[0]["name"] == (
+        "Phone"
+    )
+
+    client.put(
+        f"/products/{product_id}",
+        headers=headers,
+        data={
+            "name": "Smartphone",
+            "price": "99.99",
+            "stock": "10",
+            "category_id": str(category_id),
+        },
+    )
+
+    assert client.get(f"/products/{product_id}").json()["name"] == "Smartphone"
+    assert client.get("/products/").json()["items"][0]["name"] == "Smartphone"
+    category_products = client.get(f"/categories/{category_id}/products/").json()
+    assert category_products[0]["name"] == "Smartphone"
+
+
+def test_category_products_are_invalidated_after_review(client):
+    (product_id,) = _create_products(client, 1)
+    category_id = client.get(f"/products/{product_id}").json()["category_id"]
+    assert client.get(f"/categories/{category_id}/products/").json()[0]["rating"] == 0
+    buyer = register_user(client).json()
+
+    client.post(
+        "/reviews/",
+        headers=auth_headers(buyer["email"], buyer["id"], buyer["role"]),
+        json={"product_id": product_id, "grade": 4},
+    )
+
+    assert client.get(f"/categories/{category_id}/products/").json()[0]["rating"] == 4
+
+
+@contextlib.contextmanager
+def _capture_sql():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_list_products_sparse_fields(client):
+    _create_products(client, 2)
+
+    with _capture_sql() as statements:
+        response = client.get("/products/", params={"fields": "name,price,image_url"})
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert {tuple(sorted(item)) for item in items} == {
+        ("id", "image_url", "name", "price")
+    }
+    products_sql = [s for s in statements if "FROM products" in s]
+    assert products_sql and all("description" not in s for s in products_sql)
+    assert not any("FROM categories" in s for s in statements)
+
+
+def test_list_products_fields_are_part_of_cache_key(client):
+    _create_products(client, 1)
+
+    full = client.get("/products/").json()["items"][0]
+    sparse = client.get("/products/", params={"fields": "name"}).json()["items"][0]
+
+    assert "description" in full and "category" in full
+    assert sparse == {"id": full["id"], "name": full["name"]}
+
+
+def test_get_product_sparse_fields_with_category(client):
+    (product_id,) = _create_products(client, 1)
+
+    response = client.get(f"/products/{product_id}", params={"fields": "category"})
+
+    assert response.json() == {
+        "id": product_id,
+        "category": {"id": response.json()["category"]["id"], "name": "Phones"},
+    }
+
+
+def test_unknown_fields_return_400(client):
+    response = client.get("/products/", params={"fields": "name,seller_id"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: seller_id"
+
+
+async def _race_catalog_cache(redis) -> list[str]:
+    cache = CatalogCache(redis, ttl=60, lock_timeout=1)
+    versions = iter(["stale", "fresh"])
+
+    async def load():
+        value = next(versions)
+        if value == "stale":
+            # Товар поменяли, пока загрузка читала его из БД.
+            await cache.invalidate(product_tag(1))
+        return value, [product_tag(1)]
+
+    return [await cache.get_or_load("product:1", load) for _ in range(2)]
+
+
+async def test_catalog_cache_drops_load_invalidated_midway():
+    assert await _race_catalog_cache(FakeRedis()) == ["stale", "fresh"]
+
+
+@requires_redis
+async def test_catalog_cache_drops_load_invalidated_midway_on_redis():
+    redis = Redis.from_url(TEST_REDIS_URL, decode_responses=True)
+    await redis.flushdb()
+    assert await _race_catalog_cache(redis) == ["stale", "fresh"]
+    await redis.aclose()
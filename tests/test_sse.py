@@ -0,0 +1,103 @@
+import json
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from app.config import get_settings
+from app.notifications.api import sse_router
+from app.notifications.api.sse_router import order_event_stream
+from app.notifications.ws.events import NotificationEventLog
+from app.notifications.ws.manager import ConnectionManager
+from tests.conftest import FakeRedis, auth_headers
+
+
+def _message(order_id: int) -> dict:
+    return {
+        "type": "order_created",
+        "order_id": order_id,
+        "status": "pending",
+        "total_amount": "10.00",
+    }
+
+
+def test_sse_requires_token(client):
+    response = client.get("/sse/orders")
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+
+async def test_sse_stream_resumes_after_last_event_id():
+    manager = ConnectionManager(
+        queue_size=8, policy="disconnect", max_per_user=10, max_per_worker=100
+    )
+    events = NotificationEventLog(FakeRedis(), maxlen=10, retention=60)
+    first_id = await events.append(1, _message(1))
+    missed_id = await events.append(1, _message(2))
+
+    stream = order_event_stream(
+        manager, manager.subscribe(1), events, last_event_id=first_id, keepalive=0.01
+    )
+    connected = await anext(stream)
+    replayed = await anext(stream)
+    keepalive = await anext(stream)
+    manager.notify_user(1, {**_message(3), "event_id": "9999999999999-0"})
+    live = await anext(stream)
+    await stream.aclose()
+
+    assert json.loads(connected.removeprefix("data: "))["type"] == "connected"
+    assert replayed.startswith(f"id: {missed_id}\ndata: ")
+    assert json.loads(replayed.split("data: ")[1])["order_id"] == 2
+    assert keepalive == ": keepalive\n\n"
+    assert live.startswith("id: 9999999999999-0\n")
+    assert manager.active_connections == 0
+
+
+def test_sse_over_connection_limit_returns_503(client, monkeypatch):
+    manager = ConnectionManager(
+        queue_size=8, policy="disconnect", max_per_user=1, max_per_worker=100
+    )
+    monkeypatch.setattr(sse_router, "ws_manager", manager)
+    manager.subscribe(1)
+    token = auth_headers("buyer@test.com", 1)["Authorization"].split()[1]
+
+    response = client.get("/sse/orders", params={"token": token})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(get_settings().sse_retry_after)
+    assert manager.active_connections == 1
+
+
+def test_subscribe_admits_and_registers_in_one_step():
+    manager = ConnectionManager(
+        queue_size=8, policy="disconnect", max_per_user=1, max_per_worker=100
+    )
+
+    first = manager.subscribe(1)
+    # Второй запрос того же пользователя видит уже занятое место.
+    assert manager.subscribe(1) is None
+    assert first is not None and manager.active_connections == 1
+    assert manager.stats()["rejected"] == 1
+
+
+async def test_subscription_released_when_client_leaves_before_first_frame():
+    manager = ConnectionManager(
+        queue_size=8, policy="disconnect", max_per_user=1, max_per_worker=100
+    )
+    events = NotificationEventLog(FakeRedis(), maxlen=10, retention=60)
+    connection = manager.subscribe(1)
+    response = sse_router.SubscriptionResponse(
+        order_event_stream(
+            manager, connection, events, last_event_id=None, keepalive=0.01
+        ),
+        manager=manager,
+        connection=connection,
+    )
+
+    async def gone(message):
+        raise OSError("client went away")
+
+    with pytest.raises(ClientDisconnect):
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, None, gone)
+
+    assert manager.active_connections == 0